@@ -0,0 +1,75 @@
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from tab_snapshot import snapshot_tabs
+
+DEFAULT_MAX_CONCURRENT = 6
+
+
+def create_tab(driver, url, background=True):
+    """Open a new tab on url without waiting for it to load.
+
+    Returns the new tab's target id, which is also its window handle.
+    """
+    try:
+        result = driver.execute_cdp_cmd("Target.createTarget", {"url": url, "background": background})
+        return result["targetId"]
+    except (AttributeError, WebDriverException):
+        # No CDP access: diff the handle set so the mapping stays exact
+        # even if other tabs appear meanwhile
+        before = set(driver.window_handles)
+        driver.execute_script("window.open(arguments[0]);", url)
+        new_handles = [h for h in driver.window_handles if h not in before]
+        return new_handles[-1] if new_handles else None
+
+
+def navigate(driver, url):
+    """Point the driver's current tab at url without blocking on the load"""
+    try:
+        driver.execute_cdp_cmd("Page.navigate", {"url": url})
+    except (AttributeError, WebDriverException):
+        driver.get(url)
+
+
+def is_loaded(tab):
+    # A loading tab reports its URL (or nothing) as the title until the
+    # page's <title> arrives
+    return bool(tab.title) and tab.title != tab.url and tab.url != "about:blank"
+
+
+def open_tabs(driver, urls, max_concurrent=DEFAULT_MAX_CONCURRENT, wait=False,
+              poll_interval=0.1, load_timeout=30):
+    """Open one tab per url, keeping at most max_concurrent loads in flight.
+
+    Tabs are created up front as a sliding window: as soon as one page has
+    loaded, the next tab is created. Each load is bounded by load_timeout,
+    after which it stops counting against the limit. With wait=False the
+    call returns once the last tab has been created rather than loaded.
+
+    Returns target ids in the same order as urls, so results map to
+    queries deterministically instead of via window_handles[-1].
+    """
+    target_ids = [None] * len(urls)
+    loading = {}  # Maps target id to the time its load started
+    next_index = 0
+    while next_index < len(urls) or (wait and loading):
+        while next_index < len(urls) and len(loading) < max_concurrent:
+            target_id = create_tab(driver, urls[next_index])
+            target_ids[next_index] = target_id
+            if target_id:
+                loading[target_id] = time.monotonic()
+            next_index += 1
+        if not loading or (next_index >= len(urls) and not wait):
+            break
+
+        now = time.monotonic()
+        tabs = {tab.target_id: tab for tab in snapshot_tabs(driver)}
+        in_flight = len(loading)
+        for target_id, started in list(loading.items()):
+            tab = tabs.get(target_id)
+            if tab is None or is_loaded(tab) or now - started > load_timeout:
+                del loading[target_id]
+        if len(loading) == in_flight:
+            time.sleep(poll_interval)  # Nothing finished yet
+    return target_ids
@@ -0,0 +1,176 @@
+"""Offline benchmarks for the three tab-manager entry points.
+
+Runs each entry point against FakeWebDriver and sweeps the number of open
+tabs, reporting wall time, WebDriver round trips and peak Python memory
+per operation:
+
+    python bench.py                      # 10, 100, 1000, 5000 tabs
+    python bench.py --sizes 10 100 --latency 0.002
+    python bench.py --http --json results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+import chrome_tab_manager
+import main
+import updated_main
+from fake_driver import FakeResultsServer, FakeWebDriver
+from launch_profile import DEFAULT_LAUNCH_PROFILE, LAUNCH_PROFILES
+from supervisor import Supervisor
+from tab_index import TabIndex
+from tab_lifecycle import TabLifecycle
+from tab_matcher import TabMatcher
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+NO_TAB_LIMIT = 10**9
+
+
+def make_query_manager(driver, launch_profile=DEFAULT_LAUNCH_PROFILE):
+    """main.QueryTabManager wired to a fake driver, skipping the profile prompt"""
+    return main.QueryTabManager.from_driver(driver, max_live_tabs=NO_TAB_LIMIT, launch_profile=launch_profile)
+
+
+def make_chrome_tab_manager(driver, launch_profile=DEFAULT_LAUNCH_PROFILE):
+    manager = chrome_tab_manager.ChromeTabManager(launch_profile, NO_TAB_LIMIT)
+    manager.driver = driver
+    manager.base_handle = driver.current
+    manager.lifecycle = TabLifecycle(driver, manager.tabs, NO_TAB_LIMIT)
+    return manager
+
+
+def make_updated_manager(driver, launch_profile=DEFAULT_LAUNCH_PROFILE):
+    manager = updated_main.ChromeTabManager.__new__(updated_main.ChromeTabManager)
+    manager.launch_profile = launch_profile
+    manager.blocker = None
+    manager.driver = driver
+    manager.attached = False
+    manager.tabs = TabIndex()
+    manager.matcher = TabMatcher()
+    manager.base_handle = driver.current
+    manager.is_base_used = False
+    manager.max_concurrent = updated_main.DEFAULT_MAX_CONCURRENT
+    manager.lifecycle = TabLifecycle(driver, manager.tabs, NO_TAB_LIMIT)
+    return manager
+
+
+def query(i):
+    return f"benchmark query {i}"
+
+
+def crash_and_recover(manager):
+    """Kill the fake browser, then run a command so the supervisor relaunches it and reopens every tab"""
+    manager.supervisor = Supervisor(manager, relaunch=manager.driver.relaunch)
+    manager.driver.crash()
+    manager.execute("close")
+
+
+def main_scenario(n):
+    """(operation, setup -> callable) steps for main.py's QueryTabManager"""
+    return make_query_manager, [
+        ("open", lambda m: [m.open_query(query(i)) for i in range(n)]),
+        ("import", lambda m: m.import_tab(f"https://www.google.com/search?q=imported+{n}")),
+        ("list", lambda m: m.list_queries()),
+        ("close", lambda m: m.close_tab(query(n // 2))),
+        ("recover", crash_and_recover),
+    ]
+
+
+def chrome_tab_manager_scenario(n):
+    return make_chrome_tab_manager, [
+        ("search", lambda m: [m.search(query(i)) for i in range(n)]),
+        ("list", lambda m: m.list_tabs()),
+        ("close", lambda m: m.close_tab(f"{query(n // 2)} - ")),
+    ]
+
+
+def updated_main_scenario(n):
+    return make_updated_manager, [
+        ("search", lambda m: m.search([query(i) for i in range(n)])),
+        ("list", lambda m: m.list_tabs()),
+        ("close", lambda m: m.close_tab(f"{query(n // 2)} - ")),
+    ]
+
+
+SCENARIOS = {
+    "main": main_scenario,
+    "chrome_tab_manager": chrome_tab_manager_scenario,
+    "updated_main": updated_main_scenario,
+}
+
+
+def run_scenario(name, n, latency, results_server, measure_memory, launch_profile=DEFAULT_LAUNCH_PROFILE):
+    factory, steps = SCENARIOS[name](n)
+    driver = FakeWebDriver(latency=latency, results_server=results_server)
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = factory(driver, launch_profile)
+        for op, step in steps:
+            driver.reset_counters()
+            if measure_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            step(manager)
+            elapsed = time.perf_counter() - started
+            peak = None
+            if measure_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            rows.append({
+                "entry": name,
+                "tabs": n,
+                "op": op,
+                "wall_ms": elapsed * 1000,
+                "round_trips": driver.total_round_trips,
+                "peak_kib": peak / 1024 if peak is not None else None,
+            })
+    return rows
+
+
+def run(sizes, entries, latency=0.0, use_http=False, launch_profile=DEFAULT_LAUNCH_PROFILE):
+    results_server = FakeResultsServer() if use_http else None
+    rows = []
+    try:
+        for name in entries:
+            for n in sizes:
+                # Time without tracemalloc, then rerun just to measure memory
+                timed = run_scenario(name, n, latency, results_server, False, launch_profile)
+                traced = run_scenario(name, n, 0.0, results_server, True, launch_profile)
+                for row, traced_row in zip(timed, traced):
+                    row["peak_kib"] = traced_row["peak_kib"]
+                rows.extend(timed)
+    finally:
+        if results_server:
+            results_server.close()
+    return rows
+
+
+def print_report(rows):
+    print(f"{'entry':<20}{'tabs':>6}  {'op':<8}{'wall ms':>11}{'round trips':>13}{'peak KiB':>11}")
+    for row in rows:
+        print(f"{row['entry']:<20}{row['tabs']:>6}  {row['op']:<8}{row['wall_ms']:>11.1f}"
+              f"{row['round_trips']:>13}{row['peak_kib']:>11.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tab managers against a fake WebDriver.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--entries", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every driver call")
+    parser.add_argument("--http", action="store_true", help="load result pages from a local HTTP server")
+    parser.add_argument("--json", help="also write the rows to this file")
+    parser.add_argument("--launch-profile", choices=sorted(LAUNCH_PROFILES), default=DEFAULT_LAUNCH_PROFILE.name,
+                        help="manager settings to model (window churn); see chrome_bench.py for real Chrome")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rows = run(args.sizes, args.entries, args.latency, args.http, LAUNCH_PROFILES[args.launch_profile])
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -0,0 +1,108 @@
+import os
+import socket
+import sys
+
+import psutil
+
+CHROME_PROCESS_NAMES = {
+    "chrome.exe", "chrome", "google-chrome", "google-chrome-stable",
+    "google chrome", "chromium", "chromium-browser",
+}
+
+
+def default_user_data_dir():
+    """Chrome's default User Data directory on this platform"""
+    if sys.platform.startswith("win"):
+        return os.path.join(os.getenv("LOCALAPPDATA", ""), "Google", "Chrome", "User Data")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Google/Chrome")
+    return os.path.join(os.getenv("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"), "google-chrome")
+
+
+class BrowserWatcher:
+    """Answers "is Chrome using this profile?" without walking every process.
+
+    On Linux and macOS Chrome keeps a SingletonLock symlink in the profile
+    pointing at "<hostname>-<pid>", which gives the browser PID directly.
+    On Windows the profile's lockfile is held open while Chrome runs; only
+    then do we fall back to a name-filtered process scan. Found PIDs are
+    cached and re-validated with a cheap pid_exists check, and waiting for
+    exit blocks on the processes themselves instead of sleep-polling.
+    """
+
+    def __init__(self, user_data_dir=None):
+        self.user_data_dir = user_data_dir or default_user_data_dir()
+        self._pids = set()
+
+    def lock_pid(self):
+        """Return the PID recorded in the profile's SingletonLock, if any"""
+        try:
+            target = os.readlink(os.path.join(self.user_data_dir, "SingletonLock"))
+        except (OSError, AttributeError):
+            return None
+        host, _, pid = target.rpartition("-")
+        if host != socket.gethostname() or not pid.isdigit():
+            return None
+        return int(pid)
+
+    def lockfile_held(self):
+        """Windows: Chrome holds the profile's lockfile open exclusively"""
+        path = os.path.join(self.user_data_dir, "lockfile")
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "a"):
+                return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+
+    def running_pids(self):
+        """PIDs of the Chrome browser process(es) using this profile"""
+        self._pids = {pid for pid in self._pids if psutil.pid_exists(pid)}
+        if self._pids:
+            return set(self._pids)
+
+        pid = self.lock_pid()
+        if pid is not None:
+            if psutil.pid_exists(pid):
+                self._pids = {pid}
+            return set(self._pids)
+
+        if not sys.platform.startswith("win") or not self.lockfile_held():
+            return set()  # No lock, so nothing is using this profile
+        # No lock to read the PID from; scan once, filtered by name
+        self._pids = {
+            process.pid
+            for process in psutil.process_iter(["name"])
+            if (process.info["name"] or "").lower() in CHROME_PROCESS_NAMES
+        }
+        return set(self._pids)
+
+    def is_running(self):
+        return bool(self.running_pids())
+
+    def wait_for_exit(self, timeout=None, on_wait=None):
+        """Block until every browser process for this profile has exited.
+
+        Returns True once Chrome is gone, or False if timeout expires first.
+        on_wait is called once with the PIDs being waited on.
+        """
+        pids = self.running_pids()
+        if pids and on_wait:
+            on_wait(pids)
+        while pids:
+            processes = []
+            for pid in pids:
+                try:
+                    processes.append(psutil.Process(pid))
+                except psutil.NoSuchProcess:
+                    continue
+            _, alive = psutil.wait_procs(processes, timeout=timeout)
+            if alive:
+                return False
+            # Chrome may have handed the profile to a new process
+            self._pids = set()
+            pids = self.running_pids()
+        return True
@@ -0,0 +1,107 @@
+"""Find search-result tabs in a running Chrome or in its saved session files.
+
+Tabs come from a DevTools /json/list endpoint (any Chrome started with a
+remote debugging port) or, offline, from the profile's SNSS session files.
+Queries are recognized by search_urls.query_from_url, the same parser
+that tracks tabs opened by hand, so every engine host it knows is found.
+"""
+import glob
+import json
+import os
+import struct
+import urllib.request
+
+from search_urls import query_from_url
+from tab_snapshot import TabInfo
+
+# SNSS session command ids (components/sessions/core/session_service_commands.cc)
+_UPDATE_TAB_NAVIGATION = 6
+_SET_SELECTED_NAVIGATION_INDEX = 7
+_TAB_CLOSED = 16
+
+
+def devtools_tabs(address, timeout=5):
+    """Every open page from a DevTools endpoint such as "127.0.0.1:9222" """
+    with urllib.request.urlopen(f"http://{address}/json/list", timeout=timeout) as response:
+        targets = json.load(response)
+    return [
+        TabInfo(t["id"], t.get("url", ""), t.get("title", ""))
+        for t in targets
+        if t.get("type") == "page"
+    ]
+
+
+def extract_queries(tabs):
+    """Return (tab, query) for every tab showing a search results page"""
+    return [(tab, query) for tab in tabs if (query := query_from_url(tab.url))]
+
+
+def _read_pickle_string(data, pos):
+    """Read a Chromium Pickle std::string (int32 length, 4-byte aligned)"""
+    (length,) = struct.unpack_from("<i", data, pos)
+    pos += 4
+    value = data[pos:pos + length].decode("utf-8", "replace")
+    return value, pos + ((length + 3) & ~3)
+
+
+def _read_pickle_string16(data, pos):
+    (length,) = struct.unpack_from("<i", data, pos)
+    pos += 4
+    size = length * 2
+    value = data[pos:pos + size].decode("utf-16-le", "replace")
+    return value, pos + ((size + 3) & ~3)
+
+
+def parse_snss(data):
+    """Return the current (url, title) of each open tab in an SNSS session file"""
+    if data[:4] != b"SNSS":
+        raise ValueError("not an SNSS session file")
+    navigations = {}  # Maps tab id to {index: (url, title)}
+    selected = {}  # Maps tab id to selected navigation index
+    pos = 8  # Magic + int32 version
+    while pos + 2 <= len(data):
+        (size,) = struct.unpack_from("<H", data, pos)
+        pos += 2
+        if size == 0 or pos + size > len(data):
+            break
+        command_id = data[pos]
+        payload = data[pos + 1:pos + size]
+        pos += size
+        try:
+            if command_id == _UPDATE_TAB_NAVIGATION:
+                # Pickle: uint32 payload size, int32 tab id, int32 index, url, title
+                tab_id, index = struct.unpack_from("<ii", payload, 4)
+                url, cursor = _read_pickle_string(payload, 12)
+                title, _ = _read_pickle_string16(payload, cursor)
+                navigations.setdefault(tab_id, {})[index] = (url, title)
+            elif command_id == _SET_SELECTED_NAVIGATION_INDEX:
+                tab_id, index = struct.unpack_from("<ii", payload, 0)
+                selected[tab_id] = index
+            elif command_id == _TAB_CLOSED:
+                (tab_id,) = struct.unpack_from("<i", payload, 0)
+                navigations.pop(tab_id, None)
+        except (struct.error, IndexError):
+            continue  # Truncated command at the end of a file being written
+    tabs = []
+    for tab_id, entries in navigations.items():
+        index = selected.get(tab_id, max(entries))
+        url, title = entries.get(index) or entries[max(entries)]
+        tabs.append(TabInfo(None, url, title))
+    return tabs
+
+
+def session_files(profile_dir):
+    """Newest session file for a profile, checking new and legacy layouts"""
+    candidates = glob.glob(os.path.join(profile_dir, "Sessions", "Session_*"))
+    candidates.append(os.path.join(profile_dir, "Current Session"))
+    candidates = [path for path in candidates if os.path.isfile(path)]
+    return sorted(candidates, key=os.path.getmtime, reverse=True)[:1]
+
+
+def session_tabs(profile_dir):
+    """Tabs recorded in a profile's session file, read without Chrome running"""
+    tabs = []
+    for path in session_files(profile_dir):
+        with open(path, "rb") as f:
+            tabs.extend(parse_snss(f.read()))
+    return tabs
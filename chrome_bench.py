@@ -0,0 +1,118 @@
+"""Compare launch profiles on a real Chrome.
+
+For each launch profile, starts Chrome with a throwaway user data
+directory, opens the same search tabs through batch_open.open_tabs, and
+reports how long the opens took and what the whole browser process tree
+costs afterwards (RSS and CPU over a short window):
+
+    python chrome_bench.py                           # default vs lite vs headless, 20 tabs
+    python chrome_bench.py --tabs 50 --profiles default headless --json launch.json
+
+Needs Chrome and network access; bench.py is the offline counterpart.
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import psutil
+from selenium import webdriver
+
+from batch_open import open_tabs
+from driver_cache import start_driver
+from launch_profile import LAUNCH_PROFILES, apply_launch_profile, start_resource_blocker
+from search_urls import build_search_url
+
+DEFAULT_TABS = 20
+DEFAULT_SETTLE = 3.0
+CPU_WINDOW = 2.0
+
+
+def browser_processes(driver):
+    """chromedriver's Chrome and all of its helper processes"""
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        return [p for p in root.children(recursive=True) if "chrome" in p.name().lower()]
+    except (AttributeError, psutil.Error):
+        return []
+
+
+def sample_usage(processes, window=CPU_WINDOW):
+    """(total RSS bytes, total CPU percent over `window` seconds)"""
+    for process in processes:
+        try:
+            process.cpu_percent(None)
+        except psutil.Error:
+            pass
+    time.sleep(window)
+    rss = cpu = 0.0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+            cpu += process.cpu_percent(None)
+        except psutil.Error:
+            continue
+    return rss, cpu
+
+
+def run_profile(profile, tabs, settle=DEFAULT_SETTLE):
+    user_data_dir = tempfile.mkdtemp(prefix=f"chrome-bench-{profile.name}-")
+    options = apply_launch_profile(webdriver.ChromeOptions(), profile)
+    options.add_argument(f"--user-data-dir={user_data_dir}")
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    started = time.perf_counter()
+    driver = start_driver(options)
+    launch_s = time.perf_counter() - started
+    blocker = start_resource_blocker(driver) if profile.block_resources else None
+    try:
+        urls = [build_search_url(f"chrome bench query {i}") for i in range(tabs)]
+        started = time.perf_counter()
+        handles = open_tabs(driver, urls, wait=True)
+        open_s = time.perf_counter() - started
+        time.sleep(settle)  # Let late scripts and subresources finish
+        processes = browser_processes(driver)
+        rss, cpu = sample_usage(processes)
+        return {
+            "profile": profile.name,
+            "tabs": tabs,
+            "opened": sum(1 for h in handles if h),
+            "launch_ms": launch_s * 1000,
+            "open_ms": open_s * 1000,
+            "processes": len(processes),
+            "rss_mib": rss / 2**20,
+            "rss_per_tab_mib": rss / 2**20 / max(1, tabs),
+            "cpu_percent": cpu,
+        }
+    finally:
+        if blocker:
+            blocker.close()
+        driver.quit()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def print_report(rows):
+    print(f"{'profile':<10}{'tabs':>6}{'launch ms':>11}{'open ms':>10}{'procs':>7}"
+          f"{'RSS MiB':>10}{'MiB/tab':>9}{'CPU %':>8}")
+    for row in rows:
+        print(f"{row['profile']:<10}{row['tabs']:>6}{row['launch_ms']:>11.0f}{row['open_ms']:>10.0f}"
+              f"{row['processes']:>7}{row['rss_mib']:>10.1f}{row['rss_per_tab_mib']:>9.1f}{row['cpu_percent']:>8.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Chrome launch profiles on real tabs.")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(LAUNCH_PROFILES), default=list(LAUNCH_PROFILES))
+    parser.add_argument("--tabs", type=int, default=DEFAULT_TABS)
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE, help="seconds to wait before sampling")
+    parser.add_argument("--json", help="also write the rows to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rows = [run_profile(LAUNCH_PROFILES[name], args.tabs, args.settle) for name in args.profiles]
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -1,16 +1,27 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
-import time
-import re
+
+from command_loop import AsyncCommandLoop
+from driver_cache import start_driver
+from driver_trace import trace_from_argv
+from launch_profile import DEFAULT_LAUNCH_PROFILE, apply_launch_profile, launch_profile_from_argv, start_resource_blocker
+from search_urls import build_search_url
+from session_daemon import attach_driver
+from tab_index import TabIndex
+from tab_lifecycle import DEFAULT_MAX_LIVE_TABS, TabLifecycle
+from tab_matcher import TabMatcher, is_bulk
+from tab_snapshot import snapshot_tabs, close_tabs
 
 
 class ChromeTabManager:
-    def __init__(self):
+    def __init__(self, launch_profile=DEFAULT_LAUNCH_PROFILE, max_live_tabs=DEFAULT_MAX_LIVE_TABS):
+        self.launch_profile = launch_profile
+        self.max_live_tabs = max_live_tabs
+        self.blocker = None
         self.driver = None
-        self.tabs = {}  # Maps user query to window handle
+        self.lifecycle = None  # Suspends least recently used tabs once the driver exists
+        self.tabs = TabIndex()  # Maps user query to window handle
+        self.matcher = TabMatcher()  # Cached title index for close keywords
         self.base_handle = None
         self.is_base_used = False
 
@@ -26,31 +37,59 @@ class ChromeTabManager:
             options.add_argument("--no-default-browser-check")
             # Remove the remote debugging port that might cause conflicts
             # options.add_argument("--remote-debugging-port=9222")
+            apply_launch_profile(options, self.launch_profile)
 
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()), options=options
-            )
+            # Reattach to session_daemon.py's browser, else launch our own
+            self.driver = attach_driver(self.launch_profile.page_load_strategy)
+            if self.driver is None:
+                self.driver = start_driver(options)
+            else:
+                self.is_base_used = True  # Never take over a tab in a browser we didn't launch
+            if self.launch_profile.block_resources:
+                self.blocker = start_resource_blocker(self.driver)
             # Give it a moment to fully initialize
             # time.sleep(1)
             self.base_handle = self.driver.current_window_handle
+            self.lifecycle = TabLifecycle(self.driver, self.tabs, self.max_live_tabs)
 
     def search(self, query):
         self._initialize_driver()  # Initialize when first search is called
 
+        entry = self.tabs.get(query)
+        if entry is not None:
+            # Searched before: bring its tab back, reopening it if suspended
+            handle = self.lifecycle.touch(entry)
+            if handle is not None:
+                print(f"[🔍] Switching to: {query}")
+                if self.blocker:
+                    self.blocker.unblock(handle)
+                self.driver.switch_to.window(handle)
+            return
+
+        url = build_search_url(query)
         if not self.is_base_used:
             print(f"[🔍] Searching for: {query}")
-            self.driver.get(f"https://www.google.com/search?q={query}")
-            self.tabs[query] = self.base_handle
+            if self.blocker:
+                self.blocker.unblock(self.base_handle, reload=False)
+            self.driver.get(url)
+            entry = self.tabs.add(query, self.base_handle, url)
             self.is_base_used = True
         else:
             print(f"[🔍] Searching for: {query} (new tab)")
             self.driver.execute_script("window.open('');")
             self.driver.switch_to.window(self.driver.window_handles[-1])
-            self.driver.get(f"https://www.google.com/search?q={query}")
-            self.tabs[query] = self.driver.current_window_handle
+            if self.blocker:
+                # Searches open in the foreground, so they load in full
+                self.blocker.unblock(self.driver.current_window_handle, reload=False)
+            self.driver.get(url)
+            entry = self.tabs.add(query, self.driver.current_window_handle, url)
+        # Over the budget, the least recently used query tab is closed and
+        # reopened the next time it is searched
+        self.lifecycle.track(entry)
 
         # Minimize after the search is done
-        self.driver.maximize_window()
+        if self.launch_profile.window_churn:
+            self.driver.maximize_window()
         self.driver.switch_to.window(self.driver.window_handles[-1])
 
     def list_tabs(self):
@@ -61,17 +100,16 @@ class ChromeTabManager:
         browsers = []
         browser_info = {"name": "google chrome", "windows": []}
         print("Currently opened tabs:")
-        for handle in self.driver.window_handles:
-            try:
-                self.driver.switch_to.window(handle)
-                title = self.driver.title or "Untitled"
-                browser_info["windows"].append(title.strip())
-                # browsers.append(browser_info)
-                print(f"  - {title.strip()}")
-            except:
-                continue  # In case a tab was closed manually mid-loop
-        time.sleep(0.5)
-        self.driver.minimize_window()
+        for tab in snapshot_tabs(self.driver):
+            title = tab.title or "Untitled"
+            browser_info["windows"].append(title.strip())
+            # browsers.append(browser_info)
+            print(f"  - {title.strip()}")
+        for entry in self.tabs:
+            if entry.suspended:
+                print(f"  - {entry.query} (suspended)")
+        if self.launch_profile.window_churn:
+            self.driver.minimize_window()
         return browsers
     
     def close_tab(self, keyword):
@@ -79,24 +117,41 @@ class ChromeTabManager:
             print("No browser session active. Search something first!")
             return
 
-        
-        keyword = keyword.lower()
-        for handle in self.driver.window_handles:
-            try:
-                self.driver.switch_to.window(handle)
-                time.sleep(0.5)
-                title = self.driver.title.lower()
-                if keyword in title:
-                    self.driver.close()
-                    print(f"Closed tab with title: {title}")
-                    self.driver.minimize_window()
+
+        tabs = snapshot_tabs(self.driver)
+        self.matcher.refresh(tabs)  # Only new or retitled tabs are reindexed
+        target_ids = self.matcher.select(keyword)
+        if not target_ids:
+            # Suspended queries have no tab to match by title
+            for entry in self.tabs.search(keyword):
+                if entry.suspended:
+                    self.tabs.remove(entry)
+                    print(f"Dropped suspended tab for query: {entry.query}")
                     return
-            except:
+            print(f"No tab with '{keyword}' found to close.")
+            return
+        titles = [self.matcher.title(t) for t in target_ids]
+        if len(target_ids) > 1 and not is_bulk(keyword):
+            print(f"'{keyword}' matches several tabs: " + ", ".join(titles))
+            return
+        closed = set(close_tabs(self.driver, target_ids, snapshot=tabs))
+        for target_id, title in zip(target_ids, titles):
+            if target_id not in closed:
+                print(f"Could not close tab with title: {title}")
                 continue
-        print(f"No tab with '{keyword}' found to close.")
+            entry = self.tabs.remove_handle(target_id)
+            if entry is not None:
+                self.lifecycle.forget(entry)
+            self.matcher.discard(target_id)
+            print(f"Closed tab with title: {title}")
+        if self.launch_profile.window_churn:
+            self.driver.minimize_window()
 
     def quit_browser(self):
         """Safely quit the browser if it exists"""
+        if self.blocker:
+            self.blocker.close()
+            self.blocker = None
         if self.driver:
             try:
                 self.driver.quit()
@@ -106,39 +161,50 @@ class ChromeTabManager:
         else:
             print("[ℹ️] No browser session to close.")
 
+def handle_command(manager, cmd):
+    """Run one REPL command; returns False when the user asked to exit"""
+    if cmd.lower().startswith("search "):
+        query = cmd[7:].strip()  # Extract query string after 'search '
+        if query:
+            manager.search(query)  # Pass single string, not list
+        else:
+            print("[⚠️] Please provide a search query.")
+
+    elif cmd.lower().startswith("close"):
+        keyword = cmd[len("close") :].strip()
+        if keyword:
+            manager.close_tab(keyword)
+        else:
+            manager.list_tabs()
+
+    elif cmd.lower() == "exit":
+        print("Exiting...")
+        return False
+
+    else:
+        print("[?] Unknown command. Try again.")
+    return True
+
+
 def main():
-    manager = ChromeTabManager()
+    # --trace [file.json] times every WebDriver call per command
+    trace, trace_path = trace_from_argv()
+    manager = ChromeTabManager(launch_profile_from_argv())
     print("\n[Chrome Tab Manager Ready]")
-    print("Commands:\n - search query\n - close\n - close keyword\n - exit\n")
-
-    while True:
-        try:
-            cmd = input(">>> ").strip()
-
-            if cmd.lower().startswith("search "):
-                query = cmd[7:].strip()  # Extract query string after 'search '
-                if query:
-                    manager.search(query)  # Pass single string, not list
-                else:
-                    print("[⚠️] Please provide a search query.")
-
-            elif cmd.lower().startswith("close"):
-                keyword = cmd[len("close") :].strip()
-                if keyword:
-                    manager.close_tab(keyword)
-                else:
-                    manager.list_tabs()
-
-            elif cmd.lower() == "exit":
-                print("Exiting...")
-                break
+    print("Commands:\n - search query\n - close\n - close keyword\n - close all keyword\n - close /regex/\n - stats\n - exit\n")
 
-            else:
-                print("[?] Unknown command. Try again.")
-        except KeyboardInterrupt:
-            break
+    # Commands queue up while the browser works, so the prompt never blocks
+    try:
+        execute = lambda cmd: handle_command(manager, cmd)
+        if trace:
+            execute = trace.wrap(execute)
+        AsyncCommandLoop(execute, prompt=">>> ", on_stats=trace.print_summary if trace else None).run()
+    except KeyboardInterrupt:
+        pass
 
     manager.quit_browser()
+    if trace:
+        trace.finish(trace_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import asyncio
+import concurrent.futures
+import sys
+import threading
+import time
+
+EXIT = object()
+
+
+class LatencyStats:
+    """Per-command latency samples, summarised on demand"""
+
+    def __init__(self):
+        self.samples = {}  # Maps command name to list of seconds
+
+    def record(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def summary(self):
+        rows = []
+        for name, values in sorted(self.samples.items()):
+            ordered = sorted(values)
+            rows.append({
+                "command": name,
+                "count": len(ordered),
+                "mean_ms": 1000 * sum(ordered) / len(ordered),
+                "p50_ms": 1000 * ordered[len(ordered) // 2],
+                "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max_ms": 1000 * ordered[-1],
+            })
+        return rows
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            print("No commands timed yet.")
+            return
+        print(f"{'command':<10}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for row in rows:
+            print(f"{row['command']:<10}{row['count']:>7}{row['mean_ms']:>10.1f}"
+                  f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}")
+
+
+def command_name(command):
+    """Bucket commands for latency stats: the first word, or 'open' for a bare query"""
+    word = command.split(" ", 1)[0].lower()
+    return word if word in ("close", "import", "search", "exit", "list", "top", "restore", "watch") else "open"
+
+
+class AsyncCommandLoop:
+    """Asyncio REPL that keeps accepting input while the browser is busy.
+
+    Lines typed at the prompt go onto a queue and are executed in order by
+    a single worker, which runs `execute(command)` on one dedicated thread
+    (WebDriver sessions are not thread-safe). The prompt never waits for a
+    page load, so opens, closes and lists pipeline; each one reports when
+    it finishes along with how long it took. `execute` returns False to
+    stop the loop. The built-in `stats` command prints latency figures
+    (plus anything `on_stats` prints) without queueing behind browser work.
+    Lines are read from `stdin` (a text stream) if given, else the terminal.
+    """
+
+    def __init__(self, execute, prompt="> ", on_stats=None, stdin=None):
+        self.execute = execute
+        self.prompt = prompt
+        self.on_stats = on_stats
+        self.stdin = stdin
+        self.stats = LatencyStats()
+        self._browser = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+
+    def run(self):
+        try:
+            asyncio.run(self._main())
+        except KeyboardInterrupt:
+            # Don't wait for the command in flight; the caller quits the browser
+            self._browser.shutdown(wait=False, cancel_futures=True)
+            raise
+        self._browser.shutdown(wait=True)
+
+    async def _main(self):
+        queue = asyncio.Queue()
+        worker = asyncio.create_task(self._worker(queue))
+        # Reading blocks until a line arrives, so it runs on a daemon thread
+        # rather than the loop's default executor, which asyncio.run() joins
+        # on the way out (that join is what kept Ctrl+C from exiting)
+        reader = threading.Thread(target=self._reader, args=(queue, asyncio.get_running_loop()),
+                                  name="prompt", daemon=True)
+        reader.start()
+        await worker
+
+    def _reader(self, queue, loop):
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+                return True
+            except RuntimeError:
+                return False  # The loop already finished
+
+        # A private reader over fd 0, not sys.stdin: a daemon thread blocked
+        # inside sys.stdin's buffer makes interpreter shutdown abort
+        stdin = self.stdin or open(sys.stdin.fileno(), closefd=False)
+        while True:
+            print(self.prompt, end="", flush=True)
+            line = stdin.readline()
+            if not line:
+                put(EXIT)
+                return
+            command = line.strip()
+            if not command:
+                continue
+            if command.lower() == "stats":
+                self.stats.print_summary()
+                if self.on_stats:
+                    self.on_stats()
+                continue
+            if not put(command) or command.lower() == "exit":
+                return
+
+    async def _worker(self, queue):
+        loop = asyncio.get_running_loop()
+        while True:
+            command = await queue.get()
+            if command is EXIT:
+                return
+            started = time.perf_counter()
+            try:
+                keep_going = await loop.run_in_executor(self._browser, self.execute, command)
+            except Exception as e:
+                print(f"[!] '{command}' failed: {e}")
+                keep_going = True
+            elapsed = time.perf_counter() - started
+            self.stats.record(command_name(command), elapsed)
+            if keep_going is False:
+                return
+            pending = queue.qsize()
+            suffix = f", {pending} queued" if pending else ""
+            print(f"[done] {command} ({elapsed * 1000:.0f} ms{suffix})")
@@ -0,0 +1,250 @@
+"""Drive a warm QueryTabManager without the interactive prompt.
+
+Batch mode reads commands from a file or stdin, one per line, and opens
+runs of consecutive plain queries together through open_queries(), so
+their tabs load concurrently instead of one driver.get() at a time:
+
+    python main.py --profile separate --batch queries.txt
+    producer | python main.py --profile separate --batch -
+
+The control server keeps the manager (and its browser) running and takes
+JSON requests on localhost:
+
+    python main.py --profile separate --serve
+    curl -s localhost:9321 -H "Authorization: Bearer $TOKEN" \\
+         -d '{"op": "open", "queries": ["rust traits", "python asyncio"]}'
+
+Requests are {"op": "open" | "import" | "list" | "close" | "command", ...}
+and replies are JSON with "ok", op-specific fields and the text the
+manager printed in "output". The address and a per-run token are written
+to CONTROL_FILE (readable only by the current user); send_request() reads
+it for you.
+"""
+import contextlib
+import http.server
+import io
+import json
+import os
+import secrets
+import threading
+import urllib.error
+import urllib.request
+
+from driver_cache import CACHE_DIR
+from supervisor import supervised
+
+DEFAULT_CONTROL_PORT = 9321
+CONTROL_FILE = os.path.join(CACHE_DIR, "control.json")
+DEFAULT_BATCH_CHUNK = 50  # Queries opened per open_queries() call in batch mode
+MAX_REQUEST_BYTES = 1 << 20
+
+
+def is_query_line(manager, line):
+    """True if a command line just opens a query (its first word isn't a command)"""
+    return line.partition(" ")[0].lower() not in manager.COMMANDS
+
+
+def run_batch(manager, lines, chunk=DEFAULT_BATCH_CHUNK):
+    """Run commands from an iterable of lines; returns False if one was 'exit'.
+
+    Blank lines and lines starting with # are skipped. Consecutive plain
+    queries are collected (up to `chunk`) and opened together; any other
+    command first flushes the queries before it, so order is preserved.
+    Like the prompt, a command that fails is reported and the batch
+    carries on.
+    """
+    pending = []
+
+    def flush():
+        if pending:
+            try:
+                supervised(manager, manager.open_queries, pending)
+            except Exception as e:
+                print(f"[!] opening {len(pending)} queries failed: {e}")
+            pending.clear()
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if is_query_line(manager, line):
+            pending.append(line)
+            if len(pending) >= chunk:
+                flush()
+            continue
+        flush()
+        try:
+            keep_going = manager.execute(line)
+        except Exception as e:
+            print(f"[!] '{line}' failed: {e}")
+            continue
+        if keep_going is False:
+            return False
+    flush()
+    return True
+
+
+class ControlError(Exception):
+    pass
+
+
+class ControlServer:
+    """Localhost HTTP endpoint running JSON requests against one manager.
+
+    Requests may arrive on several connections at once, but the browser
+    can only do one thing at a time, so they run one after another under
+    a lock; each one's printed output is captured into its reply.
+    """
+
+    def __init__(self, manager, host="127.0.0.1", port=DEFAULT_CONTROL_PORT, token=None,
+                 control_file=CONTROL_FILE):
+        self.manager = manager
+        self.token = token or secrets.token_urlsafe(24)
+        self.control_file = control_file
+        self._lock = threading.Lock()
+        self._server = http.server.ThreadingHTTPServer((host, port), _ControlHandler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self.address = "%s:%d" % self._server.server_address[:2]
+
+    def write_control_file(self):
+        os.makedirs(os.path.dirname(self.control_file) or ".", exist_ok=True)
+        fd = os.open(self.control_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"address": self.address, "token": self.token, "pid": os.getpid()}, f)
+
+    def serve_forever(self):
+        self.write_control_file()
+        print(f"Control server listening on http://{self.address} (token in {self.control_file}).")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._cleanup()
+
+    def start(self):
+        """Serve on a background thread; stop with close()"""
+        self.write_control_file()
+        thread = threading.Thread(target=self._server.serve_forever, name="control-server", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self._server.shutdown()
+        self._cleanup()
+
+    def _cleanup(self):
+        self._server.server_close()
+        try:
+            with open(self.control_file) as f:
+                if json.load(f).get("token") == self.token:
+                    os.remove(self.control_file)
+        except (OSError, ValueError):
+            pass
+
+    def handle(self, request):
+        """Run one request dict; returns the reply dict"""
+        if not isinstance(request, dict):
+            raise ControlError("request must be a JSON object")
+        op = request.get("op")
+        handler = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+        if handler is None:
+            raise ControlError(f"unknown op {op!r}; use open, import, list, close or command")
+        output = io.StringIO()
+        with self._lock, contextlib.redirect_stdout(output):
+            if op == "command":
+                reply = handler(request)  # manager.execute is supervised already
+            else:
+                reply = supervised(self.manager, handler, request)
+        reply["ok"] = True
+        reply["output"] = output.getvalue()
+        return reply
+
+    def op_open(self, request):
+        queries = request.get("queries")
+        if queries is None and "query" in request:
+            queries = [request["query"]]
+        if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+            raise ControlError("open needs 'query' or a list of 'queries'")
+        return {"opened": self.manager.open_queries(queries)}
+
+    def op_import(self, request):
+        # "url"/"query" imports one tab; "address" or "session" import in bulk
+        if "session" in request:
+            self.manager.import_session(request["session"] or None)
+        elif "address" in request:
+            self.manager.import_all(request["address"] or None)
+        elif request.get("url") or request.get("query"):
+            self.manager.import_tab(request.get("url") or request.get("query"))
+        else:
+            self.manager.import_all()
+        return {}
+
+    def op_list(self, request):
+        self.manager.sync_tabs()
+        return {"queries": [
+            {"query": entry.query, "url": entry.url, "suspended": entry.suspended}
+            for entry in self.manager.query_tabs
+        ]}
+
+    def op_close(self, request):
+        query = request.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise ControlError("close needs a 'query' (keyword, 'all <keyword>' or /regex/)")
+        return {"closed": bool(self.manager.close_tab(query.strip()))}
+
+    def op_command(self, request):
+        command = request.get("command")
+        if not isinstance(command, str) or not command.strip():
+            raise ControlError("command needs a 'command' string")
+        if command.strip().lower() == "exit":
+            raise ControlError("exit is not available over the control API")
+        self.manager.execute(command)
+        return {}
+
+
+class _ControlHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        owner = self.server.owner
+        if not secrets.compare_digest(self.headers.get("Authorization") or "", f"Bearer {owner.token}"):
+            return self._reply(401, {"ok": False, "error": "missing or wrong token"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                # rfile.read(-1) would wait for the client to close the connection
+                raise ControlError("invalid Content-Length")
+            if length > MAX_REQUEST_BYTES:
+                raise ControlError("request too large")
+            request = json.loads(self.rfile.read(length) or b"null")
+            reply = owner.handle(request)
+        except (ControlError, ValueError) as e:
+            return self._reply(400, {"ok": False, "error": str(e)})
+        except Exception as e:
+            return self._reply(500, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+        self._reply(200, reply)
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Keep the console for manager output
+
+
+def send_request(request, control_file=CONTROL_FILE, timeout=300):
+    """Send one request to a running control server and return its reply"""
+    with open(control_file) as f:
+        info = json.load(f)
+    http_request = urllib.request.Request(
+        f"http://{info['address']}/",
+        data=json.dumps(request).encode("utf-8"),
+        headers={"Authorization": f"Bearer {info['token']}", "Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        return json.load(e)
@@ -0,0 +1,143 @@
+import itertools
+import json
+import threading
+import urllib.request
+
+import websocket  # websocket-client, installed alongside selenium
+
+
+def debugger_address(driver):
+    """Return the host:port chromedriver exposes for the browser's DevTools"""
+    return driver.capabilities.get("goog:chromeOptions", {}).get("debuggerAddress")
+
+
+def browser_websocket_url(address, timeout=5):
+    """Look up the browser-level DevTools websocket for a debugger address"""
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as response:
+        return json.load(response)["webSocketDebuggerUrl"]
+
+
+class DevToolsError(Exception):
+    pass
+
+
+class DevToolsConnection:
+    """Minimal DevTools protocol client over a single websocket.
+
+    Commands are sent with send() and block until their reply arrives.
+    Events are dispatched on a background reader thread to callbacks
+    registered with on(method, callback).
+    """
+
+    def __init__(self, ws_url, timeout=10):
+        self.timeout = timeout
+        self._ws = websocket.create_connection(ws_url, timeout=timeout, suppress_origin=True)
+        self._ws.settimeout(None)  # The reader thread blocks until the next message
+        self._ids = itertools.count(1)
+        self._pending = {}  # Maps command id to [event, reply]
+        self._listeners = {}  # Maps event method to list of callbacks
+        self._lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="devtools-reader", daemon=True)
+        self._reader.start()
+
+    @classmethod
+    def for_address(cls, address, timeout=10):
+        return cls(browser_websocket_url(address, timeout), timeout)
+
+    def on(self, method, callback):
+        self._listeners.setdefault(method, []).append(callback)
+
+    def off(self, method, callback):
+        listeners = self._listeners.get(method, [])
+        if callback in listeners:
+            listeners.remove(callback)
+
+    def send(self, method, params=None, session_id=None):
+        message_id, waiter = self._submit(method, params, session_id)
+        return self._result(method, message_id, waiter)
+
+    def send_batch(self, method, params_list, session_id=None, session_ids=None):
+        """Send one command per params back to back, then collect the replies.
+
+        The commands are pipelined over the websocket, so N commands cost
+        about one round trip instead of N. session_ids, if given, sends
+        each command to its own target session. Returns one entry per
+        params: the result dict, or the DevToolsError that command failed with.
+        """
+        if session_ids is None:
+            session_ids = [session_id] * len(params_list)
+        submitted = [self._submit(method, params, sid) for params, sid in zip(params_list, session_ids)]
+        results = []
+        for message_id, waiter in submitted:
+            try:
+                results.append(self._result(method, message_id, waiter))
+            except DevToolsError as e:
+                results.append(e)
+        return results
+
+    def _submit(self, method, params, session_id):
+        message_id = next(self._ids)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        waiter = [threading.Event(), None]
+        with self._lock:
+            if self._closed:
+                raise DevToolsError("DevTools connection is closed")
+            self._pending[message_id] = waiter
+            self._ws.send(json.dumps(message))
+        return message_id, waiter
+
+    def _result(self, method, message_id, waiter):
+        if not waiter[0].wait(self.timeout):
+            with self._lock:
+                self._pending.pop(message_id, None)
+            raise DevToolsError(f"Timed out waiting for {method}")
+        reply = waiter[1]
+        if reply is None:
+            raise DevToolsError(f"Connection closed while waiting for {method}")
+        if "error" in reply:
+            raise DevToolsError(f"{method} failed: {reply['error'].get('message')}")
+        return reply.get("result", {})
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+        self._reader.join(timeout=1)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _read_loop(self):
+        while True:
+            try:
+                raw = self._ws.recv()
+            except Exception:
+                break
+            if not raw:
+                break
+            message = json.loads(raw)
+            if "id" in message:
+                with self._lock:
+                    waiter = self._pending.pop(message["id"], None)
+                if waiter:
+                    waiter[1] = message
+                    waiter[0].set()
+            else:
+                for callback in tuple(self._listeners.get(message.get("method"), ())):
+                    try:
+                        callback(message.get("params", {}))
+                    except Exception as e:
+                        print(f"[devtools] Listener for {message.get('method')} failed: {e}")
+        # Wake up anyone still waiting on a reply
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter[0].set()
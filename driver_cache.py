@@ -0,0 +1,54 @@
+import json
+import os
+
+from selenium import webdriver
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".monitor-chrome-tabs")
+DRIVER_CACHE_FILE = os.path.join(CACHE_DIR, "driver.json")
+
+
+def _load_cache():
+    try:
+        with open(DRIVER_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(data):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = DRIVER_CACHE_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, DRIVER_CACHE_FILE)
+
+
+def resolve_driver_path(refresh=False):
+    """Return a chromedriver path, reusing the last one found on disk.
+
+    ChromeDriverManager().install() queries the network for the latest
+    matching version on every call; once we have a binary that worked we
+    keep using it until Chrome rejects it.
+    """
+    if not refresh:
+        path = _load_cache().get("driver_path")
+        if path and os.path.isfile(path):
+            return path
+    path = ChromeDriverManager().install()
+    _save_cache({"driver_path": path})
+    return path
+
+
+def start_driver(options):
+    """Start a Chrome WebDriver using the cached driver path.
+
+    If Chrome was upgraded and the cached driver no longer matches, the
+    path is re-resolved once and the start retried.
+    """
+    try:
+        return webdriver.Chrome(service=Service(resolve_driver_path()), options=options)
+    except SessionNotCreatedException:
+        return webdriver.Chrome(service=Service(resolve_driver_path(refresh=True)), options=options)
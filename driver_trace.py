@@ -0,0 +1,213 @@
+"""Opt-in timing of every WebDriver remote command, grouped by REPL command.
+
+DriverTrace.install() wraps selenium's WebDriver.execute, the single
+method every remote call (switch_to.window, title, execute_cdp_cmd, ...)
+goes through, so each call is counted and timed against the REPL command
+that issued it. Nothing is wrapped until install() is called, so runs
+without tracing pay nothing.
+
+    python main.py --trace                # print a summary at exit
+    python main.py --trace trace.json     # also write Chrome trace events
+
+The JSON file loads in chrome://tracing or https://ui.perfetto.dev.
+"""
+import contextlib
+import json
+import sys
+import threading
+import time
+
+from command_loop import command_name
+
+TRACE_FLAG = "--trace"
+NO_COMMAND = "(none)"  # Remote calls made outside any REPL command, e.g. by background threads
+BUCKET_LIMITS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+DEFAULT_MAX_EVENTS = 200_000
+
+
+class _Timing:
+    """Count, total, max and a latency histogram for one kind of call"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_LIMITS_MS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        ms = seconds * 1000
+        for i, limit in enumerate(BUCKET_LIMITS_MS):
+            if ms < limit:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def histogram(self):
+        """Non-empty buckets as "<5ms:12" style labels"""
+        labels = [f"<{limit}ms" for limit in BUCKET_LIMITS_MS] + [f">={BUCKET_LIMITS_MS[-1]}ms"]
+        return " ".join(f"{label}:{n}" for label, n in zip(labels, self.buckets) if n)
+
+
+class DriverTrace:
+    """Per-command WebDriver call counts, timings and trace events"""
+
+    def __init__(self, max_events=DEFAULT_MAX_EVENTS):
+        self.max_events = max_events
+        self.commands = {}  # Maps command name to _Timing of whole commands
+        self.calls = {}  # Maps command name to {remote command: _Timing}
+        self.events = []  # Chrome trace events, capped at max_events
+        self.dropped_events = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._original_execute = None
+
+    def install(self):
+        """Start timing every remote call made by any selenium WebDriver"""
+        from selenium.webdriver.remote.webdriver import WebDriver
+
+        if self._original_execute is not None:
+            return self
+        original = self._original_execute = WebDriver.execute
+        trace = self
+
+        def execute(driver, driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return original(driver, driver_command, params)
+            finally:
+                trace._record_call(_call_name(driver_command, params), started, time.perf_counter())
+
+        WebDriver.execute = execute
+        return self
+
+    def uninstall(self):
+        from selenium.webdriver.remote.webdriver import WebDriver
+
+        if self._original_execute is not None:
+            WebDriver.execute = self._original_execute
+            self._original_execute = None
+
+    @contextlib.contextmanager
+    def command(self, name):
+        """Attribute remote calls made inside the block to command `name`"""
+        previous = getattr(self._local, "command", None)
+        self._local.command = name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            self._local.command = previous
+            with self._lock:
+                self.commands.setdefault(name, _Timing()).add(finished - started)
+                self._add_event(name, "command", started, finished)
+
+    def wrap(self, execute):
+        """Wrap a REPL execute(command) so each call is traced as one command"""
+        def traced(command):
+            with self.command(command_name(command)):
+                return execute(command)
+        return traced
+
+    def _record_call(self, call, started, finished):
+        command = getattr(self._local, "command", None) or NO_COMMAND
+        with self._lock:
+            self.calls.setdefault(command, {}).setdefault(call, _Timing()).add(finished - started)
+            self._add_event(call, "webdriver", started, finished, {"command": command})
+
+    def _add_event(self, name, category, started, finished, args=None):
+        if len(self.events) >= self.max_events:
+            self.dropped_events += 1
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (started - self._origin) * 1e6,
+            "dur": (finished - started) * 1e6,
+            "pid": 1,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def summary(self):
+        """One row per command: wall time, remote calls and time spent in them"""
+        with self._lock:
+            names = sorted(set(self.commands) | set(self.calls))
+            rows = []
+            for name in names:
+                timing = self.commands.get(name)
+                calls = self.calls.get(name, {})
+                remote_s = sum(t.total for t in calls.values())
+                rows.append({
+                    "command": name,
+                    "count": timing.count if timing else 0,
+                    "wall_ms": 1000 * timing.total if timing else None,
+                    "remote_calls": sum(t.count for t in calls.values()),
+                    "remote_ms": 1000 * remote_s,
+                    # Wall time not spent waiting on the driver: Python work and sleeps
+                    "local_ms": 1000 * (timing.total - remote_s) if timing else None,
+                    "calls": {
+                        call: {"count": t.count, "total_ms": 1000 * t.total, "max_ms": 1000 * t.max,
+                               "histogram": t.histogram()}
+                        for call, t in sorted(calls.items(), key=lambda item: -item[1].total)
+                    },
+                })
+        return rows
+
+    def print_summary(self, top_calls=5):
+        rows = self.summary()
+        if not rows:
+            print("No WebDriver calls traced yet.")
+            return
+        print(f"{'command':<10}{'count':>7}{'wall ms':>11}{'calls':>8}{'remote ms':>11}{'local ms':>10}")
+        for row in rows:
+            wall = f"{row['wall_ms']:>11.1f}" if row["wall_ms"] is not None else f"{'-':>11}"
+            local = f"{row['local_ms']:>10.1f}" if row["local_ms"] is not None else f"{'-':>10}"
+            print(f"{row['command']:<10}{row['count']:>7}{wall}{row['remote_calls']:>8}"
+                  f"{row['remote_ms']:>11.1f}{local}")
+            for call, stats in list(row["calls"].items())[:top_calls]:
+                print(f"    {call:<32}{stats['count']:>6} calls {stats['total_ms']:>9.1f} ms"
+                      f"  max {stats['max_ms']:.1f}  {stats['histogram']}")
+
+    def export(self, path):
+        """Write Chrome trace-event JSON (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        if self.dropped_events:
+            print(f"Trace event limit reached; {self.dropped_events} events were not recorded.")
+
+    def finish(self, path=None):
+        """Stop tracing, print the summary and write the trace file if asked"""
+        self.uninstall()
+        self.print_summary()
+        if path:
+            self.export(path)
+            print(f"Wrote trace events to {path}")
+
+
+def _call_name(driver_command, params):
+    """Remote command name, with the CDP method for executeCdpCommand"""
+    if driver_command == "executeCdpCommand" and params:
+        return f"cdp {params.get('cmd')}"
+    return driver_command
+
+
+def trace_from_argv(argv=None):
+    """(DriverTrace or None, export path or None) from a --trace [file] flag"""
+    argv = sys.argv[1:] if argv is None else argv
+    if TRACE_FLAG not in argv:
+        return None, None
+    i = argv.index(TRACE_FLAG)
+    path = argv[i + 1] if i + 1 < len(argv) and not argv[i + 1].startswith("-") else None
+    return DriverTrace().install(), path
@@ -0,0 +1,305 @@
+"""Offline stand-in for Chrome's DevTools endpoint.
+
+Serves /json/version, /json/list and a browser websocket speaking just
+enough of the Target domain to drive TabRegistry and ResourceBlocker
+without a real browser (auto-attached pages get session "S<targetId>").
+Tracing.start/end report the renderer_pids set by the test the way
+Chrome's TracingStartedInBrowser event does:
+
+    server = FakeDevToolsServer()
+    registry = TabRegistry(DevToolsConnection.for_address(server.address))
+    target_id = server.open_tab("https://www.google.com/search?q=python")
+"""
+import base64
+import hashlib
+import itertools
+import json
+import socket
+import socketserver
+import struct
+import threading
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def _recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("client went away")
+        data += chunk
+    return data
+
+
+def _read_frame(sock):
+    """Read one client frame; returns (opcode, payload)"""
+    first, second = _recv_exact(sock, 2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", _recv_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", _recv_exact(sock, 8))[0]
+    mask = _recv_exact(sock, 4) if second & 0x80 else None
+    payload = _recv_exact(sock, length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+def _frame(payload, opcode=0x1):
+    header = bytes([0x80 | opcode])
+    if len(payload) < 126:
+        header += bytes([len(payload)])
+    elif len(payload) < 1 << 16:
+        header += bytes([126]) + struct.pack(">H", len(payload))
+    else:
+        header += bytes([127]) + struct.pack(">Q", len(payload))
+    return header + payload
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+        head = request.split(b"\r\n\r\n", 1)[0].decode("latin-1")
+        lines = head.split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("upgrade", "").lower() == "websocket":
+            self._serve_websocket(headers)
+        else:
+            self._serve_http(path)
+
+    def _serve_http(self, path):
+        server = self.server.owner
+        if path.startswith("/json/version"):
+            body = {
+                "Browser": "FakeChrome/1.0",
+                "webSocketDebuggerUrl": f"ws://{server.address}/devtools/browser/fake",
+            }
+        elif path.startswith("/json/list") or path.rstrip("/") == "/json":
+            body = [
+                {
+                    "id": info["targetId"],
+                    "type": info["type"],
+                    "url": info["url"],
+                    "title": info["title"],
+                    "webSocketDebuggerUrl": f"ws://{server.address}/devtools/page/{info['targetId']}",
+                }
+                for info in server.target_infos()
+            ]
+        else:
+            self.request.sendall(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+            return
+        payload = json.dumps(body).encode()
+        self.request.sendall(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+            + payload
+        )
+
+    def _serve_websocket(self, headers):
+        server = self.server.owner
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()
+        ).decode()
+        self.request.sendall(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        client = _Client(self.request)
+        server._clients.append(client)
+        try:
+            while True:
+                opcode, payload = _read_frame(self.request)
+                if opcode == 0x8:
+                    client.send_raw(_frame(b"", 0x8))
+                    break
+                if opcode == 0x9:
+                    client.send_raw(_frame(payload, 0xA))
+                    continue
+                if opcode != 0x1:
+                    continue
+                server._handle_message(client, json.loads(payload))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            server._clients.remove(client)
+
+
+class _Client:
+    def __init__(self, sock):
+        self.sock = sock
+        self.discovering = False
+        self.auto_attach = False
+        self.wait_for_debugger = False
+        self.lock = threading.Lock()
+
+    def send_raw(self, data):
+        with self.lock:
+            self.sock.sendall(data)
+
+    def send(self, message):
+        self.send_raw(_frame(json.dumps(message).encode()))
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeDevToolsServer:
+    """In-process DevTools endpoint with scriptable tabs"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = _ThreadingServer((host, port), _Handler)
+        self._server.owner = self
+        self.address = "%s:%d" % self._server.server_address
+        self._targets = {}  # Maps target id to targetInfo dict
+        self._ids = itertools.count(1)
+        self._clients = []
+        self._lock = threading.Lock()
+        self.handlers = {}  # Extra method handlers: method -> fn(params, session_id)
+        self.renderer_pids = {}  # Maps target id to the renderer pid traces report
+        self.received = []  # Every command method received, in order
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        for client in list(self._clients):
+            try:
+                client.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Scripting helpers ------------------------------------------------
+
+    def target_infos(self):
+        with self._lock:
+            return [dict(info) for info in self._targets.values()]
+
+    def open_tab(self, url="about:blank", title="", target_type="page"):
+        target_id = "FAKE%04X" % next(self._ids)
+        info = {"targetId": target_id, "type": target_type, "url": url, "title": title or url, "attached": False}
+        with self._lock:
+            self._targets[target_id] = info
+            attaching = [client for client in self._clients if client.auto_attach]
+        self._broadcast("Target.targetCreated", {"targetInfo": dict(info)})
+        for client in attaching:
+            self._attach(client, info, client.wait_for_debugger)
+        return target_id
+
+    def navigate(self, target_id, url, title=""):
+        with self._lock:
+            info = self._targets[target_id]
+            info["url"] = url
+            info["title"] = title or url
+            info = dict(info)
+        self._broadcast("Target.targetInfoChanged", {"targetInfo": info})
+
+    def close_tab(self, target_id):
+        with self._lock:
+            if self._targets.pop(target_id, None) is None:
+                return False
+        self._broadcast("Target.targetDestroyed", {"targetId": target_id})
+        for client in list(self._clients):
+            if client.auto_attach:
+                self._send(client, "Target.detachedFromTarget", {"sessionId": "S" + target_id, "targetId": target_id})
+        return True
+
+    # Protocol ----------------------------------------------------------
+
+    def _broadcast(self, method, params):
+        for client in list(self._clients):
+            if client.discovering:
+                self._send(client, method, params)
+
+    def _send(self, client, method, params):
+        try:
+            client.send({"method": method, "params": params})
+        except OSError:
+            pass
+
+    def _tracing_started(self):
+        frames = []
+        for target_id, pid in dict(self.renderer_pids).items():
+            # A tab's main frame id is its target id; subframes name a parent
+            frames.append({"frame": target_id, "processId": pid})
+            frames.append({"frame": target_id + ".1", "parent": target_id, "processId": pid + 1})
+        return {"name": "TracingStartedInBrowser", "args": {"data": {"frames": frames}}}
+
+    def _attach(self, client, info, waiting):
+        self._send(client, "Target.attachedToTarget", {
+            "sessionId": "S" + info["targetId"],
+            "targetInfo": dict(info, attached=True),
+            "waitingForDebugger": waiting,
+        })
+
+    def _handle_message(self, client, message):
+        method = message.get("method")
+        params = message.get("params", {})
+        self.received.append(method)
+        reply = {"id": message["id"]}
+        if message.get("sessionId"):
+            reply["sessionId"] = message["sessionId"]
+        try:
+            if method in self.handlers:
+                reply["result"] = self.handlers[method](params, message.get("sessionId")) or {}
+            elif method == "Target.setDiscoverTargets":
+                reply["result"] = {}
+                client.send(reply)
+                client.discovering = params.get("discover", False)
+                if client.discovering:
+                    for info in self.target_infos():
+                        client.send({"method": "Target.targetCreated", "params": {"targetInfo": info}})
+                return
+            elif method == "Target.setAutoAttach":
+                with self._lock:
+                    # Each page is attached once: either here, or by open_tab
+                    existing = [dict(info) for info in self._targets.values()]
+                    client.wait_for_debugger = params.get("waitForDebuggerOnStart", False)
+                    client.auto_attach = params.get("autoAttach", False)
+                reply["result"] = {}
+                client.send(reply)
+                if client.auto_attach:
+                    # Pages that already exist are attached without pausing
+                    for info in existing:
+                        self._attach(client, info, False)
+                return
+            elif method == "Tracing.start":
+                reply["result"] = {}
+            elif method == "Tracing.end":
+                reply["result"] = {}
+                client.send(reply)
+                self._send(client, "Tracing.dataCollected", {"value": [self._tracing_started()]})
+                self._send(client, "Tracing.tracingComplete", {})
+                return
+            elif method == "Target.getTargets":
+                reply["result"] = {"targetInfos": self.target_infos()}
+            elif method == "Target.createTarget":
+                reply["result"] = {"targetId": self.open_tab(params.get("url", "about:blank"))}
+            elif method == "Target.closeTarget":
+                reply["result"] = {"success": self.close_tab(params["targetId"])}
+            else:
+                reply["error"] = {"code": -32601, "message": f"'{method}' wasn't found"}
+        except KeyError as e:
+            reply["error"] = {"code": -32602, "message": f"Invalid parameters: {e}"}
+        client.send(reply)
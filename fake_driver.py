@@ -0,0 +1,245 @@
+"""In-process stand-in for a Chrome WebDriver session.
+
+FakeWebDriver models window handles, titles and URLs, and supports the
+subset of Selenium and CDP calls the tab managers use. Every call counts as
+one WebDriver round trip and can be given an artificial latency, so
+benchmarks can compare code paths by round trips as well as wall time.
+"""
+import http.server
+import itertools
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter, OrderedDict
+
+from selenium.common.exceptions import NoSuchWindowException, WebDriverException
+
+
+def results_title(url):
+    """Title Google would show for a results URL"""
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.path == "/search":
+        query = urllib.parse.parse_qs(parsed.query).get("q", [""])[0]
+        return f"{query} - Google Search"
+    return url
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver._call("switchToWindow")
+        if handle not in self._driver.tabs:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self._driver.current = handle
+
+
+class _FakeTab:
+    __slots__ = ("url", "title", "loaded_at")
+
+    def __init__(self, url, title, loaded_at):
+        self.url = url
+        self.title = title
+        self.loaded_at = loaded_at
+
+
+class FakeWebDriver:
+    """Fake Selenium Chrome driver.
+
+    latency: seconds added to every WebDriver/CDP call.
+    load_time: seconds a new page reports its URL as title (loading).
+    results_server: optional FakeResultsServer; navigations then fetch the
+        page over HTTP and take the title from it.
+    launch_time: seconds relaunch() takes, like starting a new Chrome.
+
+    crash() kills the fake browser (optionally after some more calls):
+    every call then raises WebDriverException until relaunch().
+    """
+
+    def __init__(self, latency=0.0, load_time=0.0, results_server=None, launch_time=0.0):
+        self.latency = latency
+        self.load_time = load_time
+        self.results_server = results_server
+        self.launch_time = launch_time
+        self.crashed = False
+        self.crashes = 0
+        self._crash_countdown = None
+        self.round_trips = Counter()
+        self.tabs = OrderedDict()  # Maps handle to _FakeTab
+        self._ids = itertools.count(1)
+        self.switch_to = _SwitchTo(self)
+        self.capabilities = {}
+        self.service = None
+        self.current = self._new_tab("chrome://newtab/")
+
+    # Bookkeeping ----------------------------------------------------------
+
+    def _call(self, name):
+        self.round_trips[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self._crash_countdown is not None:
+            self._crash_countdown -= 1
+            if self._crash_countdown < 0:
+                self._crash_countdown = None
+                self.crashed = True
+                self.crashes += 1
+                self.tabs.clear()
+        if self.crashed:
+            raise WebDriverException("chrome not reachable")
+
+    def _new_tab(self, url):
+        handle = "%032X" % next(self._ids)
+        self.tabs[handle] = _FakeTab(url, "", 0.0)
+        self._load(handle, url)
+        return handle
+
+    def _load(self, handle, url):
+        tab = self.tabs[handle]
+        tab.url = url
+        if self.results_server is not None and url.startswith("http"):
+            tab.title = self.results_server.fetch_title(url)
+        else:
+            tab.title = results_title(url)
+        tab.loaded_at = time.monotonic() + self.load_time
+
+    def _current_tab(self):
+        tab = self.tabs.get(self.current)
+        if tab is None:
+            raise NoSuchWindowException("no such window: target window already closed")
+        return tab
+
+    def _title_of(self, tab):
+        return tab.title if time.monotonic() >= tab.loaded_at else tab.url
+
+    def crash(self, after_calls=0):
+        """Make the browser die after `after_calls` more successful calls"""
+        self._crash_countdown = after_calls
+
+    def relaunch(self):
+        """Bring the crashed browser back with a single new tab; returns self"""
+        if self.launch_time:
+            time.sleep(self.launch_time)
+        self.crashed = False
+        self._crash_countdown = None
+        self.tabs.clear()
+        self.current = self._new_tab("chrome://newtab/")
+        return self
+
+    def reset_counters(self):
+        self.round_trips.clear()
+
+    @property
+    def total_round_trips(self):
+        return sum(self.round_trips.values())
+
+    # WebDriver API --------------------------------------------------------
+
+    @property
+    def window_handles(self):
+        self._call("getWindowHandles")
+        return list(self.tabs)
+
+    @property
+    def current_window_handle(self):
+        self._call("getCurrentWindowHandle")
+        self._current_tab()
+        return self.current
+
+    @property
+    def title(self):
+        self._call("getTitle")
+        return self._title_of(self._current_tab())
+
+    @property
+    def current_url(self):
+        self._call("getCurrentUrl")
+        return self._current_tab().url
+
+    def get(self, url):
+        self._call("get")
+        self._current_tab()
+        self._load(self.current, url)
+
+    def execute_script(self, script, *args):
+        self._call("executeScript")
+        if script.startswith("window.open("):
+            url = args[0] if args else ""
+            self._new_tab(url or "about:blank")
+            return None
+        raise WebDriverException(f"FakeWebDriver cannot run script: {script}")
+
+    def close(self):
+        self._call("closeWindow")
+        self._current_tab()
+        del self.tabs[self.current]
+
+    def maximize_window(self):
+        self._call("maximizeWindow")
+
+    def minimize_window(self):
+        self._call("minimizeWindow")
+
+    def quit(self):
+        self._call("quit")
+        self.tabs.clear()
+
+    def execute_cdp_cmd(self, cmd, params):
+        self._call(cmd)
+        if cmd == "Target.getTargets":
+            return {"targetInfos": [
+                {"targetId": handle, "type": "page", "url": tab.url, "title": self._title_of(tab), "attached": True}
+                for handle, tab in self.tabs.items()
+            ]}
+        if cmd == "Target.createTarget":
+            return {"targetId": self._new_tab(params.get("url", "about:blank"))}
+        if cmd == "Target.closeTarget":
+            return {"success": self.tabs.pop(params["targetId"], None) is not None}
+        if cmd == "Page.navigate":
+            self._current_tab()
+            self._load(self.current, params["url"])
+            return {"frameId": self.current}
+        raise WebDriverException(f"FakeWebDriver does not implement {cmd}")
+
+
+class _ResultsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query).get("q", [""])[0]
+        results = "".join(
+            f'<div class="g"><a href="https://example.com/{i}"><h3>{query} result {i}</h3></a></div>'
+            for i in range(10)
+        )
+        body = f"<html><head><title>{query} - Google Search</title></head><body>{results}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeResultsServer:
+    """Local HTTP server that answers any /search?q= with a results page"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = http.server.ThreadingHTTPServer((host, port), _ResultsHandler)
+        self._server.daemon_threads = True
+        self.base_url = "http://%s:%d" % self._server.server_address
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def fetch_title(self, url):
+        # Serve every engine's results from here, keeping path and query
+        parsed = urllib.parse.urlsplit(url)
+        query = urllib.parse.quote(parsed.query, safe="=&+%")
+        with urllib.request.urlopen(f"{self.base_url}{parsed.path}?{query}", timeout=5) as response:
+            html = response.read().decode()
+        start = html.find("<title>") + len("<title>")
+        return html[start:html.find("</title>", start)]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,203 @@
+"""Launch settings that trade the full headed browser for lower cost per tab.
+
+Query tabs are mostly opened in the background and read later, so they
+don't need images, fonts or media, a visible window, or a complete page
+load before the next command runs. (A tab the user switches to gets its
+full page back.) A LaunchProfile bundles those choices:
+
+    default   today's behaviour: headed, full loads, window maximize/minimize
+    lite      headed, eager loads, heavy resources blocked, no window churn
+    headless  lite, in new-headless mode (for unattended runs)
+
+Pick one with --launch-profile NAME on main.py, chrome_tab_manager.py,
+updated_main.py or sharded_manager.py; chrome_bench.py compares them.
+"""
+import queue
+import sys
+import threading
+from collections import namedtuple
+
+from devtools import DevToolsConnection, debugger_address
+from tab_snapshot import handle_to_target_id
+
+LAUNCH_PROFILE_FLAG = "--launch-profile"
+
+# URL patterns for Network.setBlockedURLs: images, fonts and media are most
+# of a results page's bytes but nothing the tab manager reads
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+]
+
+# Content-setting prefs (2 = block). Images are left to the per-tab
+# blocker: a pref would also hide them in the tab the user is looking at
+BLOCKING_PREFS = {
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+}
+
+LaunchProfile = namedtuple(
+    "LaunchProfile", ["name", "headless", "page_load_strategy", "block_resources", "window_churn"]
+)
+
+LAUNCH_PROFILES = {
+    "default": LaunchProfile("default", False, None, False, True),
+    "lite": LaunchProfile("lite", False, "eager", True, False),
+    "headless": LaunchProfile("headless", True, "eager", True, False),
+}
+DEFAULT_LAUNCH_PROFILE = LAUNCH_PROFILES["default"]
+
+
+def apply_launch_profile(options, profile):
+    """Add a profile's switches and prefs to ChromeOptions before launch"""
+    if profile.headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1280,900")
+    if profile.page_load_strategy:
+        options.page_load_strategy = profile.page_load_strategy
+    if profile.block_resources:
+        options.add_experimental_option("prefs", dict(BLOCKING_PREFS))
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--mute-audio")
+    return options
+
+
+def launch_profile_from_argv(argv=None):
+    """The LaunchProfile named by --launch-profile NAME, else the default"""
+    argv = sys.argv[1:] if argv is None else argv
+    if LAUNCH_PROFILE_FLAG not in argv:
+        return DEFAULT_LAUNCH_PROFILE
+    i = argv.index(LAUNCH_PROFILE_FLAG)
+    name = argv[i + 1] if i + 1 < len(argv) else ""
+    if name not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown launch profile {name!r}; choose from {', '.join(LAUNCH_PROFILES)}")
+    return LAUNCH_PROFILES[name]
+
+
+def start_resource_blocker(driver, connection=None):
+    """ResourceBlocker on the driver's browser (reusing connection if given), or None"""
+    try:
+        if connection is not None:
+            return ResourceBlocker(connection)
+        address = debugger_address(driver)
+        if not address:
+            return None
+        return ResourceBlocker(DevToolsConnection.for_address(address), owns_connection=True)
+    except Exception as e:
+        print(f"Resource blocking unavailable ({e}); tabs load in full.")
+        return None
+
+
+class ResourceBlocker:
+    """Applies Network.setBlockedURLs to background tabs.
+
+    Browser-level Target.setAutoAttach pauses each new page until a
+    debugger resumes it, so the block list is in place before the first
+    request. The events arrive on the DevTools reader thread, which must
+    not wait on replies itself, so a worker thread configures and resumes
+    each paused tab. The blocker stays attached so that unblock() can
+    lift the list when a tab is brought to the front; unblock requests go
+    through the same worker, so they can't overtake a tab's block list.
+    """
+
+    def __init__(self, connection, patterns=BLOCKED_URL_PATTERNS, owns_connection=False):
+        self.connection = connection
+        self.owns_connection = owns_connection
+        self.patterns = list(patterns)
+        self._pending = queue.Queue()
+        # Worker-thread state
+        self._sessions = {}  # Maps page target id to its auto-attached session id
+        self._blocked = set()  # Target ids with the block list applied
+        self._foreground = set()  # Target ids unblocked before they were attached
+        self._worker = threading.Thread(target=self._run, name="resource-blocker", daemon=True)
+        self._worker.start()
+        connection.on("Target.attachedToTarget", self._on_attached)
+        connection.on("Target.detachedFromTarget", self._on_detached)
+        connection.send("Target.setAutoAttach", {
+            "autoAttach": True,
+            "waitForDebuggerOnStart": True,
+            "flatten": True,
+        })
+
+    def _on_attached(self, params):
+        info = params.get("targetInfo", {})
+        self._pending.put(("attached", params["sessionId"], info.get("targetId"), info.get("type"),
+                           params.get("waitingForDebugger", False)))
+
+    def _on_detached(self, params):
+        self._pending.put(("detached", params.get("sessionId"), params.get("targetId")))
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            if item[0] == "attached":
+                self._attached(*item[1:])
+            elif item[0] == "detached":
+                _, session_id, target_id = item
+                if self._sessions.get(target_id) == session_id:
+                    del self._sessions[target_id]
+                    self._blocked.discard(target_id)
+                    self._foreground.discard(target_id)
+            else:
+                _, target_id, reload, done = item
+                self._unblock(target_id, reload)
+                done.set()
+
+    def _attached(self, session_id, target_id, target_type, waiting):
+        try:
+            if target_type == "page":
+                self._sessions[target_id] = session_id
+                if target_id not in self._foreground:
+                    self.connection.send("Network.enable", session_id=session_id)
+                    self.connection.send("Network.setBlockedURLs", {"urls": self.patterns},
+                                         session_id=session_id)
+                    self._blocked.add(target_id)
+        except Exception:
+            pass  # Tab closed already, or the connection is gone
+        finally:
+            # Never leave a tab paused, whatever happened above
+            if waiting:
+                try:
+                    self.connection.send("Runtime.runIfWaitingForDebugger", session_id=session_id)
+                except Exception:
+                    pass
+
+    def _unblock(self, target_id, reload):
+        session_id = self._sessions.get(target_id)
+        if session_id is None:
+            self._foreground.add(target_id)  # Not attached yet: never block it
+            return
+        if target_id not in self._blocked:
+            return
+        self._blocked.discard(target_id)
+        try:
+            self.connection.send("Network.setBlockedURLs", {"urls": []}, session_id=session_id)
+            if reload:
+                self.connection.send("Page.reload", session_id=session_id)
+        except Exception:
+            pass
+
+    def unblock(self, handle, reload=True):
+        """Let a tab the user is about to look at load everything again.
+
+        With reload, a tab that was loaded blocked is reloaded so its
+        images and fonts show up; pass False for a tab about to navigate.
+        Returns once the worker has applied it.
+        """
+        done = threading.Event()
+        self._pending.put(("unblock", handle_to_target_id(handle), reload, done))
+        done.wait(self.connection.timeout)
+
+    def close(self):
+        self.connection.off("Target.attachedToTarget", self._on_attached)
+        self.connection.off("Target.detachedFromTarget", self._on_detached)
+        try:
+            self.connection.send("Target.setAutoAttach", {"autoAttach": False, "waitForDebuggerOnStart": False})
+        except Exception:
+            pass
+        self._pending.put(None)
+        if self.owns_connection:
+            self.connection.close()
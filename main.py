@@ -1,65 +1,126 @@
+import argparse
+import contextlib
 import time
 import os
-import urllib.parse
-import psutil
 import subprocess
+import sys
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import WebDriverException
 
+from batch_open import open_tabs
+from browser_watch import BrowserWatcher, default_user_data_dir
+from bulk_import import devtools_tabs, extract_queries, session_tabs
+from command_loop import AsyncCommandLoop, LatencyStats, command_name
+from control_api import DEFAULT_CONTROL_PORT, ControlServer, run_batch
+from devtools import debugger_address
+from driver_cache import start_driver
+from driver_trace import DriverTrace
+from launch_profile import DEFAULT_LAUNCH_PROFILE, LAUNCH_PROFILES, apply_launch_profile, start_resource_blocker
+from resource_monitor import ResourceMonitor
+from search_urls import DEFAULT_ENGINE, build_search_url, normalize_query, query_from_url, query_key
+from session_daemon import SCRIPT_PROFILE_DIR, attach_session, find_chrome_executable
+from session_store import DEFAULT_JOURNAL, SessionStore
+from supervisor import Supervisor, supervised
+from tab_index import TabIndex
+from tab_lifecycle import DEFAULT_MAX_LIVE_TABS, TabLifecycle
+from tab_matcher import is_bulk, select_entries
+from tab_registry import TabRegistry
+from tab_snapshot import close_tabs, handle_to_target_id, snapshot_tabs
+from tab_watch import TabWatcher
+
+USAGE = "Query Tab Manager: Type a query to open a tab, 'close' to list queries, 'close <query>' to close the best-matching tab, 'close all <keyword>' or 'close /regex/' to close every match, 'import <query or URL>' to add existing tabs, 'import all [host:port]' or 'import session [profile dir]' to adopt tabs in bulk, 'top' (or 'top cpu') to rank tabs by cost, 'restore' to reopen suspended queries, 'watch' (or 'watch results', 'watch off') to report title/result changes, or 'exit' to quit."
+
+
 class QueryTabManager:
-    def __init__(self):
-        # Prompt user for profile choice
-        profile_choice = input("Do you want to use your default Chrome profile (requires closing all Chrome instances) or a separate profile? (default/separate): ").strip().lower()
-        
-        chrome_options = webdriver.ChromeOptions()
+    def __init__(self, max_live_tabs=DEFAULT_MAX_LIVE_TABS, max_memory_mb=None, engine=DEFAULT_ENGINE,
+                 session_path=DEFAULT_JOURNAL, launch_profile=DEFAULT_LAUNCH_PROFILE, profile_choice=None):
+        self.query_tabs = TabIndex()  # Tracked queries and their window handles
+        self.launch_profile = launch_profile
+        self.engine = engine
+        self.store = SessionStore(session_path) if session_path else None
         self.profile_dir = None
+        self.chrome_options = None
+
+        # Reuse the browser kept alive by session_daemon.py when there is one
+        self.driver, session = attach_session(launch_profile.page_load_strategy)
+        self.attached = self.driver is not None
+        if self.attached:
+            self.profile_dir = session.get("profileDir")  # Relaunched with this if the daemon's Chrome dies
+            self.start_tab_services(max_live_tabs, max_memory_mb)
+            self.restore_session()
+            print("To include existing tabs, use the 'import' command with a query or URL.")
+            return
+
+        # Prompt user for profile choice unless it was given up front
+        if profile_choice is None:
+            profile_choice = input("Do you want to use your default Chrome profile (requires closing all Chrome instances) or a separate profile? (default/separate): ").strip().lower()
+
         if profile_choice == "default":
             # Use default Chrome profile
+            self.browser_watcher = BrowserWatcher(default_user_data_dir())
             if self.is_chrome_running():
                 print("Please close all Chrome instances to use the default profile.")
                 self.wait_for_chrome_to_close()
-            self.profile_dir = os.path.join(os.getenv("LOCALAPPDATA"), "Google", "Chrome", "User Data")
-            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
-            chrome_options.add_argument("--profile-directory=Default")
+            self.profile_dir = self.browser_watcher.user_data_dir
             print("Using default Chrome profile. Google should be logged in if previously set up.")
         else:
             # Use or create a separate profile
-            self.profile_dir = os.path.join(os.getenv("LOCALAPPDATA"), "ChromeScriptProfile")
+            self.profile_dir = SCRIPT_PROFILE_DIR
             os.makedirs(self.profile_dir, exist_ok=True)
-            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
-            chrome_options.add_argument("--profile-directory=Default")
             print("Using separate Chrome profile. Checking Google login status...")
 
-        # Automatically install ChromeDriver
-        service = Service(ChromeDriverManager().install())
-        
-        # Initialize WebDriver
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.query_tabs = []  # List of (query, window_handle) tuples
-        
+        # Initialize WebDriver (driver path is cached after the first run)
+        self.driver = self.start_driver()
+
         # Check Google login for separate profile
         if profile_choice != "default":
             self.check_google_login()
         
         self.driver.get("chrome://newtab")  # Start with a blank page
+        self.start_tab_services(max_live_tabs, max_memory_mb)
+        self.restore_session()
         print("To include existing tabs, use the 'import' command with a query or URL.")
 
+    @classmethod
+    def from_driver(cls, driver, profile_dir=None, max_live_tabs=DEFAULT_MAX_LIVE_TABS, max_memory_mb=None,
+                    engine=DEFAULT_ENGINE, session_path=None, launch_profile=DEFAULT_LAUNCH_PROFILE):
+        """Manage tabs in an already started browser, skipping the profile prompt"""
+        manager = cls.__new__(cls)
+        manager.query_tabs = TabIndex()
+        manager.launch_profile = launch_profile
+        manager.engine = engine
+        manager.store = SessionStore(session_path) if session_path else None
+        manager.profile_dir = profile_dir
+        manager.chrome_options = None
+        manager.driver = driver
+        manager.attached = False
+        manager.start_tab_services(max_live_tabs, max_memory_mb)
+        manager.restore_session()
+        return manager
+
+    def build_chrome_options(self):
+        chrome_options = webdriver.ChromeOptions()
+        chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
+        chrome_options.add_argument("--profile-directory=Default")
+        return apply_launch_profile(chrome_options, self.launch_profile)
+
+    def start_driver(self):
+        # Options are built once and reused when relaunching after a crash
+        if self.chrome_options is None:
+            self.chrome_options = self.build_chrome_options()
+        return start_driver(self.chrome_options)
+
     def is_chrome_running(self):
-        """Check if any Chrome instances are running"""
-        for process in psutil.process_iter(['name']):
-            if process.info['name'].lower() == 'chrome.exe':
-                return True
-        return False
+        """Check if Chrome is running with the default profile"""
+        return self.browser_watcher.is_running()
 
     def wait_for_chrome_to_close(self):
         """Wait until all Chrome instances are closed"""
-        while self.is_chrome_running():
-            print("Waiting for Chrome instances to close... (Press Ctrl+C to cancel)")
-            time.sleep(2)
+        self.browser_watcher.wait_for_exit(
+            on_wait=lambda pids: print("Waiting for Chrome instances to close... (Press Ctrl+C to cancel)")
+        )
         print("All Chrome instances closed.")
 
     def check_google_login(self):
@@ -71,28 +132,22 @@ class QueryTabManager:
             if "sign in" in title or "log in" in title:
                 print("Google is not logged in. Selenium cannot sign in due to security restrictions.")
                 print(f"To log in, we will open Chrome with the separate profile ({self.profile_dir}).")
-                self.driver.quit()  # Close Selenium instance
-                self.manual_google_login()
-                # Reinitialize WebDriver after manual login
-                chrome_options = webdriver.ChromeOptions()
-                chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
-                chrome_options.add_argument("--profile-directory=Default")
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=chrome_options)
-                print("Resumed with logged-in profile.")
+                self.restart_after_manual_login()
             else:
                 print("Google appears to be logged in.")
         except WebDriverException as e:
             print(f"Error checking Google login: {e}. Attempting manual login.")
+            self.restart_after_manual_login()
+
+    def restart_after_manual_login(self):
+        """Close Selenium's Chrome, let the user log in by hand, then relaunch it"""
+        try:
             self.driver.quit()
-            self.manual_google_login()
-            # Reinitialize WebDriver
-            chrome_options = webdriver.ChromeOptions()
-            chrome_options.add_argument(f"--user-data-dir={self.profile_dir}")
-            chrome_options.add_argument("--profile-directory=Default")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            print("Resumed with logged-in profile.")
+        except WebDriverException:
+            pass  # Already gone
+        self.manual_google_login()
+        self.driver = self.start_driver()
+        print("Resumed with logged-in profile.")
 
     def manual_google_login(self):
         """Launch regular Chrome for manual Google login"""
@@ -112,32 +167,97 @@ class QueryTabManager:
 
     def find_chrome_executable(self):
         """Find Chrome executable path"""
-        possible_paths = [
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            os.path.join(os.getenv("PROGRAMFILES"), "Google", "Chrome", "Application", "chrome.exe"),
-            os.path.join(os.getenv("PROGRAMFILES(x86)"), "Google", "Chrome", "Application", "chrome.exe")
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        return None
+        return find_chrome_executable()
 
     def open_query(self, query):
+        query = normalize_query(query)
+        entry = self.query_tabs.get(query)
+        if entry is not None:
+            # Already tracked: bring its tab back (reopening it if suspended
+            # or closed by hand)
+            handle = self.bring_back(entry)
+            if handle is not None:
+                self.show_tab(handle)
+                print(f"Switched to tab for query: {entry.query}")
+            return
+
         # Reuse the initial tab if no queries exist, otherwise open a new tab
-        if not self.query_tabs and len(self.driver.window_handles) == 1:
+        if not self.attached and not self.query_tabs and len(self.driver.window_handles) == 1:
             handle = self.driver.window_handles[0]
-            self.driver.switch_to.window(handle)
         else:
             self.driver.execute_script("window.open('');")
             handle = self.driver.window_handles[-1]
-            self.driver.switch_to.window(handle)
+        self.show_tab(handle, loaded=False)
                   
         # Perform Google search for the query
-        self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}")
-        self.query_tabs.append((query, handle))
+        url = build_search_url(query, self.engine)
+        self.driver.get(url)
+        self.track_query(query, handle, url)
         print(f"Opened tab for query: {query}")
 
+    def open_queries(self, queries):
+        """Open many queries at once, loading their tabs concurrently in the background.
+
+        Queries beyond the max_live_tabs budget are tracked suspended
+        rather than opened and then immediately closed again.
+        """
+        pending = []
+        tabs = None  # One snapshot for checking tracked tabs, taken if needed
+        for query in queries:
+            query = normalize_query(query)
+            if not query:
+                continue
+            entry = self.query_tabs.get(query)
+            if entry is not None:
+                if tabs is None and not entry.suspended and not (self.registry and self.registry.alive):
+                    tabs = snapshot_tabs(self.driver)
+                self.bring_back(entry, tabs)
+            elif query not in pending:
+                pending.append(query)
+        # Only the newest queries that fit the live-tab budget get a tab;
+        # the rest are tracked suspended, like restored queries
+        live = pending[len(pending) - min(len(pending), self.lifecycle.max_live_tabs):]
+        for query in pending[:len(pending) - len(live)]:
+            self.track_query(query, None, build_search_url(query, self.engine))
+        urls = [build_search_url(query, self.engine) for query in live]
+        opened = 0
+        for query, url, handle in zip(live, urls, open_tabs(self.driver, urls)):
+            if handle:
+                self.track_query(query, handle, url)
+                opened += 1
+        message = f"Opened {opened} tabs" + (f" ({len(live) - opened} failed)" if opened < len(live) else "")
+        if len(live) < len(pending):
+            message += f"; {len(pending) - len(live)} more are suspended until used"
+        print(message + ".")
+        return opened
+
+    def show_tab(self, handle, loaded=True):
+        """Switch to a tab, first lifting background resource blocking on it.
+
+        A loaded tab is reloaded so the user sees its images and fonts;
+        pass loaded=False for a tab that is about to navigate anyway.
+        """
+        if self.blocker:
+            self.blocker.unblock(handle, reload=loaded)
+        self.driver.switch_to.window(handle)
+
+    def bring_back(self, entry, tabs=None):
+        """Return a tracked query's tab handle, reopening the tab if it is suspended or was closed by hand"""
+        if not entry.suspended and not self.is_tab_open(entry.handle, tabs):
+            # Closed since the last sync: reopen it like a suspended tab
+            self.lifecycle.forget(entry)
+            self.query_tabs.set_handle(entry, None)
+        return self.lifecycle.touch(entry)
+
+    def is_tab_open(self, handle, tabs=None):
+        """Ask the event registry, or else a snapshot (taken now unless given)"""
+        target_id = handle_to_target_id(handle)
+        if self.registry and self.registry.alive:
+            return self.registry.is_open(target_id)
+        if tabs is None:
+            tabs = snapshot_tabs(self.driver)
+        return any(tab.target_id == target_id for tab in tabs)
+
     def import_tab(self, input_str):
         # Handle user-provided query or URL
         input_str = input_str.strip()
@@ -147,112 +267,469 @@ class QueryTabManager:
             if not query:
                 query = input_str  # Fallback to URL as query
         else:
-            # Treat as a query
-            query = input_str
+            # Treat as a typed query, taken literally ("1+1" stays "1+1");
+            # only URLs are decoded, by extract_query_from_url
+            query = normalize_query(input_str)
         
         # Open the tab
         self.driver.execute_script("window.open('');")
         new_handle = self.driver.window_handles[-1]
-        self.driver.switch_to.window(new_handle)
-        self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}")
-        self.query_tabs.append((query, new_handle))
+        self.show_tab(new_handle, loaded=False)
+        url = build_search_url(query, self.engine)
+        self.driver.get(url)
+        self.track_query(query, new_handle, url)
         print(f"Imported tab for query: {query}")
 
+    def import_all(self, address=None):
+        """Adopt every search tab from our browser, or from another Chrome's DevTools address"""
+        if address is None:
+            tabs = snapshot_tabs(self.driver)
+        else:
+            try:
+                tabs = devtools_tabs(address)
+            except OSError as e:
+                print(f"Could not read tabs from {address}: {e}")
+                return
+        own = address is None or address == debugger_address(self.driver)
+        self.adopt_tabs(extract_queries(tabs), own)
+
+    def import_session(self, profile_dir=None):
+        """Adopt search tabs recorded in a profile's session file (Chrome may be closed)"""
+        profile_dir = profile_dir or os.path.join(default_user_data_dir(), "Default")
+        try:
+            tabs = session_tabs(profile_dir)
+        except (OSError, ValueError) as e:
+            print(f"Could not read session files in {profile_dir}: {e}")
+            return
+        self.adopt_tabs(extract_queries(tabs), own=False)
+
+    def adopt_tabs(self, found, own):
+        """Track (tab, query) pairs without reopening anything.
+
+        Tabs in our own browser are tracked by handle; tabs from elsewhere
+        become suspended entries that open when first used.
+        """
+        adopted = 0
+        for tab, query in found:
+            if own:
+                if self.query_tabs.has_handle(tab.target_id):
+                    continue
+                self.track_query(query, tab.target_id, tab.url)
+            else:
+                if query in self.query_tabs:
+                    continue
+                self.track_query(query, None, tab.url)
+            adopted += 1
+        where = "open tabs" if own else "suspended until used"
+        print(f"Imported {adopted} queries ({where}).")
+
     def extract_query_from_url(self, url):
-        # Extract query from Google search URL
-        if "google.com/search" in url:
-            parsed_url = urllib.parse.urlparse(url)
-            query_dict = urllib.parse.parse_qs(parsed_url.query)
-            return query_dict.get("q", [""])[0].replace("+", " ")
-        return None
-
-    def detect_manual_tabs(self):
+        # Extract query from a search results URL (cached per URL)
+        return query_from_url(url)
+
+    def start_tab_services(self, max_live_tabs, max_memory_mb):
+        """Set up the event registry, resource monitor and tab lifecycle"""
+        self.registry = self.start_registry()
+        connection = self.registry.connection if self.registry else None
+        self.monitor = ResourceMonitor(self.driver, self.query_tabs, connection)
+        self.monitor.start()
+        self.watcher = None
+        self.blocker = None
+        if self.launch_profile.block_resources:
+            self.blocker = start_resource_blocker(self.driver, connection)
+        self.lifecycle = TabLifecycle(self.driver, self.query_tabs, max_live_tabs,
+                                      max_memory_mb=max_memory_mb, memory_probe=self.monitor.total_rss)
+
+    def restore_session(self):
+        """Bring back last session's queries as suspended entries (no tabs opened)"""
+        if self.store is None:
+            return
+        restored = 0
+        for query, url in self.store.load():
+            if query not in self.query_tabs:
+                self.query_tabs.add(query, None, url)
+                restored += 1
+        if restored:
+            print(f"Restored {restored} queries from the last session. They reopen when used, or type 'restore' to open them now.")
+
+    def reopen_suspended(self):
+        """Open tabs for suspended queries in one batch, most recent first"""
+        pending = [entry for entry in self.query_tabs if entry.suspended]
+        pending = pending[::-1][:self.lifecycle.max_live_tabs]
+        if not pending:
+            print("No suspended queries to reopen.")
+            return
+        handles = open_tabs(self.driver, [entry.url for entry in pending])
+        for entry, handle in zip(pending, handles):
+            if handle:
+                self.query_tabs.set_handle(entry, handle)
+                self.lifecycle.track(entry)
+        print(f"Reopened {sum(1 for h in handles if h)} tabs.")
+
+    def track_query(self, query, handle, url):
+        """Start tracking a query's tab and journal it"""
+        entry = self.query_tabs.get(query)
+        if entry is not None and entry.suspended and handle is not None:
+            # A restored query whose tab is still open in the browser
+            self.query_tabs.set_handle(entry, handle)
+        else:
+            entry = self.query_tabs.add(query, handle, url)
+            if self.store:
+                self.store.record_open(query, url)
+        self.lifecycle.track(entry)
+        return entry
+
+    def untrack_query(self, entry):
+        self.lifecycle.forget(entry)
+        self.query_tabs.remove(entry)
+        if self.store and entry.query not in self.query_tabs:
+            self.store.record_close(entry.query)
+
+    def start_registry(self):
+        """Subscribe to DevTools target events so commands don't rescan tabs"""
+        try:
+            return TabRegistry.for_driver(self.driver)
+        except Exception as e:
+            print(f"Tab event registry unavailable ({e}); falling back to tab scans.")
+            return None
+
+    def sync_tabs(self):
+        """Bring query_tabs up to date with manually opened/closed tabs.
+
+        Returns a fresh tab snapshot when one had to be taken, or None when
+        the event registry already had everything.
+        """
+        if self.registry and self.registry.alive:
+            self.apply_registry_changes()
+            return None
+        tabs = snapshot_tabs(self.driver)
+        self.detect_manual_tabs(tabs)
+        self.update_query_list(tabs)
+        return tabs
+
+    def apply_registry_changes(self):
+        """Apply the target events seen since the last command"""
+        changes = self.registry.drain_changes()
+        if not changes:
+            return
+        for target_id, query in changes:
+            if not self.query_tabs.has_handle(target_id):
+                if query and self.registry.is_open(target_id):
+                    url = self.registry.targets.get(target_id, ("", ""))[0]
+                    self.track_query(query, target_id, url)
+                    print(f"Detected manually opened query: {query}")
+            elif not self.registry.is_open(target_id):
+                entry = self.query_tabs.by_handle(target_id)
+                self.untrack_query(entry)
+                print(f"Detected closed tab for query: {entry.query}")
+            else:
+                url = self.registry.targets.get(target_id, ("", ""))[0]
+                self.follow_navigation(self.query_tabs.by_handle(target_id), url)
+
+    def follow_navigation(self, entry, url):
+        """Re-key a tracked tab that moved to a different search.
+
+        Any other page (a result the user clicked, a page still loading)
+        keeps the tab tracked under its query by handle.
+        """
+        query = self.extract_query_from_url(url)
+        if not query or query_key(query) == query_key(entry.query):
+            return
+        self.untrack_query(entry)
+        self.track_query(query, entry.handle, url)
+        print(f"Tab for '{entry.query}' now shows query: {query}")
+
+    def detect_manual_tabs(self, tabs=None):
         """Detect new tabs opened manually in the Selenium instance"""
-        current_handles = self.driver.window_handles
-        known_handles = [handle for _, handle in self.query_tabs]
-        
-        for handle in current_handles:
-            if handle not in known_handles:
-                try:
-                    self.driver.switch_to.window(handle)
-                    url = self.driver.current_url
-                    # Check if it's a Google search URL
-                    if "google.com/search" in url:
-                        query = self.extract_query_from_url(url)
-                        if query and (query, handle) not in self.query_tabs:
-                            self.query_tabs.append((query, handle))
-                            print(f"Detected manually opened query: {query}")
-                except WebDriverException:
-                    continue
+        if tabs is None:
+            tabs = snapshot_tabs(self.driver)
+        for tab in tabs:
+            entry = self.query_tabs.by_handle(tab.target_id)
+            if entry is not None:
+                self.follow_navigation(entry, tab.url)
+            else:
+                # Check if it's a search results URL
+                query = self.extract_query_from_url(tab.url)
+                if query:
+                    self.track_query(query, tab.target_id, tab.url)
+                    print(f"Detected manually opened query: {query}")
 
-    def update_query_list(self):
+    def update_query_list(self, tabs=None):
         """Remove queries for tabs that were manually closed"""
-        valid_tabs = []
-        for query, handle in self.query_tabs:
-            try:
-                self.driver.switch_to.window(handle)
-                valid_tabs.append((query, handle))  # Tab is still open
-            except WebDriverException:
-                print(f"Detected closed tab for query: {query}")
-                continue
-        self.query_tabs = valid_tabs
+        if tabs is None:
+            tabs = snapshot_tabs(self.driver)
+        open_handles = {tab.target_id for tab in tabs}
+        for handle in list(self.query_tabs.handles()):
+            if handle not in open_handles:
+                entry = self.query_tabs.by_handle(handle)
+                self.untrack_query(entry)
+                print(f"Detected closed tab for query: {entry.query}")
 
     def list_queries(self):
-        self.detect_manual_tabs()  # Check for new manual tabs
-        self.update_query_list()  # Remove closed tabs
+        self.sync_tabs()  # Pick up manually opened/closed tabs
         if not self.query_tabs:
             print("No queries opened.")
             return
         print("\nOpened Queries:")
-        for i, (query, _) in enumerate(self.query_tabs, 1):
-            print(f"{i}. {query}")
+        for i, entry in enumerate(self.query_tabs, 1):
+            print(f"{i}. {entry.query}" + (" (suspended)" if entry.suspended else ""))
 
     def close_tab(self, query):
-        self.detect_manual_tabs()  # Update before closing
-        self.update_query_list()  # Ensure list is current
-        for q, handle in self.query_tabs:
-            if query.lower() == q.lower():
-                try:
-                    self.driver.switch_to.window(handle)
-                    self.driver.close()
-                    self.query_tabs.remove((q, handle))
-                    print(f"Closed tab for query: {query}")
-                    if self.driver.window_handles:  # Switch to first available tab
-                        self.driver.switch_to.window(self.driver.window_handles[0])
-                    return True
-                except WebDriverException as e:
-                    print(f"Error closing tab: {e}")
-                    return False
-        print(f"No tab found for query: {query}")
+        tabs = self.sync_tabs()  # Ensure list is current before closing
+        entry = self.query_tabs.get(query)
+        if entry is not None:
+            return self.close_entry(entry, tabs)
+        # "all <keyword>", /regex/ and globs close every match; a plain
+        # keyword closes the best-ranked (typo-tolerant) match if it is clear
+        entries = select_entries(self.query_tabs, query)
+        if not entries:
+            print(f"No tab found for query: {query}")
+            return False
+        if len(entries) > 1 and not is_bulk(query):
+            print(f"'{query}' matches several queries: " + ", ".join(entry.query for entry in entries))
+            return False
+        if len(entries) == 1:
+            return self.close_entry(entries[0], tabs)
+        return self.close_entries(entries, tabs)
+
+    def close_entries(self, entries, tabs=None):
+        """Close several tracked queries with one batch of Target.closeTarget calls.
+
+        Only queries whose tab actually closed (or that were suspended)
+        stop being tracked; the rest are reported and kept.
+        """
+        connection = self.registry.connection if self.registry and self.registry.alive else None
+        try:
+            closed = set(close_tabs(self.driver, [e.handle for e in entries if not e.suspended],
+                                    snapshot=tabs, connection=connection))
+        except WebDriverException as e:
+            print(f"Error closing tabs: {e}")
+            return False
+        done = [e for e in entries if e.suspended or handle_to_target_id(e.handle) in closed]
+        failed = [e for e in entries if e not in done]
+        for entry in done:
+            self.untrack_query(entry)
+        if done:
+            print(f"Closed {len(done)} tabs: " + ", ".join(entry.query for entry in done))
+        if failed:
+            print(f"Could not close {len(failed)} tabs: " + ", ".join(entry.query for entry in failed))
+        return not failed
+
+    def close_entry(self, entry, tabs=None):
+        """Close a tracked query's tab (if open) and stop tracking it"""
+        try:
+            if not entry.suspended and not close_tabs(self.driver, [entry.handle], snapshot=tabs):
+                print(f"Could not close tab for query: {entry.query}")
+                return False
+            self.untrack_query(entry)
+            print(f"Closed tab for query: {entry.query}")
+            return True
+        except WebDriverException as e:
+            print(f"Error closing tab: {e}")
+            return False
+
+    def stop_tab_services(self):
+        if getattr(self, "monitor", None):
+            self.monitor.stop()
+        if getattr(self, "watcher", None):
+            self.watcher.stop()
+            self.watcher = None
+        if getattr(self, "blocker", None):
+            self.blocker.close()
+            self.blocker = None
+        if getattr(self, "registry", None):
+            self.registry.close()
+            self.registry = None
+
+    def reset_driver(self, driver):
+        """Carry on with a new browser session (after a crash); tracked queries are kept"""
+        max_live_tabs, max_memory_mb = self.lifecycle.max_live_tabs, self.lifecycle.max_memory_mb
+        watching = self.watcher.hash_results if getattr(self, "watcher", None) else None
+        self.stop_tab_services()
+        self.driver = driver
+        self.start_tab_services(max_live_tabs, max_memory_mb)
+        if watching is not None and not self.start_watcher(watching):
+            print("Stopped watching tabs: the new browser's DevTools connection is unavailable.")
+
+    def quit(self):
+        self.stop_tab_services()
+        if getattr(self, "store", None):
+            self.store.close()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass  # Browser or chromedriver already gone
+
+
+    # First word of a command -> handler(arg). A handler returns None when the
+    # line isn't that command after all (e.g. "top 10 movies"), and the whole
+    # line is opened as a query instead.
+    COMMANDS = {
+        "exit": "cmd_exit",
+        "close": "cmd_close",
+        "top": "cmd_top",
+        "restore": "cmd_restore",
+        "import": "cmd_import",
+        "watch": "cmd_watch",
+    }
+
+    def execute(self, command):
+        """Run one REPL command; returns False once the manager has exited"""
+        return supervised(self, self.run_command, command)
+
+    def run_command(self, command):
+        command = command.strip()
+        word, _, arg = command.partition(" ")
+        handler = self.COMMANDS.get(word.lower())
+        result = getattr(self, handler)(arg.strip()) if handler else None
+        if result is None:
+            self.open_query(command)
+            return True
+        return result
+
+    def cmd_exit(self, arg):
+        if arg:
+            return None
+        self.quit()
+        print("Exiting.")
         return False
 
-    def run(self):
-        print("Query Tab Manager: Type a query to open a tab, 'close' to list queries, 'close <query>' to close a tab, 'import <query or URL>' to add existing tabs, or 'exit' to quit.")
+    def cmd_close(self, arg):
+        if arg:
+            self.close_tab(arg)
+        else:
+            self.list_queries()
+        return True
+
+    def cmd_top(self, arg):
+        if arg.lower() not in ("", "cpu"):
+            return None
+        self.sync_tabs()
+        self.monitor.print_top(sort_by="cpu" if arg.lower() == "cpu" else "rss")
+        return True
+
+    def cmd_restore(self, arg):
+        if arg:
+            return None
+        self.reopen_suspended()
+        return True
+
+    def start_watcher(self, hash_results):
+        """Watch tracked tabs over the registry's connection; False when it is unavailable"""
+        if not (self.registry and self.registry.alive):
+            return False
+        self.watcher = TabWatcher(self.registry.connection, self.query_tabs, hash_results=hash_results)
+        self.watcher.start()
+        return True
+
+    def cmd_watch(self, arg):
+        if arg.lower() not in ("", "results", "off"):
+            return None
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if arg.lower() == "off":
+            print("Stopped watching tabs.")
+            return True
+        if not self.start_watcher(arg.lower() == "results"):
+            print("Watching needs the DevTools connection, which is unavailable.")
+            return True
+        what = "titles, URLs and top results" if self.watcher.hash_results else "titles and URLs"
+        print(f"Watching {what} of {len(self.query_tabs)} query tabs; changes are printed as they happen.")
+        return True
+
+    def cmd_import(self, arg):
+        if not arg:
+            return None
+        sub, _, rest = arg.partition(" ")
+        if sub.lower() == "all":
+            self.import_all(rest.strip() or None)
+        elif sub.lower() == "session":
+            self.import_session(rest.strip() or None)
+        else:
+            self.import_tab(arg)
+        return True
+
+    def run(self, trace=None):
+        """Blocking prompt: each command finishes before the next is read"""
+        print(USAGE + " Type 'stats' for command timings.")
+        stats = LatencyStats()
+        execute = trace.wrap(self.execute) if trace else self.execute
         while True:
             command = input("> ").strip()
-            if command.lower() == "exit":
-                self.driver.quit()
-                print("Exiting.")
+            if command.lower() == "stats":
+                stats.print_summary()
+                if trace:
+                    trace.print_summary()
+                continue
+            started = time.perf_counter()
+            try:
+                keep_going = execute(command)
+            except Exception as e:
+                # The supervisor already recovered if the browser died;
+                # anything else fails this command, not the session
+                print(f"[!] '{command}' failed: {e}")
+                keep_going = True
+            stats.record(command_name(command), time.perf_counter() - started)
+            if not keep_going:
                 break
-            elif command.lower() == "close":
-                self.list_queries()
-            elif command.lower().startswith("close "):
-                query = command[6:].strip()
-                self.close_tab(query)
-            elif command.lower().startswith("import "):
-                input_str = command[7:].strip()
-                self.import_tab(input_str)
-            else:
-                self.open_query(command)
+
+    def run_async(self, trace=None):
+        """Like run(), but the prompt stays responsive while tabs load"""
+        print(USAGE + " Type 'stats' for command timings.")
+        execute = trace.wrap(self.execute) if trace else self.execute
+        AsyncCommandLoop(execute, on_stats=trace.print_summary if trace else None).run()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Open and track search query tabs in Chrome.")
+    parser.add_argument("--profile", choices=["default", "separate"],
+                        help="Chrome profile to use, instead of asking at startup")
+    parser.add_argument("--launch-profile", choices=sorted(LAUNCH_PROFILES), default=DEFAULT_LAUNCH_PROFILE.name,
+                        help="browser launch settings (see launch_profile.py)")
+    parser.add_argument("--max-live-tabs", type=int, default=DEFAULT_MAX_LIVE_TABS,
+                        help="open tabs kept before the least recently used are suspended")
+    parser.add_argument("--max-memory-mb", type=int, metavar="MB",
+                        help="also suspend tabs while renderer memory is above this many MB")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--sync", action="store_true", help="use the blocking prompt instead of the async one")
+    mode.add_argument("--batch", metavar="FILE", help="run commands from FILE ('-' for stdin), then exit")
+    mode.add_argument("--serve", nargs="?", type=int, const=DEFAULT_CONTROL_PORT, metavar="PORT",
+                      help=f"serve the JSON control API on localhost (default port {DEFAULT_CONTROL_PORT})")
+    parser.add_argument("--trace", nargs="?", const="", metavar="FILE",
+                        help="time every WebDriver call per command; optionally write Chrome trace JSON")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    # --trace [file.json] times every WebDriver call per command
+    trace = DriverTrace().install() if args.trace is not None else None
+    # Batch and server runs can't answer the profile prompt
+    profile_choice = args.profile or ("separate" if args.batch or args.serve is not None else None)
     try:
-        manager = QueryTabManager()
-        manager.run()
+        with trace.command("startup") if trace else contextlib.nullcontext():
+            manager = QueryTabManager(args.max_live_tabs, args.max_memory_mb,
+                                      launch_profile=LAUNCH_PROFILES[args.launch_profile],
+                                      profile_choice=profile_choice)
+        manager.supervisor = Supervisor(manager)
+        if args.batch:
+            with open(sys.stdin.fileno(), closefd=False) if args.batch == "-" else open(args.batch) as lines:
+                with trace.command("batch") if trace else contextlib.nullcontext():
+                    run_batch(manager, lines)
+        elif args.serve is not None:
+            ControlServer(manager, port=args.serve).serve_forever()
+        elif args.sync:
+            manager.run(trace)
+        else:
+            manager.run_async(trace)
+    except KeyboardInterrupt:
+        print("\nExiting.")
     except Exception as e:
         print(f"Error: {e}")
     finally:
         try:
-            manager.driver.quit()
+            manager.quit()
         except:
             pass
+        if trace:
+            trace.finish(args.trace or None)
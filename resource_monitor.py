@@ -0,0 +1,197 @@
+import threading
+
+import psutil
+
+from devtools import DevToolsError
+from tab_snapshot import handle_to_target_id
+
+DEFAULT_INTERVAL = 2.0
+
+
+def renderer_pids_for_targets(connection, timeout=5):
+    """Map page target ids to renderer PIDs using a very short trace.
+
+    Chrome doesn't report a tab's process directly, but the
+    TracingStartedInBrowser trace event lists every frame with its
+    processId, and a tab's main frame id equals its target id.
+    """
+    done = threading.Event()
+    frames = {}
+
+    def on_data(params):
+        for event in params.get("value", []):
+            if event.get("name") == "TracingStartedInBrowser":
+                for frame in event.get("args", {}).get("data", {}).get("frames", []):
+                    if not frame.get("parent") and frame.get("processId"):
+                        frames[frame["frame"]] = frame["processId"]
+
+    def on_complete(params):
+        done.set()
+
+    connection.on("Tracing.dataCollected", on_data)
+    connection.on("Tracing.tracingComplete", on_complete)
+    try:
+        connection.send("Tracing.start", {
+            "categories": "disabled-by-default-devtools.timeline",
+            "transferMode": "ReportEvents",
+        })
+        connection.send("Tracing.end")
+        done.wait(timeout)
+    finally:
+        connection.off("Tracing.dataCollected", on_data)
+        connection.off("Tracing.tracingComplete", on_complete)
+    return frames
+
+
+def chrome_renderer_pids(driver):
+    """Renderer PIDs under the chromedriver-launched browser (psutil tree walk)"""
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        children = root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return set()
+    pids = set()
+    for child in children:
+        try:
+            if "--type=renderer" in child.cmdline():
+                pids.add(child.pid)
+        except psutil.Error:
+            continue
+    return pids
+
+
+class ResourceMonitor:
+    """Samples RSS and CPU of the renderer behind each tracked query tab.
+
+    The tab -> PID map is rebuilt only when the set of tracked tabs
+    changes. A daemon thread checks for that and samples the mapped
+    processes every `interval` seconds through cached psutil.Process
+    objects (so cpu_percent covers the whole interval); total_rss(), which
+    the tab lifecycle's memory budget polls, and top() just read the
+    latest samples.
+    """
+
+    def __init__(self, driver, index, connection=None, interval=DEFAULT_INTERVAL):
+        self.driver = driver
+        self.index = index
+        self.connection = connection
+        self.interval = interval
+        self._tab_pids = {}  # Maps target id to renderer pid
+        self._processes = {}  # Maps pid to psutil.Process
+        self._samples = {}  # Maps pid to (rss_bytes, cpu_percent)
+        self._mapped_handles = frozenset()
+        self._map_failed = False  # Report a failing tab -> process mapping once, not every remap
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # Sampling thread and top() both remap
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_loop, name="resource-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh_mapping(self):
+        """Re-correlate tracked tabs with renderer processes; True if tabs had changed"""
+        with self._refresh_lock:
+            handles = frozenset(handle_to_target_id(h) for h in list(self.index.handles()))
+            if handles == self._mapped_handles:
+                return False
+            self._remap(handles)
+            return True
+
+    def _remap(self, handles):
+        tab_pids = {}
+        if self.connection is not None and not self.connection.closed:
+            try:
+                frames = renderer_pids_for_targets(self.connection)
+                tab_pids = {h: frames[h] for h in handles if h in frames}
+                self._map_failed = False
+            except DevToolsError as e:
+                if not self._map_failed:
+                    print(f"[monitor] Could not map tabs to processes: {e}")
+                self._map_failed = True
+        pids = set(tab_pids.values()) | chrome_renderer_pids(self.driver)
+        with self._lock:
+            self._tab_pids = tab_pids
+            for pid in list(self._processes):
+                if pid not in pids:
+                    del self._processes[pid]
+                    self._samples.pop(pid, None)
+            for pid in pids:
+                if pid not in self._processes:
+                    try:
+                        process = psutil.Process(pid)
+                        process.cpu_percent(None)  # Prime the CPU counter
+                        self._processes[pid] = process
+                    except psutil.Error:
+                        continue
+        self._mapped_handles = handles
+
+    def sample(self):
+        with self._lock:
+            processes = list(self._processes.items())
+        samples = {}
+        for pid, process in processes:
+            try:
+                with process.oneshot():
+                    samples[pid] = (process.memory_info().rss, process.cpu_percent(None))
+            except psutil.Error:
+                continue  # Renderer exited; the next refresh drops it
+        with self._lock:
+            self._samples = samples
+
+    def _sample_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_mapping()
+            except RuntimeError:
+                pass  # Tracked tabs changed mid-read; the next pass catches up
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def usage(self):
+        """Return rows sorted by RSS: (query or None, pid, rss_bytes, cpu_percent).
+
+        Renderers that couldn't be tied to a tracked query are reported
+        with query None so their cost still shows up.
+        """
+        # The sampling thread may not have seen these tabs (or run) yet
+        if self.refresh_mapping() or self._thread is None or not self._samples:
+            self.sample()
+        with self._lock:
+            tab_pids = dict(self._tab_pids)
+            samples = dict(self._samples)
+        rows = []
+        attributed = set()
+        for entry in self.index:
+            if entry.handle is None:
+                continue
+            pid = tab_pids.get(handle_to_target_id(entry.handle))
+            if pid in samples:
+                rows.append((entry.query, pid) + samples[pid])
+                attributed.add(pid)
+        for pid, sample in samples.items():
+            if pid not in attributed:
+                rows.append((None, pid) + sample)
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def total_rss(self):
+        with self._lock:
+            return sum(rss for rss, _ in self._samples.values())
+
+    def print_top(self, limit=10, sort_by="rss"):
+        rows = self.usage()
+        if sort_by == "cpu":
+            rows.sort(key=lambda row: row[3], reverse=True)
+        if not rows:
+            print("No renderer processes found.")
+            return
+        print(f"{'#':>3}  {'pid':>7} {'RSS MB':>8} {'CPU %':>6}  query")
+        for i, (query, pid, rss, cpu) in enumerate(rows[:limit], 1):
+            label = query if query is not None else "(unattributed)"
+            print(f"{i:>3}  {pid:>7} {rss / 2**20:>8.1f} {cpu:>6.1f}  {label}")
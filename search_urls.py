@@ -0,0 +1,70 @@
+import functools
+import re
+import urllib.parse
+
+# Maps engine name to (results URL, query parameter)
+ENGINES = {
+    "google": ("https://www.google.com/search", "q"),
+    "bing": ("https://www.bing.com/search", "q"),
+    "duckduckgo": ("https://duckduckgo.com/", "q"),
+}
+DEFAULT_ENGINE = "google"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PLUS_JOINED_RE = re.compile(r"\w\+\w")
+_GOOGLE_HOST_RE = re.compile(r"^(www\.)?google\.[a-z.]+$")
+URL_CACHE_SIZE = 4096
+
+
+def normalize_query(query, encoded=False):
+    """Canonical form of a query so "foo bar" and " foo  bar " match.
+
+    Typed text is taken literally, so "1+1" or "a+b" is searched as is.
+    Text lifted from a URL or an imported tab may still be form-encoded
+    ("foo+bar", "foo%20bar"); pass encoded=True to decode it first. A lone
+    "+" that doesn't join two words (as in "c++") is left alone.
+    """
+    if encoded:
+        if "%" in query or _PLUS_JOINED_RE.search(query):
+            query = urllib.parse.unquote_plus(query)
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def query_key(query):
+    """Case-insensitive dedupe key for a (normalized) query"""
+    return normalize_query(query).casefold()
+
+
+def build_search_url(query, engine=DEFAULT_ENGINE):
+    """Results URL for query, with the query properly percent-encoded"""
+    base, param = ENGINES[engine]
+    return f"{base}?{urllib.parse.urlencode({param: normalize_query(query)})}"
+
+
+def _engine_for(host, path):
+    host = host.lower()
+    if _GOOGLE_HOST_RE.match(host) and path == "/search":
+        return "google"
+    if host.endswith("bing.com") and path == "/search":
+        return "bing"
+    if host.endswith("duckduckgo.com") and path in ("/", ""):
+        return "duckduckgo"
+    return None
+
+
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
+def query_from_url(url):
+    """Return the normalized search query in a results URL, or None.
+
+    Cached, because tab detection sees the same URLs on every command.
+    """
+    if not url.startswith("http"):
+        return None
+    parsed = urllib.parse.urlsplit(url)
+    engine = _engine_for(parsed.hostname or "", parsed.path)
+    if engine is None:
+        return None
+    values = urllib.parse.parse_qs(parsed.query).get(ENGINES[engine][1])
+    if not values:
+        return None
+    return normalize_query(values[0]) or None
@@ -0,0 +1,162 @@
+"""Keep one Chrome alive between runs so the tab managers can reattach.
+
+Run `python session_daemon.py` once; it launches Chrome with a DevTools
+port, records the debugger address, and stays up until Chrome exits.
+main.py, chrome_tab_manager.py and updated_main.py then attach to that
+browser through `debuggerAddress` instead of launching their own.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import urllib.request
+
+from selenium.webdriver.chrome.options import Options
+
+from browser_watch import BrowserWatcher
+from driver_cache import CACHE_DIR, start_driver
+
+SESSION_FILE = os.path.join(CACHE_DIR, "session.json")
+SCRIPT_PROFILE_DIR = os.path.join(os.getenv("LOCALAPPDATA") or os.path.expanduser("~"), "ChromeScriptProfile")
+DEFAULT_PORT = 9222
+
+
+def find_chrome_executable():
+    """Find the Chrome executable on Windows, macOS or Linux"""
+    possible_paths = [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    ]
+    for env in ("PROGRAMFILES", "PROGRAMFILES(X86)", "LOCALAPPDATA"):
+        if os.getenv(env):
+            possible_paths.append(os.path.join(os.getenv(env), "Google", "Chrome", "Application", "chrome.exe"))
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+    for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def is_endpoint_alive(address, timeout=0.5):
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def read_session():
+    """Return the saved session if its browser is still answering, else None"""
+    try:
+        with open(SESSION_FILE) as f:
+            session = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not is_endpoint_alive(session.get("debuggerAddress", "")):
+        return None
+    return session
+
+
+def write_session(session):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = SESSION_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(session, f)
+    os.replace(tmp_path, SESSION_FILE)
+
+
+def clear_session():
+    try:
+        os.remove(SESSION_FILE)
+    except OSError:
+        pass
+
+
+def attach_driver(page_load_strategy=None):
+    """Attach a WebDriver to the daemon's Chrome, or return None if none is running.
+
+    Attached sessions only accept debuggerAddress (Chrome is already
+    running), so launch switches and experimental options are not applied.
+    """
+    return attach_session(page_load_strategy)[0]
+
+
+def attach_session(page_load_strategy=None):
+    """Like attach_driver, but return (driver, session) so callers keep the profile dir"""
+    session = read_session()
+    if session is None:
+        return None, None
+    driver = attach_to_address(session["debuggerAddress"], page_load_strategy)
+    print(f"Attached to running Chrome session at {session['debuggerAddress']}.")
+    return driver, session
+
+
+def attach_to_address(address, page_load_strategy=None):
+    """New WebDriver session on the Chrome whose DevTools listen at address"""
+    options = Options()
+    options.debugger_address = address
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    return start_driver(options)
+
+
+def run_daemon(profile_dir, port=DEFAULT_PORT):
+    if read_session():
+        print(f"A session is already running ({SESSION_FILE}).")
+        return 1
+    if BrowserWatcher(profile_dir).is_running():
+        print(f"Chrome is already using {profile_dir}; close it first.")
+        return 1
+    chrome_path = find_chrome_executable()
+    if not chrome_path:
+        print("Could not find Chrome executable. Please ensure Chrome is installed.")
+        return 1
+
+    os.makedirs(profile_dir, exist_ok=True)
+    address = f"127.0.0.1:{port}"
+    process = subprocess.Popen([
+        chrome_path,
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={profile_dir}",
+        "--profile-directory=Default",
+        "--no-first-run",
+        "--no-default-browser-check",
+    ])
+    deadline = time.monotonic() + 15
+    while not is_endpoint_alive(address):
+        if process.poll() is not None or time.monotonic() > deadline:
+            print("Chrome did not open its DevTools port.")
+            process.kill()
+            return 1
+        time.sleep(0.1)
+
+    write_session({"debuggerAddress": address, "pid": process.pid, "profileDir": profile_dir})
+    print(f"Chrome session ready at {address} (pid {process.pid}). Press Ctrl+C to stop.")
+    try:
+        process.wait()
+    except KeyboardInterrupt:
+        process.terminate()
+        process.wait()
+    finally:
+        clear_session()
+    print("Chrome session closed.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a Chrome session alive for the tab managers to reuse.")
+    parser.add_argument("--profile-dir", default=SCRIPT_PROFILE_DIR)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    return run_daemon(args.profile_dir, args.port)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
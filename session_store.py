@@ -0,0 +1,151 @@
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from driver_cache import CACHE_DIR
+from search_urls import query_key
+
+DEFAULT_JOURNAL = os.path.join(CACHE_DIR, "queries.jsonl")
+
+_sync = getattr(os, "fdatasync", os.fsync)
+
+
+def _try_lock(f):
+    """Take an exclusive, non-blocking lock on an open file; released when it is closed"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+class SessionStore:
+    """Append-only journal of opened and closed queries.
+
+    Each open/close appends one JSON line and syncs it, which costs one
+    small write per command instead of rewriting the whole session. When
+    the journal grows to compact_ratio times the number of live queries
+    (and at least min_compact lines), it is rewritten with just the live
+    queries and atomically swapped in. A torn final line from a crash is
+    cut off on load.
+
+    Only one process may write a journal: the first to load it holds
+    "<path>.lock" until close(). Another process (say --serve next to an
+    interactive run) still restores the queries, but doesn't journal its
+    own, since a compaction would swap the file under the owner's
+    append handle.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL, fsync=True, compact_ratio=4, min_compact=256):
+        self.path = path
+        self.fsync = fsync
+        self.compact_ratio = compact_ratio
+        self.min_compact = min_compact
+        self._live = {}  # Maps query key to (query, url), in open order
+        self._lines = 0
+        self._file = None
+        self._loaded = False
+        self._lock_file = None
+        self.owner = False  # Whether this process may write the journal
+
+    def _acquire(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock_file = open(self.path + ".lock", "a")
+        self.owner = _try_lock(self._lock_file)
+        if not self.owner:
+            self._lock_file.close()
+            print(f"Another tab manager is using {self.path}; this session's queries won't be saved.")
+
+    def load(self):
+        """Replay the journal; returns the live (query, url) pairs in open order"""
+        if self._lock_file is None:
+            self._acquire()
+        self._live = {}
+        self._lines = 0
+        self._loaded = True
+        good_end = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn write from a crash; drop it and anything after
+                    if not line.endswith(b"\n"):
+                        break
+                    good_end += len(line)
+                    self._lines += 1
+                    self._apply(record)
+                torn = f.seek(0, os.SEEK_END) != good_end
+        except FileNotFoundError:
+            return []
+        if torn and self.owner:
+            # Cut the partial record so new appends start on a clean line
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+        return list(self._live.values())
+
+    def _apply(self, record):
+        key = query_key(record["q"])
+        if record["op"] == "open":
+            self._live.pop(key, None)
+            self._live[key] = (record["q"], record.get("url"))
+        elif record["op"] == "close":
+            self._live.pop(key, None)
+
+    def record_open(self, query, url):
+        self._append({"op": "open", "q": query, "url": url})
+
+    def record_close(self, query):
+        if not self._loaded:
+            self.load()  # The query may have been opened in an earlier session
+        if query_key(query) in self._live:
+            self._append({"op": "close", "q": query})
+
+    def _append(self, record):
+        if not self._loaded:
+            self.load()  # Compaction must know about earlier queries
+        if not self.owner:
+            return
+        self._apply(record)
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if self.fsync:
+            _sync(self._file.fileno())
+        self._lines += 1
+        if self._lines >= max(self.min_compact, self.compact_ratio * len(self._live)):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the journal with only the live queries"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for query, url in self._live.values():
+                f.write(json.dumps({"op": "open", "q": query, "url": url}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp_path, self.path)
+        self._lines = len(self._live)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+            self.owner = False
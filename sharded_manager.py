@@ -0,0 +1,346 @@
+"""Spread query tabs over several Chrome instances.
+
+One Chrome with hundreds of tabs gets slow to scan and slow to drive, so
+ShardedQueryManager runs a pool of browsers, each with its own profile
+directory and its own QueryTabManager. A query always lives on the shard
+its key hashes to (unless it was picked up from another shard's tabs),
+open/close go only to that shard, and commands that need every shard
+(listing, syncing, restoring) run on all of them in parallel:
+
+    python sharded_manager.py --shards 3
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import os
+import sys
+import threading
+import zlib
+
+from selenium import webdriver
+
+from browser_watch import default_user_data_dir
+from bulk_import import devtools_tabs, extract_queries, session_tabs
+from command_loop import AsyncCommandLoop
+from devtools import debugger_address
+from driver_cache import CACHE_DIR, start_driver
+from launch_profile import DEFAULT_LAUNCH_PROFILE, LAUNCH_PROFILES, apply_launch_profile
+from main import USAGE, QueryTabManager
+from search_urls import DEFAULT_ENGINE, normalize_query, query_key
+from session_daemon import SCRIPT_PROFILE_DIR
+from tab_lifecycle import DEFAULT_MAX_LIVE_TABS
+from tab_matcher import contenders, is_bulk, rank_entries, select_entries
+
+DEFAULT_SHARDS = 2
+
+
+def shard_profile_dir(index):
+    """Profile directory for shard `index`; shard 0 shares the separate script profile"""
+    return SCRIPT_PROFILE_DIR if index == 0 else f"{SCRIPT_PROFILE_DIR}-{index}"
+
+
+def shard_journal(index):
+    return os.path.join(CACHE_DIR, f"queries-shard{index}.jsonl")
+
+
+def launch_shard_driver(profile_dir, launch_profile=DEFAULT_LAUNCH_PROFILE):
+    os.makedirs(profile_dir, exist_ok=True)
+    options = webdriver.ChromeOptions()
+    options.add_argument(f"--user-data-dir={profile_dir}")
+    options.add_argument("--profile-directory=Default")
+    apply_launch_profile(options, launch_profile)
+    driver = start_driver(options)
+    driver.get("chrome://newtab")
+    return driver
+
+
+class ShardedQueryManager:
+    """Routes query commands across a pool of QueryTabManager shards.
+
+    Each shard owns one WebDriver, and WebDriver sessions are not
+    thread-safe, so the thread pool only ever runs one task per shard at
+    a time; work for different shards overlaps. Output printed by shards
+    while running in parallel is captured and replayed in shard order.
+    """
+
+    def __init__(self, shards, max_workers=None):
+        if not shards:
+            raise ValueError("need at least one shard")
+        self.shards = list(shards)
+        self.closed = False
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers or len(self.shards), thread_name_prefix="shard"
+        )
+
+    @classmethod
+    def launch(cls, shard_count=DEFAULT_SHARDS, max_live_tabs=DEFAULT_MAX_LIVE_TABS, max_memory_mb=None,
+               engine=DEFAULT_ENGINE, driver_factory=launch_shard_driver, launch_profile=DEFAULT_LAUNCH_PROFILE):
+        """Start `shard_count` browsers in parallel, one profile directory each"""
+        def start(index):
+            profile_dir = shard_profile_dir(index)
+            return QueryTabManager.from_driver(
+                driver_factory(profile_dir, launch_profile), profile_dir, max_live_tabs, max_memory_mb, engine,
+                session_path=shard_journal(index), launch_profile=launch_profile,
+            )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=shard_count) as pool:
+            futures = [pool.submit(start, i) for i in range(shard_count)]
+            shards = []
+            try:
+                for future in futures:
+                    shards.append(future.result())
+            except Exception:
+                for future in futures:
+                    if future.exception() is None:
+                        future.result().quit()
+                raise
+        return cls(shards)
+
+    def home_shard(self, query):
+        """Shard a new query is opened on (stable for a given pool size)"""
+        key = query_key(query).encode("utf-8")
+        return self.shards[zlib.crc32(key) % len(self.shards)]
+
+    def shard_for(self, query):
+        """Shard tracking query, falling back to its home shard"""
+        for shard in self.shards:
+            if query in shard.query_tabs:
+                return shard
+        return self.home_shard(query)
+
+    def map_shards(self, fn):
+        """Run fn(shard) on every shard in parallel; returns results in shard order"""
+        # Shards print as they go; give each worker its own buffer and
+        # replay them in shard order so lines from different shards don't mix
+        output = _PerThreadOutput(sys.stdout)
+
+        def call(shard):
+            buffer = output.capture()
+            try:
+                return fn(shard), buffer
+            finally:
+                output.release()
+
+        with contextlib.redirect_stdout(output):
+            futures = [self.executor.submit(call, shard) for shard in self.shards]
+            concurrent.futures.wait(futures)
+        results = []
+        for future in futures:
+            if future.exception() is None:
+                result, buffer = future.result()
+                print(buffer.getvalue(), end="")
+                results.append(result)
+        for future in futures:
+            future.result()  # Re-raise the first shard failure, if any
+        return results
+
+    def sync(self):
+        self.map_shards(lambda shard: shard.sync_tabs())
+
+    def open_query(self, query):
+        query = normalize_query(query)
+        self.shard_for(query).open_query(query)
+
+    def import_tab(self, input_str):
+        input_str = input_str.strip()
+        query = None
+        if input_str.startswith("http"):
+            query = self.shards[0].extract_query_from_url(input_str)
+        self.shard_for(query or normalize_query(input_str)).import_tab(input_str)
+
+    def import_all(self, address=None):
+        """Adopt search tabs from every shard, or route another Chrome's to their home shards"""
+        if address is None:
+            self.map_shards(lambda shard: shard.import_all())
+            return
+        for shard in self.shards:
+            if address == debugger_address(shard.driver):
+                shard.import_all(address)
+                return
+        try:
+            tabs = devtools_tabs(address)
+        except OSError as e:
+            print(f"Could not read tabs from {address}: {e}")
+            return
+        self.adopt_tabs(extract_queries(tabs))
+
+    def import_session(self, profile_dir=None):
+        """Route search tabs from a profile's session file to their home shards"""
+        profile_dir = profile_dir or os.path.join(default_user_data_dir(), "Default")
+        try:
+            tabs = session_tabs(profile_dir)
+        except (OSError, ValueError) as e:
+            print(f"Could not read session files in {profile_dir}: {e}")
+            return
+        self.adopt_tabs(extract_queries(tabs))
+
+    def adopt_tabs(self, found):
+        """Track (tab, query) pairs from outside the pool as suspended entries"""
+        groups = {}  # Maps shard number to its (tab, query) pairs
+        for tab, query in found:
+            groups.setdefault(self.shards.index(self.shard_for(query)), []).append((tab, query))
+        if not groups:
+            print("Imported 0 queries (suspended until used).")
+        for i in sorted(groups):
+            self.shards[i].adopt_tabs(groups[i], own=False)
+
+    def entries(self):
+        """Merged (shard number, entry) view over every shard, in shard order"""
+        return [(i, entry) for i, shard in enumerate(self.shards) for entry in shard.query_tabs]
+
+    def list_queries(self):
+        self.sync()
+        entries = self.entries()
+        if not entries:
+            print("No queries opened.")
+            return
+        print("\nOpened Queries:")
+        for n, (i, entry) in enumerate(entries, 1):
+            print(f"{n}. {entry.query} [shard {i}]" + (" (suspended)" if entry.suspended else ""))
+
+    def close_tab(self, query):
+        self.sync()
+        for shard in self.shards:
+            entry = shard.query_tabs.get(query)
+            if entry is not None:
+                return shard.close_entry(entry)
+        if is_bulk(query):
+            # Close every match, one batch per shard
+            found = [(shard, select_entries(shard.query_tabs, query)) for shard in self.shards]
+            found = [(shard, entries) for shard, entries in found if entries]
+            if not found:
+                print(f"No tab found for query: {query}")
+                return False
+            results = [shard.close_entries(entries) for shard, entries in found]
+            return all(results)
+        # Plain keyword: the best-ranked match over every shard, if it is clear
+        matches = [match._replace(target_id=(shard, match.target_id))
+                   for shard in self.shards for match in rank_entries(shard.query_tabs, query)]
+        matches.sort(key=lambda match: (-match.score, not match.complete))
+        found = contenders(matches)
+        if not found:
+            print(f"No tab found for query: {query}")
+            return False
+        if len(found) > 1:
+            print(f"'{query}' matches several queries: " + ", ".join(m.target_id[1].query for m in found))
+            return False
+        shard, entry = found[0].target_id
+        return shard.close_entry(entry)
+
+    def print_top(self, sort_by):
+        self.sync()
+        for i, shard in enumerate(self.shards):
+            print(f"\nShard {i}:")
+            shard.monitor.print_top(sort_by=sort_by)
+
+    def quit(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.map_shards(lambda shard: shard.quit())
+        self.executor.shutdown()
+
+    # Same command table (and so the same commands) as a single manager
+    COMMANDS = QueryTabManager.COMMANDS
+
+    def execute(self, command):
+        """Run one REPL command; returns False once the manager has exited"""
+        return QueryTabManager.run_command(self, command)
+
+    def cmd_exit(self, arg):
+        if arg:
+            return None
+        self.quit()
+        print("Exiting.")
+        return False
+
+    def cmd_close(self, arg):
+        if arg:
+            self.close_tab(arg)
+        else:
+            self.list_queries()
+        return True
+
+    def cmd_top(self, arg):
+        if arg.lower() not in ("", "cpu"):
+            return None
+        self.print_top("cpu" if arg.lower() == "cpu" else "rss")
+        return True
+
+    def cmd_restore(self, arg):
+        if arg:
+            return None
+        self.map_shards(lambda shard: shard.reopen_suspended())
+        return True
+
+    def cmd_watch(self, arg):
+        if arg.lower() not in ("", "results", "off"):
+            return None
+        self.map_shards(lambda shard: shard.cmd_watch(arg))
+        return True
+
+    def cmd_import(self, arg):
+        # Same forms as main.py: import all [address], import session [dir], import <query or URL>
+        if not arg:
+            return None
+        sub, _, rest = arg.partition(" ")
+        if sub.lower() == "all":
+            self.import_all(rest.strip() or None)
+        elif sub.lower() == "session":
+            self.import_session(rest.strip() or None)
+        else:
+            self.import_tab(arg)
+        return True
+
+    def run_async(self):
+        print("Sharded " + USAGE + " Type 'stats' for command timings.")
+        AsyncCommandLoop(self.execute).run()
+
+
+class _PerThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in that keeps each capturing thread's writes apart"""
+
+    def __init__(self, target):
+        self.target = target
+        self.buffers = {}  # Maps thread id to io.StringIO
+
+    def capture(self):
+        buffer = self.buffers[threading.get_ident()] = io.StringIO()
+        return buffer
+
+    def release(self):
+        self.buffers.pop(threading.get_ident(), None)
+
+    def write(self, text):
+        return self.buffers.get(threading.get_ident(), self.target).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Manage query tabs across several Chrome instances.")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS, help="number of Chrome instances")
+    parser.add_argument("--launch-profile", choices=sorted(LAUNCH_PROFILES), default=DEFAULT_LAUNCH_PROFILE.name,
+                        help="browser launch settings (see launch_profile.py)")
+    parser.add_argument("--max-live-tabs", type=int, default=DEFAULT_MAX_LIVE_TABS,
+                        help="open tabs kept per shard before the least recently used are suspended")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    manager = None
+    try:
+        manager = ShardedQueryManager.launch(args.shards, args.max_live_tabs,
+                                             launch_profile=LAUNCH_PROFILES[args.launch_profile])
+        manager.run_async()
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        if manager is not None:
+            try:
+                manager.quit()
+            except Exception:
+                pass
@@ -0,0 +1,160 @@
+"""Notice a dead browser or chromedriver and carry on with a new one.
+
+Every REPL, batch and control-API command goes through supervised().
+Before each command the supervisor makes a local check that chromedriver's
+process is still running (no round trip); a command that fails with a
+connection-level error is followed by one cheap remote check
+(current_window_handle). If the browser really is gone, recover():
+
+  1. reattaches to the same Chrome if only chromedriver died and the
+     DevTools endpoint still answers, otherwise relaunches Chrome with the
+     manager's cached options and chromedriver path;
+  2. restarts the tab services (registry, monitor, blocker, lifecycle and
+     an active watch) on the new driver, keeping the in-memory TabIndex;
+  3. keeps tabs that survived (reattach case), marks the rest suspended
+     and reopens the newest ones concurrently with open_tabs;
+  4. retries the command once.
+
+Recovery time and restore throughput are measured by bench.py's "recover"
+step against FakeWebDriver.crash(); tests/test_supervisor.py covers the
+same path.
+"""
+import time
+
+import urllib3
+from selenium.common.exceptions import NoSuchWindowException, WebDriverException
+
+from batch_open import DEFAULT_MAX_CONCURRENT, open_tabs
+from devtools import debugger_address
+from session_daemon import attach_driver, attach_to_address, is_endpoint_alive
+from tab_snapshot import handle_to_target_id, snapshot_tabs
+
+# What a dead browser or chromedriver looks like to the caller
+RECOVERABLE = (WebDriverException, urllib3.exceptions.HTTPError, ConnectionError)
+DEFAULT_MAX_RESTARTS = 3  # Consecutive recoveries before giving up
+
+
+def driver_process_alive(driver):
+    """Local check that chromedriver is still running; True when unknown"""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return process is None or process.poll() is None
+
+
+def driver_alive(driver):
+    """One cheap round trip: does the session still answer?"""
+    if not driver_process_alive(driver):
+        return False
+    try:
+        driver.current_window_handle
+        return True
+    except NoSuchWindowException:
+        return True  # The focused tab was closed, but the browser answered
+    except RECOVERABLE:
+        return False
+
+
+def supervised(manager, fn, *args):
+    """Call fn through the manager's supervisor if it has one"""
+    supervisor = getattr(manager, "supervisor", None)
+    if supervisor is None:
+        return fn(*args)
+    return supervisor.call(fn, *args)
+
+
+class Supervisor:
+    """Restarts a QueryTabManager's browser and restores its query tabs.
+
+    relaunch() returns a fresh driver; by default it is the daemon's
+    browser for attached managers (or, if the daemon is gone, a new Chrome
+    on the daemon's profile) and manager.start_driver() otherwise.
+    """
+
+    def __init__(self, manager, relaunch=None, max_restarts=DEFAULT_MAX_RESTARTS,
+                 max_concurrent=DEFAULT_MAX_CONCURRENT):
+        self.manager = manager
+        self.relaunch = relaunch or self._default_relaunch
+        self.max_restarts = max_restarts
+        self.max_concurrent = max_concurrent
+        self.restarts = 0  # Consecutive recoveries without a successful command
+        self.recoveries = []  # (seconds, tabs reopened, tabs reattached) per recovery
+
+    def call(self, fn, *args):
+        if not driver_process_alive(self.manager.driver) and self.restarts < self.max_restarts:
+            self.recover()
+        try:
+            result = fn(*args)
+        except RECOVERABLE as e:
+            if self.restarts >= self.max_restarts or driver_alive(self.manager.driver):
+                raise
+            print(f"Browser connection lost ({type(e).__name__}); recovering...")
+            self.recover()
+            result = fn(*args)
+        self.restarts = 0
+        return result
+
+    def _default_relaunch(self):
+        manager = self.manager
+        if manager.attached:
+            driver = attach_driver(manager.launch_profile.page_load_strategy)
+            if driver is not None:
+                return driver
+            # The daemon's Chrome is gone (and the daemon with it): launch our
+            # own Chrome on the profile it was using
+            if not manager.profile_dir:
+                raise RuntimeError("The session daemon's Chrome is gone and its profile directory is unknown;"
+                                   " restart session_daemon.py and main.py.")
+            print(f"The session daemon's Chrome is gone; relaunching with its profile ({manager.profile_dir}).")
+            manager.attached = False
+        return manager.start_driver()
+
+    def _new_driver(self, old):
+        try:
+            address = debugger_address(old)
+        except Exception:
+            address = None
+        if address and is_endpoint_alive(address):
+            # Only chromedriver died; quitting the old session would close
+            # the browser we are about to reattach to
+            try:
+                return attach_to_address(address, self.manager.launch_profile.page_load_strategy)
+            except RECOVERABLE:
+                pass
+        try:
+            old.quit()
+        except Exception:
+            pass  # Already gone; this just reaps chromedriver
+        return self.relaunch()
+
+    def recover(self):
+        """Replace the dead driver and bring tracked tabs back; returns tabs reopened"""
+        self.restarts += 1
+        started = time.perf_counter()
+        manager = self.manager
+        # Newest live tabs first: they are the ones reopened if not all fit
+        was_live = [entry for entry in manager.query_tabs if entry.handle is not None][::-1]
+        manager.reset_driver(self._new_driver(manager.driver))
+
+        open_ids = {tab.target_id for tab in snapshot_tabs(manager.driver)}
+        reattached, lost = [], []
+        for entry in was_live:
+            if handle_to_target_id(entry.handle) in open_ids:
+                reattached.append(entry)
+            else:
+                manager.query_tabs.set_handle(entry, None)
+                lost.append(entry)
+        for entry in reversed(reattached):
+            manager.lifecycle.track(entry)
+
+        pending = lost[:max(0, manager.lifecycle.max_live_tabs - len(reattached))]
+        handles = open_tabs(manager.driver, [entry.url for entry in pending], self.max_concurrent)
+        reopened = 0
+        for entry, handle in reversed(list(zip(pending, handles))):
+            if handle:
+                manager.query_tabs.set_handle(entry, handle)
+                manager.lifecycle.track(entry)
+                reopened += 1
+        elapsed = time.perf_counter() - started
+        self.recoveries.append((elapsed, reopened, len(reattached)))
+        print(f"Browser recovered in {elapsed * 1000:.0f} ms; reopened {reopened} tabs"
+              f" ({len(reattached)} still open, {len(lost) - reopened} left suspended).")
+        return reopened
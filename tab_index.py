@@ -0,0 +1,180 @@
+import bisect
+import re
+
+from search_urls import query_key
+from tab_snapshot import handle_to_target_id
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class TabEntry:
+    """One tracked query and the tab showing it.
+
+    handle is None while the tab is suspended; url is kept so the tab can
+    be reopened on demand.
+    """
+
+    __slots__ = ("query", "handle", "url")
+
+    def __init__(self, query, handle, url=None):
+        self.query = query
+        self.handle = handle
+        self.url = url
+
+    @property
+    def suspended(self):
+        return self.handle is None
+
+    def __iter__(self):
+        # Allows `for query, handle in index` like the old tuple list
+        yield self.query
+        yield self.handle
+
+    def __repr__(self):
+        return f"TabEntry({self.query!r}, {self.handle!r})"
+
+
+class TabIndex:
+    """Query <-> tab index with O(1) lookups by query or handle.
+
+    Keeps three views over the same entries:
+      - a normalized, case-folded query map for exact `close <query>`
+        lookups (so "Foo bar" and " foo  bar" are the same query)
+      - a handle map for pruning closed tabs and spotting untracked ones
+      - a token inverted index (plus a sorted token list for prefixes) so
+        keyword closes don't have to scan every query; tab_matcher ranks
+        its search() results
+    Iteration yields entries in the order they were added.
+    """
+
+    __slots__ = ("_entries", "_by_key", "_by_handle", "_tokens", "_sorted_tokens")
+
+    def __init__(self):
+        self._entries = {}  # Ordered set of TabEntry
+        self._by_key = {}  # Maps normalized, case-folded query to list of entries
+        self._by_handle = {}  # Maps target id to entry
+        self._tokens = {}  # Maps token to set of case-folded queries
+        self._sorted_tokens = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __contains__(self, query):
+        return query_key(query) in self._by_key
+
+    def add(self, query, handle, url=None):
+        entry = TabEntry(query, handle, url)
+        self._entries[entry] = None
+        key = query_key(query)
+        entries = self._by_key.get(key)
+        if entries is None:
+            self._by_key[key] = [entry]
+            for token in set(tokenize(query)):
+                keys = self._tokens.get(token)
+                if keys is None:
+                    self._tokens[token] = keys = set()
+                    bisect.insort(self._sorted_tokens, token)
+                keys.add(key)
+        else:
+            entries.append(entry)
+        if handle is not None:
+            self._by_handle[handle_to_target_id(handle)] = entry
+        return entry
+
+    def remove(self, entry):
+        if entry not in self._entries:
+            return False
+        del self._entries[entry]
+        if entry.handle is not None:
+            target_id = handle_to_target_id(entry.handle)
+            if self._by_handle.get(target_id) is entry:
+                del self._by_handle[target_id]
+        key = query_key(entry.query)
+        entries = self._by_key[key]
+        entries.remove(entry)
+        if not entries:
+            del self._by_key[key]
+            for token in set(tokenize(entry.query)):
+                keys = self._tokens[token]
+                keys.discard(key)
+                if not keys:
+                    del self._tokens[token]
+                    del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
+        return True
+
+    def set_handle(self, entry, handle):
+        """Point an entry at a different tab (None to mark it suspended)"""
+        if entry.handle is not None:
+            target_id = handle_to_target_id(entry.handle)
+            if self._by_handle.get(target_id) is entry:
+                del self._by_handle[target_id]
+        entry.handle = handle
+        if handle is not None:
+            self._by_handle[handle_to_target_id(handle)] = entry
+
+    def remove_handle(self, handle):
+        entry = self._by_handle.get(handle_to_target_id(handle))
+        if entry is not None:
+            self.remove(entry)
+        return entry
+
+    def get(self, query):
+        """Return the first entry for a query (case-insensitive), or None"""
+        entries = self._by_key.get(query_key(query))
+        return entries[0] if entries else None
+
+    def by_handle(self, handle):
+        return self._by_handle.get(handle_to_target_id(handle))
+
+    def has_handle(self, handle):
+        return handle_to_target_id(handle) in self._by_handle
+
+    def handles(self):
+        return self._by_handle.keys()
+
+    def search(self, keywords, similar=None):
+        """Return entries whose query has a word equal to, or starting with, each keyword token.
+
+        Any keyword may be a prefix ("pyth gen" matches "python generics"),
+        so half-typed closes still resolve without scanning every query.
+        similar(token, word), when given, also lets a token match the
+        indexed words it returns True for (typo tolerance); that scans the
+        token vocabulary, not every query.
+        """
+        tokens = tokenize(keywords)
+        if not tokens:
+            return []
+        candidate_sets = [self._token_keys(token, similar) for token in set(tokens)]
+        candidate_sets.sort(key=len)
+        keys = set(candidate_sets[0])
+        for other in candidate_sets[1:]:
+            keys &= other
+            if not keys:
+                return []
+        return [entry for key in sorted(keys) for entry in self._by_key[key]]
+
+    def _token_keys(self, token, similar):
+        keys = self._prefix_keys(token)
+        if similar is not None:
+            for word, word_keys in self._tokens.items():
+                if similar(token, word):
+                    keys |= word_keys
+        return keys
+
+    def _prefix_keys(self, prefix):
+        keys = set()
+        i = bisect.bisect_left(self._sorted_tokens, prefix)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(prefix):
+            keys |= self._tokens[self._sorted_tokens[i]]
+            i += 1
+        return keys
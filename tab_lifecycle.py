@@ -0,0 +1,114 @@
+import time
+from collections import OrderedDict
+
+from selenium.common.exceptions import WebDriverException
+
+from batch_open import create_tab
+from tab_snapshot import close_tabs
+
+DEFAULT_MAX_LIVE_TABS = 20
+
+
+class TabLifecycle:
+    """Suspends idle query tabs and reopens them when they're used again.
+
+    Live tabs are kept in least-recently-used order. Whenever the number
+    of live tabs goes over max_live_tabs (or a tab has been idle longer
+    than idle_timeout seconds, or memory_probe reports more than
+    max_memory_mb, when those are set), the least recently used tab is
+    closed and its entry keeps only the URL, with handle set to None. The
+    entry stays in the TabIndex, so list/close still see it; touch()
+    reopens it in the background when the user asks for that query again.
+
+    Suspending closes the tab rather than freezing it with
+    Page.setWebLifecycleState: execute_cdp_cmd only reaches the driver's
+    current tab, and a closed tab is what actually frees the renderer.
+    """
+
+    def __init__(self, driver, index, max_live_tabs=DEFAULT_MAX_LIVE_TABS, idle_timeout=None,
+                 max_memory_mb=None, memory_probe=None):
+        self.driver = driver
+        self.index = index
+        self.max_live_tabs = max_live_tabs
+        self.idle_timeout = idle_timeout
+        self.max_memory_mb = max_memory_mb
+        self.memory_probe = memory_probe  # Returns current renderer RSS in bytes
+        self._live = OrderedDict()  # Maps live TabEntry to last access time
+
+    def track(self, entry):
+        """Record that entry's tab was just opened or used"""
+        if entry.handle is not None:
+            self._live[entry] = time.monotonic()
+            self._live.move_to_end(entry)
+        self.enforce(keep=entry)
+
+    def touch(self, entry):
+        """Mark entry as used, reopening its tab first if it was suspended.
+
+        Returns the tab's handle, or None if the tab could not be reopened
+        (the entry then stays suspended).
+        """
+        if entry.suspended:
+            handle = create_tab(self.driver, entry.url)
+            if handle is None:
+                print(f"Could not reopen tab for query: {entry.query}")
+                return None
+            self.index.set_handle(entry, handle)
+            print(f"Restored suspended tab for query: {entry.query}")
+        self.track(entry)
+        return entry.handle
+
+    def forget(self, entry):
+        self._live.pop(entry, None)
+
+    def suspend(self, entry):
+        if entry.suspended:
+            return
+        try:
+            close_tabs(self.driver, [entry.handle])
+        except WebDriverException as e:
+            print(f"Could not suspend tab for query {entry.query}: {e}")
+            return
+        self._live.pop(entry, None)
+        self.index.set_handle(entry, None)
+        print(f"Suspended idle tab for query: {entry.query}")
+
+    def enforce(self, keep=None):
+        """Suspend least recently used tabs until the budget is met.
+
+        Only the oldest entries are looked at, so this stays cheap when
+        the budget is already met.
+        """
+        victims = []
+        if self.idle_timeout is not None:
+            cutoff = time.monotonic() - self.idle_timeout
+            for entry, last_access in self._live.items():
+                if last_access >= cutoff:
+                    break  # Ordered by access time, so the rest are newer
+                if entry is not keep:
+                    victims.append(entry)
+        excess = len(self._live) - len(victims) - self.max_live_tabs
+        if excess > 0 or (not victims and self._over_memory_budget()):
+            # Memory samples lag behind, so that budget gives back one tab per check
+            excess = max(excess, 1)
+            for entry in self._live:
+                if excess <= 0:
+                    break
+                if entry is not keep and entry not in victims:
+                    victims.append(entry)
+                    if self._is_live(entry):
+                        excess -= 1
+        for entry in victims:
+            if self._is_live(entry):
+                self.suspend(entry)
+            else:
+                # Closed by other means since we last saw it
+                self._live.pop(entry, None)
+
+    def _is_live(self, entry):
+        return entry.handle is not None and self.index.by_handle(entry.handle) is entry
+
+    def _over_memory_budget(self):
+        if self.max_memory_mb is None or self.memory_probe is None:
+            return False
+        return self.memory_probe() > self.max_memory_mb * 2**20
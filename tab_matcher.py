@@ -0,0 +1,282 @@
+"""Ranked matching of close keywords against tab titles and URLs.
+
+TabMatcher caches the tokens and trigrams of every tab's title and URL
+and only re-tokenizes tabs whose title or URL changed since the last
+refresh. Titles are indexed without the " - Google Search" style suffix
+every results tab shares, so it can't make unrelated tabs match.
+
+A tab matches a keyword only if every keyword word is one of its words
+or a prefix of one ("close go" finds "golang generics"). Only when no
+tab matches that way are misspelt words allowed, by trigram similarity
+to the closest word, so "close pythn" still finds the Python tab. A
+trigram inverted index narrows each word down to the tabs that could
+match it before anything is scored.
+
+Tracked queries are already indexed by word in TabIndex, so
+rank_entries() and select_entries() apply the same rules to its
+entries, using TabIndex.search() to find candidates instead of keeping
+a second index over the same queries.
+"""
+import fnmatch
+import functools
+import re
+import urllib.parse
+from collections import namedtuple
+
+from search_urls import query_from_url
+from tab_index import tokenize
+
+PREFIX_CREDIT = 0.75  # Word score for a keyword word that is only a prefix of a tab word
+TYPO_MIN_SIMILARITY = 0.5  # Trigram (Dice) similarity for a misspelt word to count at all
+AMBIGUITY_MARGIN = 0.1  # Plain keywords scoring this close to the best one are ambiguous
+
+# Suffixes results pages add to every title (Google, Bing, DuckDuckGo)
+_ENGINE_SUFFIX_RE = re.compile(r"\s+(?:-\s+Google Search|-\s+Search|at DuckDuckGo)\s*$", re.IGNORECASE)
+
+# score: mean word score in [0, 1]; complete: the keyword is the tab's whole title
+Match = namedtuple("Match", ["score", "complete", "target_id"])
+_Doc = namedtuple("_Doc", ["title", "url", "title_text", "url_text", "tokens", "title_tokens", "grams"])
+
+
+def trigrams(text):
+    """Set of trigrams over the tokens of text, padded so short words count"""
+    padded = f" {' '.join(tokenize(text))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@functools.lru_cache(maxsize=4096)
+def _token_trigrams(token):
+    return frozenset(trigrams(token))
+
+
+def _similarity(a, b):
+    grams_a, grams_b = _token_trigrams(a), _token_trigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+def _url_text(url):
+    """The searchable part of a URL: its search query, or host and path"""
+    query = query_from_url(url)
+    if query:
+        return query
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.hostname or ""
+    return f"{host[4:] if host.startswith('www.') else host} {parsed.path}"
+
+
+def clean_title(title, url):
+    """A tab's title without the engine suffix; empty while it still shows its URL"""
+    if not title or title == url:
+        return ""
+    return _ENGINE_SUFFIX_RE.sub("", title).strip()
+
+
+def word_score(token, tokens, typos):
+    """Score of one keyword word against a tab's words: 1 exact, PREFIX_CREDIT, a typo score, or 0"""
+    if token in tokens:
+        return 1.0
+    if any(t.startswith(token) for t in tokens):
+        return PREFIX_CREDIT
+    if not typos:
+        return 0.0
+    best = max((_similarity(token, t) for t in tokens), default=0.0)
+    return best if best >= TYPO_MIN_SIMILARITY else 0.0
+
+
+def score(keyword_tokens, tokens, typos=False):
+    """Mean word score of a keyword against a tab, or 0 unless every word matched"""
+    if not keyword_tokens:
+        return 0.0
+    total = 0.0
+    for token in keyword_tokens:
+        s = word_score(token, tokens, typos)
+        if not s:
+            return 0.0
+        total += s
+    return total / len(keyword_tokens)
+
+
+def is_bulk(text):
+    """True for close arguments that mean every match: "all <keyword>", "/regex/" or a glob"""
+    text = text.strip()
+    return text.lower().startswith("all ") or compile_pattern(text) is not None
+
+
+def contenders(matches, margin=AMBIGUITY_MARGIN):
+    """The matches a plain keyword could mean, from a best-first list.
+
+    A keyword naming a tab's whole title picks that tab; otherwise every
+    match scoring within margin of the best one is a contender, and more
+    than one contender means the keyword is ambiguous.
+    """
+    if not matches:
+        return []
+    if matches[0].complete:
+        return [matches[0]]
+    return [m for m in matches if m.score >= matches[0].score - margin]
+
+
+def compile_pattern(text):
+    """Regex for "/regex/" or a glob containing * or ?, else None for plain keywords"""
+    if len(text) > 1 and text.startswith("/") and text.endswith("/"):
+        return re.compile(text[1:-1], re.IGNORECASE)
+    if "*" in text or "?" in text:
+        return re.compile(fnmatch.translate(text), re.IGNORECASE)
+    return None
+
+
+def _ranked(keyword_tokens, candidates, typos):
+    """Matches among (target_id, tokens, title_tokens, order) candidates, best first"""
+    keyword_set = frozenset(keyword_tokens)
+    ranked = []
+    for target_id, tokens, title_tokens, order in candidates:
+        s = score(keyword_tokens, tokens, typos)
+        if s:
+            # Ties go to the whole-title match, then the fewest unmatched words, then the older tab
+            complete = keyword_set == title_tokens
+            ranked.append((-s, not complete, len(title_tokens - keyword_set), order, target_id))
+    ranked.sort(key=lambda r: r[:4])
+    return [Match(-neg_score, not incomplete, target_id) for neg_score, incomplete, _, _, target_id in ranked]
+
+
+def _select(text, rank, matching):
+    text = text.strip()
+    close_all = text.lower().startswith("all ")
+    if close_all:
+        text = text[4:].strip()
+    pattern = compile_pattern(text)
+    if pattern is not None:
+        return matching(pattern)
+    if close_all:
+        return [match.target_id for match in rank(text, typos=False)]
+    return [match.target_id for match in contenders(rank(text))]
+
+
+def _is_typo(token, word):
+    return _similarity(token, word) >= TYPO_MIN_SIMILARITY
+
+
+def rank_entries(index, keyword, typos=True):
+    """Matches for keyword among a TabIndex's entries (as target_id), best first, like TabMatcher.rank()"""
+    keyword_tokens = tokenize(keyword)
+    if not keyword_tokens:
+        return []
+
+    def ranked(candidates, typos):
+        order = {entry: i for i, entry in enumerate(index)} if len(candidates) > 1 else {}
+        words = {entry: frozenset(tokenize(entry.query)) for entry in candidates}
+        return _ranked(keyword_tokens, ((entry, words[entry], words[entry], order.get(entry, 0))
+                                        for entry in candidates), typos)
+
+    matches = ranked(index.search(keyword), typos=False)
+    if not matches and typos:
+        matches = ranked(index.search(keyword, similar=_is_typo), typos=True)
+    return matches
+
+
+def select_entries(index, text):
+    """TabIndex entries a close command refers to, with the rules of TabMatcher.select()"""
+    return _select(text, lambda keyword, typos=True: rank_entries(index, keyword, typos),
+                   lambda pattern: [entry for entry in index if pattern.search(entry.query)])
+
+
+class TabMatcher:
+    """Title/URL index over open tabs, ranked by keyword similarity"""
+
+    __slots__ = ("_docs", "_by_gram")
+
+    def __init__(self):
+        self._docs = {}  # Maps target id to _Doc, in insertion order
+        self._by_gram = {}  # Maps trigram to set of target ids
+
+    def __len__(self):
+        return len(self._docs)
+
+    def update(self, target_id, title, url):
+        doc = self._docs.get(target_id)
+        if doc is not None and doc.title == title and doc.url == url:
+            return False
+        if doc is not None:
+            self.discard(target_id)
+        title_text = clean_title(title, url)
+        url_text = _url_text(url)
+        text = f"{title_text} {url_text}"
+        grams = frozenset(trigrams(text))
+        self._docs[target_id] = _Doc(title, url, title_text, url_text, frozenset(tokenize(text)),
+                                     frozenset(tokenize(title_text or url_text)), grams)
+        for gram in grams:
+            self._by_gram.setdefault(gram, set()).add(target_id)
+        return True
+
+    def discard(self, target_id):
+        doc = self._docs.pop(target_id, None)
+        if doc is None:
+            return
+        for gram in doc.grams:
+            ids = self._by_gram[gram]
+            ids.discard(target_id)
+            if not ids:
+                del self._by_gram[gram]
+
+    def refresh(self, tabs):
+        """Sync with a tab snapshot, reindexing only new or changed tabs"""
+        seen = set()
+        for tab in tabs:
+            seen.add(tab.target_id)
+            self.update(tab.target_id, tab.title, tab.url)
+        for target_id in [t for t in self._docs if t not in seen]:
+            self.discard(target_id)
+
+    def title(self, target_id):
+        return self._docs[target_id].title
+
+    def _candidates(self, keyword_tokens):
+        """Target ids that share a trigram with every keyword word (words under 2 letters don't narrow)"""
+        candidates = None
+        for token in keyword_tokens:
+            if len(token) < 2:
+                continue
+            ids = set()
+            for gram in _token_trigrams(token):
+                ids |= self._by_gram.get(gram, set())
+            candidates = ids if candidates is None else candidates & ids
+        return set(self._docs) if candidates is None else candidates
+
+    def rank(self, keyword, typos=True):
+        """Matches for keyword, best first.
+
+        Tabs matching every word exactly or by prefix come first and, if
+        there are any, alone; misspelt words are only tried (with typos)
+        when there are none.
+        """
+        keyword_tokens = tokenize(keyword)
+        if not keyword_tokens:
+            return []
+        candidates = self._candidates(keyword_tokens)
+        ranked = self._score(candidates, keyword_tokens, typos=False)
+        if not ranked and typos:
+            ranked = self._score(candidates, keyword_tokens, typos=True)
+        return ranked
+
+    def _score(self, candidates, keyword_tokens, typos):
+        order = {target_id: i for i, target_id in enumerate(self._docs)} if len(candidates) > 1 else {}
+        docs = ((target_id, self._docs[target_id]) for target_id in candidates)
+        return _ranked(keyword_tokens, ((target_id, doc.tokens, doc.title_tokens, order.get(target_id, 0))
+                                        for target_id, doc in docs), typos)
+
+    def matching(self, pattern):
+        """Target ids whose title (without engine suffix) or URL text matches a compiled pattern"""
+        return [
+            target_id for target_id, doc in self._docs.items()
+            if pattern.search(doc.title_text) or pattern.search(doc.url_text)
+        ]
+
+    def select(self, text):
+        """Target ids a close command refers to.
+
+        "all <keyword>" selects every tab matching all its words exactly
+        or by prefix, "/regex/" or a glob selects every tab whose title or
+        URL text matches, and a plain keyword selects its contenders: one
+        tab, or several when the keyword is ambiguous (see is_bulk()).
+        """
+        return _select(text, self.rank, self.matching)
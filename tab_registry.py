@@ -0,0 +1,74 @@
+import threading
+
+from devtools import DevToolsConnection, debugger_address
+from search_urls import query_from_url
+
+
+class TabRegistry:
+    """Keeps a live view of open tabs from DevTools target events.
+
+    Instead of rescanning every tab on each command, the registry subscribes
+    to Target.targetCreated / targetInfoChanged / targetDestroyed and updates
+    its state incrementally on the DevTools reader thread. Callers pull the
+    accumulated changes with drain_changes(), which is O(changes) rather
+    than O(tabs).
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.targets = {}  # Maps target id to (url, title) for open pages
+        self.queries = {}  # Maps target id to the search query shown in it
+        self._changes = []  # (target_id, query) pairs; query None means gone
+        self._lock = threading.Lock()
+        connection.on("Target.targetCreated", self._on_target_info)
+        connection.on("Target.targetInfoChanged", self._on_target_info)
+        connection.on("Target.targetDestroyed", self._on_target_destroyed)
+        # Chrome replays targetCreated for every existing target
+        connection.send("Target.setDiscoverTargets", {"discover": True})
+
+    @classmethod
+    def for_driver(cls, driver):
+        """Attach a registry to the browser behind a Selenium driver"""
+        address = debugger_address(driver)
+        if not address:
+            return None
+        return cls(DevToolsConnection.for_address(address))
+
+    @property
+    def alive(self):
+        return not self.connection.closed
+
+    def _on_target_info(self, params):
+        info = params["targetInfo"]
+        if info.get("type") != "page":
+            return
+        target_id = info["targetId"]
+        url = info.get("url", "")
+        query = query_from_url(url)
+        with self._lock:
+            self.targets[target_id] = (url, info.get("title", ""))
+            if query != self.queries.get(target_id):
+                if query:
+                    self.queries[target_id] = query
+                else:
+                    self.queries.pop(target_id, None)
+                self._changes.append((target_id, query))
+
+    def _on_target_destroyed(self, params):
+        target_id = params["targetId"]
+        with self._lock:
+            if self.targets.pop(target_id, None) is not None:
+                self.queries.pop(target_id, None)
+                self._changes.append((target_id, None))
+
+    def is_open(self, target_id):
+        return target_id in self.targets
+
+    def drain_changes(self):
+        """Return and clear the (target_id, query) changes seen since last call"""
+        with self._lock:
+            changes, self._changes = self._changes, []
+        return changes
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+from selenium.common.exceptions import WebDriverException
+
+# One open tab as reported by the browser. target_id doubles as the
+# Selenium window handle, so it can be passed straight to switch_to.window.
+TabInfo = namedtuple("TabInfo", ["target_id", "url", "title"])
+
+
+def handle_to_target_id(handle):
+    """Older chromedrivers prefix window handles with 'CDwindow-'"""
+    if handle and handle.startswith("CDwindow-"):
+        return handle[len("CDwindow-"):]
+    return handle
+
+
+def snapshot_tabs(driver):
+    """Return every open page tab in a single CDP round trip.
+
+    Unlike looping over window_handles with switch_to.window, this never
+    changes which tab the user is looking at.
+    """
+    try:
+        targets = driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+    except (AttributeError, WebDriverException):
+        return _snapshot_by_switching(driver)
+    return [
+        TabInfo(t["targetId"], t.get("url", ""), t.get("title", ""))
+        for t in targets
+        if t.get("type") == "page"
+    ]
+
+
+def _snapshot_by_switching(driver):
+    """Fallback for drivers without CDP access (O(N) round trips)"""
+    tabs = []
+    try:
+        original = driver.current_window_handle
+    except WebDriverException:
+        original = None
+    for handle in driver.window_handles:
+        try:
+            driver.switch_to.window(handle)
+            tabs.append(TabInfo(handle_to_target_id(handle), driver.current_url, driver.title))
+        except WebDriverException:
+            continue  # Tab was closed mid-loop
+    if original:
+        try:
+            driver.switch_to.window(original)
+        except WebDriverException:
+            pass
+    return tabs
+
+
+def close_tabs(driver, target_ids, snapshot=None, connection=None):
+    """Close the given tabs without switching to them first.
+
+    With a DevTools connection, all Target.closeTarget commands are sent
+    in one pipelined batch; otherwise they go one by one through the
+    driver. If the driver's current tab is among the closed ones, the
+    driver is moved to a surviving tab so the next command doesn't fail.
+    Returns the list of ids that were actually closed.
+    """
+    target_ids = [handle_to_target_id(t) for t in target_ids]
+    try:
+        current = handle_to_target_id(driver.current_window_handle)
+    except WebDriverException:
+        current = None  # Current tab is already gone
+
+    closed = []
+    if connection is not None and not connection.closed and len(target_ids) > 1:
+        try:
+            results = connection.send_batch(
+                "Target.closeTarget", [{"targetId": t} for t in target_ids]
+            )
+        except Exception:
+            results = [None] * len(target_ids)  # Connection went away; use the driver
+        retry = []
+        for target_id, result in zip(target_ids, results):
+            if isinstance(result, dict) and result.get("success", True):
+                closed.append(target_id)
+            else:
+                retry.append(target_id)
+        target_ids = retry
+
+    for target_id in target_ids:
+        try:
+            driver.execute_cdp_cmd("Target.closeTarget", {"targetId": target_id})
+            closed.append(target_id)
+        except (AttributeError, WebDriverException):
+            # No CDP access: fall back to the classic switch-and-close
+            try:
+                driver.switch_to.window(target_id)
+                driver.close()
+                closed.append(target_id)
+            except WebDriverException:
+                continue
+
+    if current is None or current in closed:
+        if snapshot is None:
+            snapshot = snapshot_tabs(driver)
+        remaining = [t.target_id for t in snapshot if t.target_id not in closed]
+        if remaining:
+            driver.switch_to.window(remaining[0])
+    return closed
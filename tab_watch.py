@@ -0,0 +1,189 @@
+"""Watch tracked query tabs and report when their title, URL or results change.
+
+Every poll reads all tabs' titles and URLs with a single Target.getTargets
+call on the DevTools connection, and compares them to the previous poll.
+With hash_results, the watcher also evaluates a small script in each tab
+(through its own DevTools session, so the focused tab never changes) to
+extract the top result titles and links, and keeps only an 8-byte digest
+of them. A tab whose results keep coming back unchanged is rechecked less
+and less often, up to max_interval; any change resets it to min_interval.
+Only changes are reported.
+"""
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+from devtools import DevToolsError
+from tab_snapshot import handle_to_target_id
+
+DEFAULT_MIN_INTERVAL = 5.0
+DEFAULT_MAX_INTERVAL = 300.0
+
+# Top result titles and links on Google, Bing and DuckDuckGo, one per line
+RESULTS_SCRIPT = """(() => {
+  const links = document.querySelectorAll(
+    '#search a:has(h3), #b_results h2 a, a[data-testid="result-title-a"]');
+  return Array.from(links).slice(0, 10)
+    .map(a => (a.innerText || '').trim() + '\\t' + a.href).join('\\n');
+})()"""
+
+TabChange = namedtuple("TabChange", ["query", "target_id", "field", "old", "new"])
+
+
+def digest(text):
+    """Compact 8-byte fingerprint of a result list"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def print_change(change):
+    if change.field == "results":
+        print(f"[watch] Results changed for '{change.query}'")
+    else:
+        label = "URL" if change.field == "url" else "Title"
+        print(f"[watch] {label} changed for '{change.query}': {change.old} -> {change.new}")
+
+
+class TabWatcher:
+    """Polls tracked tabs over DevTools and reports differences.
+
+    Runs on its own thread and only talks to the DevTools websocket
+    (never the WebDriver session, which belongs to the command thread).
+    """
+
+    def __init__(self, connection, index, hash_results=False, min_interval=DEFAULT_MIN_INTERVAL,
+                 max_interval=DEFAULT_MAX_INTERVAL, on_change=print_change):
+        self.connection = connection
+        self.index = index
+        self.hash_results = hash_results
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.on_change = on_change
+        self._state = {}  # Maps target id to [title, url, results digest or None]
+        self._schedule = {}  # Maps target id to [next results check, current interval]
+        self._sessions = {}  # Maps target id to attached DevTools session id
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll_loop, name="tab-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._detach(list(self._sessions))
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except DevToolsError as e:
+                if self.connection.closed:
+                    print(f"[watch] DevTools connection lost; stopped watching ({e}).")
+                    return
+            except RuntimeError:
+                pass  # Tracked tabs changed mid-snapshot; the next poll catches up
+            self._stop.wait(self.min_interval)
+
+    def _tracked(self):
+        """Maps target id to query for every open tracked tab"""
+        tracked = {}
+        for entry in self.index:
+            if entry.handle is not None:
+                tracked[handle_to_target_id(entry.handle)] = entry.query
+        return tracked
+
+    def poll(self, now=None):
+        """Take one snapshot, report and return the changes since the last one"""
+        now = time.monotonic() if now is None else now
+        tracked = self._tracked()
+        infos = self.connection.send("Target.getTargets")["targetInfos"]
+        changes = []
+        seen = set()
+        for info in infos:
+            target_id = info["targetId"]
+            query = tracked.get(target_id)
+            if query is None or info.get("type") != "page":
+                continue
+            seen.add(target_id)
+            title, url = info.get("title", ""), info.get("url", "")
+            state = self._state.get(target_id)
+            if state is None:
+                self._state[target_id] = [title, url, None]
+                self._schedule[target_id] = [now, self.min_interval]
+                continue
+            if title != state[0]:
+                changes.append(TabChange(query, target_id, "title", state[0], title))
+            if url != state[1]:
+                changes.append(TabChange(query, target_id, "url", state[1], url))
+            if title != state[0] or url != state[1]:
+                state[0], state[1] = title, url
+                self._schedule[target_id] = [now, self.min_interval]  # Page changed; recheck results now
+        self._forget([t for t in self._state if t not in seen])
+        if self.hash_results:
+            due = [t for t in seen if self._schedule[t][0] <= now]
+            changes.extend(self._check_results(due, tracked, now))
+        for change in changes:
+            self.on_change(change)
+        return changes
+
+    def _check_results(self, target_ids, tracked, now):
+        if not target_ids:
+            return []
+        self._attach([t for t in target_ids if t not in self._sessions])
+        target_ids = [t for t in target_ids if t in self._sessions]
+        results = self.connection.send_batch(
+            "Runtime.evaluate",
+            [{"expression": RESULTS_SCRIPT, "returnByValue": True}] * len(target_ids),
+            session_ids=[self._sessions[t] for t in target_ids],
+        )
+        changes = []
+        for target_id, result in zip(target_ids, results):
+            state, schedule = self._state[target_id], self._schedule[target_id]
+            if not isinstance(result, dict):
+                self._sessions.pop(target_id, None)  # Session died; reattach next time
+                schedule[0] = now + schedule[1]
+                continue
+            value = result.get("result", {}).get("value")
+            if not isinstance(value, str):
+                schedule[0] = now + schedule[1]  # Page still loading or script failed
+                continue
+            new = digest(value)
+            if state[2] is not None and new != state[2]:
+                changes.append(TabChange(tracked[target_id], target_id, "results", state[2], new))
+                schedule[1] = self.min_interval
+            else:
+                schedule[1] = min(schedule[1] * 2, self.max_interval)  # Idle: back off
+            state[2] = new
+            schedule[0] = now + schedule[1]
+        return changes
+
+    def _attach(self, target_ids):
+        if not target_ids:
+            return
+        results = self.connection.send_batch(
+            "Target.attachToTarget", [{"targetId": t, "flatten": True} for t in target_ids]
+        )
+        for target_id, result in zip(target_ids, results):
+            if isinstance(result, dict) and "sessionId" in result:
+                self._sessions[target_id] = result["sessionId"]
+
+    def _detach(self, target_ids):
+        sessions = [self._sessions.pop(t) for t in target_ids if t in self._sessions]
+        if sessions and not self.connection.closed:
+            self.connection.send_batch("Target.detachFromTarget", [{"sessionId": s} for s in sessions])
+
+    def _forget(self, target_ids):
+        for target_id in target_ids:
+            self._state.pop(target_id, None)
+            self._schedule.pop(target_id, None)
+        self._detach(target_ids)
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_devtools import FakeDevToolsServer  # noqa: E402
+from fake_driver import FakeWebDriver  # noqa: E402
+
+
+@pytest.fixture
+def devtools_server():
+    server = FakeDevToolsServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def driver():
+    return FakeWebDriver()
+
+
+@pytest.fixture
+def manager(driver):
+    """main.QueryTabManager on a FakeWebDriver, without a session journal"""
+    import main
+
+    manager = main.QueryTabManager.from_driver(driver)
+    yield manager
+    manager.quit()
+
+
+@pytest.fixture
+def wait_for():
+    """Poll a condition set by a background thread (DevTools events)"""
+    def wait(predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                raise AssertionError("condition not met in time")
+            time.sleep(0.01)
+    return wait
@@ -0,0 +1,82 @@
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from batch_open import open_tabs
+from fake_driver import FakeWebDriver
+
+URLS = [f"https://www.google.com/search?q=query+{i}" for i in range(5)]
+
+
+class WindowDriver(FakeWebDriver):
+    """Records how many pages were still loading whenever a tab was created"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loading_at_create = []
+        self.start_tab = self.current
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Target.createTarget":
+            now = time.monotonic()
+            self.loading_at_create.append(sum(1 for handle, tab in self.tabs.items()
+                                              if handle != self.start_tab and tab.loaded_at > now))
+        return super().execute_cdp_cmd(cmd, params)
+
+
+class NoCdpDriver(FakeWebDriver):
+    """A driver without CDP access, so tabs open through window.open"""
+
+    def execute_cdp_cmd(self, cmd, params):
+        self._call(cmd)
+        raise WebDriverException(f"FakeWebDriver does not implement {cmd}")
+
+
+def test_at_most_max_concurrent_loads_are_in_flight():
+    driver = WindowDriver(load_time=0.05)
+
+    started = time.monotonic()
+    open_tabs(driver, URLS, max_concurrent=2, wait=True, poll_interval=0.01)
+    elapsed = time.monotonic() - started
+
+    assert max(driver.loading_at_create) == 1  # A third load never starts alongside two others
+    assert driver.loading_at_create[:2] == [0, 1]
+    assert elapsed >= 0.05 * 3  # Five loads, two at a time
+
+
+def test_target_ids_come_back_in_url_order():
+    driver = FakeWebDriver(load_time=0.01)
+
+    target_ids = open_tabs(driver, URLS, max_concurrent=2, poll_interval=0.01)
+
+    assert [driver.tabs[target_id].url for target_id in target_ids] == URLS
+    assert len(set(target_ids)) == len(URLS)
+
+
+def test_without_wait_returns_once_the_last_tab_is_created():
+    driver = FakeWebDriver(load_time=10)
+
+    started = time.monotonic()
+    target_ids = open_tabs(driver, URLS[:2], max_concurrent=6)
+
+    assert time.monotonic() - started < 1
+    assert all(target_ids)
+
+
+def test_a_load_that_never_finishes_stops_blocking_after_load_timeout():
+    driver = FakeWebDriver(load_time=10)
+
+    started = time.monotonic()
+    target_ids = open_tabs(driver, URLS[:3], max_concurrent=1, wait=True, poll_interval=0.01, load_timeout=0.05)
+
+    assert 0.05 * 3 <= time.monotonic() - started < 2
+    assert [driver.tabs[target_id].url for target_id in target_ids] == URLS[:3]
+
+
+def test_window_open_fallback_maps_each_url_to_its_new_handle():
+    driver = NoCdpDriver()
+
+    target_ids = open_tabs(driver, URLS, max_concurrent=2, wait=True, poll_interval=0.01)
+
+    assert driver.round_trips["executeScript"] == len(URLS)
+    assert [driver.tabs[target_id].url for target_id in target_ids] == URLS
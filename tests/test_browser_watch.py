@@ -0,0 +1,95 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from browser_watch import BrowserWatcher
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"), reason="SingletonLock is a symlink on Linux and macOS")
+
+
+@pytest.fixture
+def profile(tmp_path):
+    return tmp_path
+
+
+@pytest.fixture
+def sleeper():
+    """A stand-in for Chrome that exits when told to"""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    yield process
+    process.kill()
+    process.wait()
+
+
+def lock(profile, pid, host=None):
+    path = profile / "SingletonLock"
+    if path.is_symlink():
+        path.unlink()
+    os.symlink(f"{host or socket.gethostname()}-{pid}", path)
+
+
+def test_lock_pid_reads_the_singleton_lock(profile):
+    watcher = BrowserWatcher(str(profile))
+    assert watcher.lock_pid() is None  # No lock: Chrome isn't using the profile
+
+    lock(profile, os.getpid())
+    assert watcher.lock_pid() == os.getpid()
+
+
+@pytest.mark.parametrize("target", ["some-other-host-1234", "{host}-", "{host}-12ab", "garbage"])
+def test_lock_pid_ignores_other_hosts_and_malformed_locks(profile, target):
+    os.symlink(target.format(host=socket.gethostname()), profile / "SingletonLock")
+
+    assert BrowserWatcher(str(profile)).lock_pid() is None
+
+
+def test_running_pids_are_cached_while_the_process_lives(profile, sleeper):
+    lock(profile, sleeper.pid)
+    watcher = BrowserWatcher(str(profile))
+
+    assert watcher.running_pids() == {sleeper.pid}
+    (profile / "SingletonLock").unlink()
+    assert watcher.running_pids() == {sleeper.pid}  # Cached, not re-read from the lock
+
+    sleeper.kill()
+    sleeper.wait()
+    assert watcher.running_pids() == set()
+    assert not watcher.is_running()
+
+
+def test_a_stale_lock_is_not_running(profile, sleeper):
+    sleeper.kill()
+    sleeper.wait()
+    lock(profile, sleeper.pid)
+
+    assert BrowserWatcher(str(profile)).running_pids() == set()
+
+
+def test_wait_for_exit_blocks_until_the_browser_exits(profile):
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.2)"])
+    lock(profile, process.pid)
+    waited_on = []
+
+    started = time.monotonic()
+    assert BrowserWatcher(str(profile)).wait_for_exit(timeout=10, on_wait=waited_on.append)
+
+    assert time.monotonic() - started >= 0.1
+    assert waited_on == [{process.pid}]
+    process.wait()
+
+
+def test_wait_for_exit_times_out_while_the_browser_runs(profile, sleeper):
+    lock(profile, sleeper.pid)
+
+    assert BrowserWatcher(str(profile)).wait_for_exit(timeout=0.1) is False
+
+
+def test_wait_for_exit_without_a_browser_returns_at_once(profile):
+    called = []
+
+    assert BrowserWatcher(str(profile)).wait_for_exit(timeout=0, on_wait=called.append)
+    assert called == []
@@ -0,0 +1,117 @@
+import os
+import shutil
+
+import pytest
+
+from bulk_import import devtools_tabs, extract_queries, parse_snss, session_tabs
+from search_urls import build_search_url
+from tab_snapshot import TabInfo
+
+# Written by a Chrome-style session writer: tab 1 went back to an older
+# search, tab 5 was closed, and the last command was cut off mid-write
+SAMPLE_SESSION = os.path.join(os.path.dirname(__file__), "data", "Session_13345678901234567")
+
+SAMPLE_TABS = [
+    ("https://www.google.com/search?q=rust+lifetimes&hl=en", "rust lifetimes - Google Search"),
+    ("https://www.bing.com/search?q=python+asyncio", "python asyncio - Search"),
+    ("https://example.com/article", "Example article"),
+    ("https://duckduckgo.com/?q=c%2B%2B+templates", "c++ templates at DuckDuckGo"),
+]
+
+
+def read_sample():
+    with open(SAMPLE_SESSION, "rb") as f:
+        return f.read()
+
+
+def test_parse_snss_returns_selected_navigation_of_open_tabs():
+    assert [(tab.url, tab.title) for tab in parse_snss(read_sample())] == SAMPLE_TABS
+
+
+def test_parse_snss_rejects_other_files():
+    with pytest.raises(ValueError):
+        parse_snss(b"PK\x03\x04 not a session")
+
+
+def test_session_tabs_reads_newest_session_file(tmp_path):
+    sessions = tmp_path / "Sessions"
+    sessions.mkdir()
+    stale = sessions / "Session_13300000000000000"
+    stale.write_bytes(b"SNSS\x03\x00\x00\x00")
+    shutil.copy(SAMPLE_SESSION, sessions / "Session_13345678901234567")
+    os.utime(stale, (0, 0))
+
+    assert len(session_tabs(str(tmp_path))) == len(SAMPLE_TABS)
+
+
+def test_extract_queries_from_sample_session():
+    found = extract_queries(parse_snss(read_sample()))
+
+    assert [query for _, query in found] == ["rust lifetimes", "python asyncio", "c++ templates"]
+
+
+def test_extract_queries_skips_lookalike_urls():
+    tabs = [
+        TabInfo("1", "https://www.google.com/maps?q=paris", ""),
+        TabInfo("2", "https://www.google.com/search?q=a%2Bb", ""),
+        TabInfo("3", "https://example.com/?url=https://www.google.com/search?q=x", ""),
+    ]
+
+    assert [(tab.target_id, query) for tab, query in extract_queries(tabs)] == [("2", "a+b")]
+
+
+def test_extract_queries_finds_every_engine_host_query_from_url_knows():
+    tabs = [
+        TabInfo("1", "https://cn.bing.com/search?q=rust+traits", ""),
+        TabInfo("2", "https://html.duckduckgo.com/?q=go+generics", ""),
+        TabInfo("3", "https://www.google.co.uk/search?q=python+asyncio", ""),
+    ]
+
+    assert [query for _, query in extract_queries(tabs)] == ["rust traits", "go generics", "python asyncio"]
+
+
+def test_devtools_tabs_lists_pages_from_endpoint(devtools_server):
+    page = devtools_server.open_tab(build_search_url("rust traits"), "rust traits - Google Search")
+    devtools_server.open_tab("https://example.com/sw.js", target_type="service_worker")
+    other = devtools_server.open_tab("https://example.com/")
+
+    tabs = devtools_tabs(devtools_server.address)
+
+    assert [tab.target_id for tab in tabs] == [page, other]
+    assert tabs[0].title == "rust traits - Google Search"
+    assert [query for _, query in extract_queries(tabs)] == ["rust traits"]
+
+
+@pytest.mark.parametrize("text, query", [
+    ("1+1", "1+1"),
+    ("a+b  c%20d", "a+b c%20d"),
+    ("https://www.google.com/search?q=1%2B1", "1+1"),
+    ("https://www.bing.com/search?q=rust+traits", "rust traits"),
+])
+def test_import_decodes_urls_but_takes_typed_queries_literally(manager, driver, text, query):
+    manager.import_tab(text)
+
+    entry = manager.query_tabs.get(query)
+    assert entry is not None and entry.query == query
+    assert driver.tabs[entry.handle].url == build_search_url(query)
+
+
+def test_import_all_from_another_chrome_adds_suspended_queries(manager, devtools_server):
+    devtools_server.open_tab(build_search_url("rust traits"))
+    devtools_server.open_tab(build_search_url("python asyncio"))
+    devtools_server.open_tab("https://example.com/")
+
+    manager.import_all(devtools_server.address)
+
+    assert sorted(entry.query for entry in manager.query_tabs) == ["python asyncio", "rust traits"]
+    assert all(entry.suspended for entry in manager.query_tabs)
+
+
+def test_import_all_reports_unreachable_endpoint(manager, devtools_server, capsys):
+    address = devtools_server.address
+    devtools_server.close()
+
+    manager.import_all(address)
+
+    assert "Could not read tabs" in capsys.readouterr().out
+    assert len(manager.query_tabs) == 0
@@ -0,0 +1,72 @@
+import io
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from command_loop import AsyncCommandLoop
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def lines(*commands):
+    return io.StringIO("".join(f"{command}\n" for command in commands))
+
+
+def test_commands_run_in_order_until_exit():
+    executed = []
+
+    def execute(command):
+        executed.append(command)
+        return command != "exit"
+
+    loop = AsyncCommandLoop(execute, stdin=lines("alpha", "", "stats", "close alpha", "exit", "never"))
+    loop.run()
+
+    assert executed == ["alpha", "close alpha", "exit"]
+    assert {row["command"] for row in loop.stats.summary()} == {"open", "close", "exit"}
+
+
+def test_end_of_input_stops_the_loop():
+    executed = []
+    AsyncCommandLoop(executed.append, stdin=lines("alpha")).run()
+
+    assert executed == ["alpha"]
+
+
+def test_failing_command_does_not_stop_the_loop(capsys):
+    def execute(command):
+        if command == "bad":
+            raise RuntimeError("boom")
+        return True
+
+    AsyncCommandLoop(execute, stdin=lines("bad", "good")).run()
+
+    assert "'bad' failed: boom" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs POSIX signals")
+def test_ctrl_c_exits_while_waiting_for_input():
+    script = (
+        "from command_loop import AsyncCommandLoop\n"
+        "try:\n"
+        "    AsyncCommandLoop(lambda command: True).run()\n"
+        "except KeyboardInterrupt:\n"
+        "    print('interrupted', flush=True)\n"
+    )
+    process = subprocess.Popen([sys.executable, "-c", script], cwd=ROOT, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        time.sleep(0.5)  # Let the prompt thread block on stdin, which stays open
+        process.send_signal(signal.SIGINT)
+        process.wait(timeout=3)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdin.close()
+    assert process.returncode == 0, process.stderr.read()
+    assert "interrupted" in process.stdout.read()
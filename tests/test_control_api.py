@@ -0,0 +1,127 @@
+import http.client
+import io
+import json
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from control_api import ControlError, ControlServer, run_batch
+
+
+def queries(n):
+    return [f"batch query {i}" for i in range(n)]
+
+
+def test_open_queries_only_opens_what_the_live_budget_allows(manager, driver):
+    driver.reset_counters()
+
+    assert manager.open_queries(queries(50)) == manager.lifecycle.max_live_tabs
+
+    assert driver.round_trips["Target.createTarget"] == 20
+    assert driver.round_trips["Target.closeTarget"] == 0
+    entries = list(manager.query_tabs)
+    assert [entry.query for entry in entries] == queries(50)
+    assert all(entry.suspended for entry in entries[:30])
+    assert not any(entry.suspended for entry in entries[30:])
+
+
+def test_open_queries_within_budget_opens_everything(manager, driver):
+    driver.reset_counters()
+
+    assert manager.open_queries(queries(5) + ["batch query 0", " "]) == 5
+    assert driver.round_trips["Target.createTarget"] == 5
+
+
+def test_run_batch_keeps_order_around_commands(manager):
+    lines = io.StringIO("# comment\nrust traits\npython asyncio\n\nclose rust traits\ngolang generics\n")
+
+    assert run_batch(manager, lines) is True
+    assert [entry.query for entry in manager.query_tabs] == ["python asyncio", "golang generics"]
+
+
+def test_run_batch_stops_at_exit(manager):
+    assert run_batch(manager, ["rust traits", "exit", "python asyncio"]) is False
+
+
+def test_run_batch_reports_failures_and_carries_on(manager, monkeypatch, capsys):
+    def fail(*args):
+        raise WebDriverException("no such window")
+
+    monkeypatch.setattr(manager, "close_tab", fail)
+    open_queries = manager.open_queries
+    monkeypatch.setattr(manager, "open_queries", lambda queries: fail() if "boom" in queries else open_queries(queries))
+
+    assert run_batch(manager, ["boom", "close rust", "rust traits"]) is True
+
+    out = capsys.readouterr().out
+    assert "[!] opening 1 queries failed" in out
+    assert "[!] 'close rust' failed" in out
+    assert [entry.query for entry in manager.query_tabs] == ["rust traits"]
+
+
+class CountingSupervisor:
+    def __init__(self):
+        self.calls = 0
+
+    def call(self, fn, *args):
+        self.calls += 1
+        return fn(*args)
+
+
+def test_command_requests_are_supervised_once(server, manager):
+    manager.supervisor = CountingSupervisor()
+
+    server.handle({"op": "command", "command": "close"})
+    assert manager.supervisor.calls == 1
+    server.handle({"op": "list"})
+    assert manager.supervisor.calls == 2
+
+
+@pytest.fixture
+def server(manager, tmp_path):
+    server = ControlServer(manager, port=0, control_file=str(tmp_path / "control.json"))
+    yield server
+    server._server.server_close()
+
+
+def test_control_requests(server):
+    reply = server.handle({"op": "open", "queries": ["rust traits", "python asyncio"]})
+    assert reply["ok"] and reply["opened"] == 2
+
+    reply = server.handle({"op": "list"})
+    assert [q["query"] for q in reply["queries"]] == ["rust traits", "python asyncio"]
+
+    reply = server.handle({"op": "close", "query": "rust"})
+    assert reply["closed"] is True
+
+
+@pytest.mark.parametrize("request_body", [
+    None,
+    {"op": "nope"},
+    {"op": "open", "queries": "rust"},
+    {"op": "command", "command": "exit"},
+])
+def test_bad_control_requests_are_rejected(server, request_body):
+    with pytest.raises(ControlError):
+        server.handle(request_body)
+
+
+@pytest.mark.parametrize("length, error", [("-1", "invalid Content-Length"), ("abc", "invalid literal")])
+def test_bad_content_length_is_rejected_without_reading_the_body(server, length, error):
+    server.start()
+    try:
+        host, port = server.address.split(":")
+        conn = http.client.HTTPConnection(host, int(port), timeout=5)
+        conn.putrequest("POST", "/")
+        conn.putheader("Authorization", f"Bearer {server.token}")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        conn.send(b'{"op": "list"}')  # Connection stays open: a read to EOF would hang
+        response = conn.getresponse()
+        reply = json.loads(response.read())
+        conn.close()
+    finally:
+        server.close()
+
+    assert response.status == 400
+    assert error in reply["error"]
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+from selenium import webdriver
+
+from devtools import DevToolsConnection
+from launch_profile import BLOCKED_URL_PATTERNS, LAUNCH_PROFILES, ResourceBlocker, apply_launch_profile
+
+
+@pytest.fixture
+def calls(devtools_server):
+    """(method, session, params) for every per-tab command the blocker sends"""
+    seen = []
+    lock = threading.Lock()
+
+    def record(method):
+        def handler(params, session_id):
+            with lock:
+                seen.append((method, session_id, params))
+            return {}
+        return handler
+
+    for method in ("Network.enable", "Network.setBlockedURLs", "Runtime.runIfWaitingForDebugger", "Page.reload"):
+        devtools_server.handlers[method] = record(method)
+    return seen
+
+
+@pytest.fixture
+def blocker(devtools_server, calls):
+    blocker = ResourceBlocker(DevToolsConnection.for_address(devtools_server.address), owns_connection=True)
+    yield blocker
+    blocker.close()
+
+
+def sent(calls, target_id, method):
+    return [params for m, session, params in list(calls) if m == method and session == "S" + target_id]
+
+
+def test_background_tabs_are_blocked_before_they_resume(devtools_server, blocker, calls, wait_for):
+    target_id = devtools_server.open_tab("https://www.google.com/search?q=alpha")
+
+    wait_for(lambda: sent(calls, target_id, "Runtime.runIfWaitingForDebugger"))
+
+    methods = [m for m, session, _ in calls if session == "S" + target_id]
+    assert methods == ["Network.enable", "Network.setBlockedURLs", "Runtime.runIfWaitingForDebugger"]
+    assert sent(calls, target_id, "Network.setBlockedURLs") == [{"urls": BLOCKED_URL_PATTERNS}]
+
+
+def test_unblocking_a_foreground_tab_clears_the_list_and_reloads(devtools_server, blocker, calls, wait_for):
+    target_id = devtools_server.open_tab("https://www.google.com/search?q=alpha")
+    wait_for(lambda: sent(calls, target_id, "Runtime.runIfWaitingForDebugger"))
+
+    blocker.unblock(target_id)
+
+    assert sent(calls, target_id, "Network.setBlockedURLs")[-1] == {"urls": []}
+    assert len(sent(calls, target_id, "Page.reload")) == 1
+
+    blocker.unblock(target_id)  # Already unblocked: nothing more to do
+    assert len(sent(calls, target_id, "Page.reload")) == 1
+
+
+def test_unblock_without_reload_for_a_tab_about_to_navigate(devtools_server, blocker, calls, wait_for):
+    target_id = devtools_server.open_tab()
+    wait_for(lambda: sent(calls, target_id, "Runtime.runIfWaitingForDebugger"))
+
+    blocker.unblock(target_id, reload=False)
+
+    assert sent(calls, target_id, "Network.setBlockedURLs")[-1] == {"urls": []}
+    assert sent(calls, target_id, "Page.reload") == []
+
+
+def test_a_tab_unblocked_before_it_attaches_is_never_blocked(devtools_server, blocker, calls, wait_for):
+    blocker.unblock("FAKE0001", reload=False)  # The id the next tab gets
+    target_id = devtools_server.open_tab()
+    wait_for(lambda: sent(calls, target_id, "Runtime.runIfWaitingForDebugger"))
+
+    assert target_id == "FAKE0001"
+    assert sent(calls, target_id, "Network.setBlockedURLs") == []
+
+
+def test_lite_profile_leaves_images_to_the_per_tab_blocker():
+    options = apply_launch_profile(webdriver.ChromeOptions(), LAUNCH_PROFILES["lite"])
+
+    prefs = options.experimental_options["prefs"]
+    assert not any("images" in name for name in prefs)
+    assert options.page_load_strategy == "eager"
+
+
+class RecordingBlocker:
+    def __init__(self):
+        self.unblocked = []
+
+    def unblock(self, handle, reload=True):
+        self.unblocked.append((handle, reload))
+
+
+def test_main_unblocks_the_tab_it_brings_to_the_front(manager):
+    manager.blocker = RecordingBlocker()
+    manager.open_query("alpha")
+    manager.open_query("beta")
+    alpha = manager.query_tabs.get("alpha")
+
+    manager.open_query("alpha")
+
+    assert manager.blocker.unblocked[-1] == (alpha.handle, True)
+    assert [reload for _, reload in manager.blocker.unblocked[:2]] == [False, False]  # New tabs navigate anyway
+    manager.blocker = None
@@ -0,0 +1,57 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from driver_trace import DriverTrace
+
+
+def feed(monkeypatch, *commands):
+    pending = list(commands)
+    monkeypatch.setattr("builtins.input", lambda prompt="": pending.pop(0))
+
+
+def test_sync_stats_is_a_command_not_a_search(manager, monkeypatch, capsys):
+    feed(monkeypatch, "rust traits", "stats", "exit")
+
+    manager.run()
+
+    out = capsys.readouterr().out
+    assert "p95 ms" in out
+    assert [entry.query for entry in manager.query_tabs] == ["rust traits"]
+
+
+def test_sync_trace_is_recorded_per_command(manager, monkeypatch, capsys):
+    trace = DriverTrace()
+    feed(monkeypatch, "rust traits", "close", "stats", "exit")
+
+    manager.run(trace)
+
+    assert set(trace.commands) == {"open", "close", "exit"}
+    assert "remote ms" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("command", ["stats", "STATS"])
+def test_stats_never_reaches_execute(manager, monkeypatch, command):
+    executed = []
+    manager.execute = lambda text: executed.append(text) or text != "exit"
+    feed(monkeypatch, command, "exit")
+
+    manager.run()
+
+    assert executed == ["exit"]
+
+
+def test_sync_prompt_reports_a_failed_command_and_carries_on(manager, monkeypatch, capsys):
+    open_query = manager.open_query
+
+    def flaky(query):
+        if query == "boom":
+            raise WebDriverException("no such window")
+        open_query(query)
+
+    manager.open_query = flaky
+    feed(monkeypatch, "boom", "rust traits", "exit")
+
+    manager.run()
+
+    assert "[!] 'boom' failed" in capsys.readouterr().out
+    assert [entry.query for entry in manager.query_tabs] == ["rust traits"]
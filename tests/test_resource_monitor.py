@@ -0,0 +1,130 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import resource_monitor
+from devtools import DevToolsConnection
+from resource_monitor import ResourceMonitor, renderer_pids_for_targets
+from tab_index import TabIndex
+from tab_lifecycle import TabLifecycle
+
+
+@pytest.fixture
+def renderer_pid(monkeypatch):
+    """Pretend this test process is the browser's only renderer"""
+    pid = os.getpid()
+    monkeypatch.setattr(resource_monitor, "chrome_renderer_pids", lambda driver: {pid})
+    return pid
+
+
+def test_sampling_thread_maps_new_tabs_without_top(driver, renderer_pid, wait_for):
+    index = TabIndex()
+    monitor = ResourceMonitor(driver, index, interval=0.05)
+    monitor.start()
+    try:
+        index.add("alpha", driver.current)
+        wait_for(lambda: monitor.total_rss() > 0)
+    finally:
+        monitor.stop()
+
+
+def test_first_top_reports_renderers_while_thread_runs(driver, renderer_pid, capsys):
+    index = TabIndex()
+    index.add("alpha", driver.current)
+    monitor = ResourceMonitor(driver, index, interval=60)
+    monitor.start()
+    try:
+        monitor.print_top()
+    finally:
+        monitor.stop()
+
+    out = capsys.readouterr().out
+    assert "No renderer processes found." not in out
+    assert str(renderer_pid) in out
+
+
+def test_usage_without_thread_samples_on_demand(driver, renderer_pid):
+    index = TabIndex()
+    index.add("alpha", driver.current)
+    monitor = ResourceMonitor(driver, index)
+
+    rows = monitor.usage()
+
+    assert [(pid, rss > 0) for _, pid, rss, _ in rows] == [(renderer_pid, True)]
+
+
+def test_memory_budget_suspends_tabs_from_background_samples(driver, renderer_pid, wait_for):
+    index = TabIndex()
+    monitor = ResourceMonitor(driver, index, interval=0.05)
+    lifecycle = TabLifecycle(driver, index, max_live_tabs=10, max_memory_mb=1, memory_probe=monitor.total_rss)
+    monitor.start()
+    try:
+        first = index.add("alpha", driver.current)
+        lifecycle.track(first)
+        wait_for(lambda: monitor.total_rss() > 2**20)
+        second = index.add("beta", driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank"})["targetId"])
+        lifecycle.track(second)
+    finally:
+        monitor.stop()
+
+    assert first.suspended
+    assert not second.suspended
+
+
+@pytest.fixture
+def renderers():
+    """Two idle processes standing in for tab renderers"""
+    processes = [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]) for _ in range(2)]
+    yield [process.pid for process in processes]
+    for process in processes:
+        process.kill()
+        process.wait()
+
+
+@pytest.fixture
+def connection(devtools_server):
+    connection = DevToolsConnection.for_address(devtools_server.address)
+    yield connection
+    connection.close()
+
+
+def test_trace_maps_main_frames_to_renderer_pids(devtools_server, connection):
+    alpha = devtools_server.open_tab("https://www.google.com/search?q=alpha")
+    devtools_server.renderer_pids = {alpha: 4242}
+
+    assert renderer_pids_for_targets(connection) == {alpha: 4242}  # Subframes are left out
+
+
+def test_usage_attributes_each_renderer_to_its_query(driver, devtools_server, connection, renderers, monkeypatch):
+    other_renderer = os.getpid()  # A renderer with no tracked tab in it
+    monkeypatch.setattr(resource_monitor, "chrome_renderer_pids", lambda driver: {other_renderer})
+    index = TabIndex()
+    alpha = devtools_server.open_tab("https://www.google.com/search?q=alpha")
+    beta = devtools_server.open_tab("https://www.google.com/search?q=beta")
+    untracked = devtools_server.open_tab("https://example.com/")
+    index.add("alpha", alpha)
+    index.add("beta", "CDwindow-" + beta)  # Old-style handle
+    devtools_server.renderer_pids = {alpha: renderers[0], beta: renderers[1], untracked: other_renderer}
+    monitor = ResourceMonitor(driver, index, connection)
+
+    rows = monitor.usage()
+
+    assert sorted((query or "", pid) for query, pid, _, _ in rows) == sorted(
+        [("alpha", renderers[0]), ("beta", renderers[1]), ("", other_renderer)])
+    assert all(rss > 0 for _, _, rss, _ in rows)
+
+
+def test_mapping_failure_is_reported_once(driver, devtools_server, connection, renderer_pid, capsys):
+    def no_tracing(params, session_id):
+        raise KeyError("tracing unavailable")
+
+    devtools_server.handlers["Tracing.start"] = no_tracing
+    index = TabIndex()
+    monitor = ResourceMonitor(driver, index, connection)
+    for query in ("alpha", "beta", "gamma"):
+        index.add(query, devtools_server.open_tab())
+        monitor.usage()  # The tab set changed, so each call remaps
+
+    assert capsys.readouterr().out.count("Could not map tabs to processes") == 1
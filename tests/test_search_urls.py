@@ -0,0 +1,45 @@
+import pytest
+
+from search_urls import build_search_url, normalize_query, query_from_url, query_key
+
+
+@pytest.mark.parametrize("typed", ["1+1", "a+b", "c++", "foo%20bar", "100% cotton"])
+def test_typed_queries_are_searched_literally(typed):
+    assert normalize_query(typed) == typed
+    assert query_from_url(build_search_url(typed)) == typed
+
+
+def test_whitespace_is_collapsed():
+    assert normalize_query("  foo \t bar ") == "foo bar"
+
+
+@pytest.mark.parametrize("encoded, expected", [
+    ("foo+bar", "foo bar"),
+    ("foo%20bar", "foo bar"),
+    ("c++", "c++"),
+    ("c%2B%2B+templates", "c++ templates"),
+])
+def test_encoded_text_is_decoded(encoded, expected):
+    assert normalize_query(encoded, encoded=True) == expected
+
+
+def test_search_url_encodes_reserved_characters():
+    assert build_search_url("1+1 & 2") == "https://www.google.com/search?q=1%2B1+%26+2"
+    assert build_search_url("rust traits", "bing") == "https://www.bing.com/search?q=rust+traits"
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.google.com/search?q=rust+traits&hl=en", "rust traits"),
+    ("https://www.google.co.uk/search?q=a%2Bb", "a+b"),
+    ("https://duckduckgo.com/?q=python", "python"),
+    ("https://www.google.com/maps?q=paris", None),
+    ("https://example.com/search?q=x", None),
+    ("chrome://newtab/", None),
+])
+def test_query_from_url(url, expected):
+    assert query_from_url(url) == expected
+
+
+def test_query_key_ignores_case_and_spacing():
+    assert query_key("Foo  Bar") == query_key("foo bar")
+    assert query_key("a+b") != query_key("a b")
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+
+from session_store import SessionStore
+
+URL = "https://www.google.com/search?q="
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "queries.jsonl")
+
+
+def journal(path, *records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def reload(path):
+    store = SessionStore(path, fsync=False)
+    try:
+        return store.load()
+    finally:
+        store.close()
+
+
+def test_replay_keeps_open_order_and_drops_closed_queries(path):
+    journal(path,
+            {"op": "open", "q": "rust traits", "url": URL + "rust+traits"},
+            {"op": "open", "q": "python asyncio", "url": URL + "python+asyncio"},
+            {"op": "open", "q": "go generics", "url": URL + "go+generics"},
+            {"op": "close", "q": "Python  Asyncio"},  # Same query, differently typed
+            {"op": "open", "q": "rust traits", "url": URL + "rust+traits"})  # Reopened: moves to the end
+
+    assert reload(path) == [("go generics", URL + "go+generics"), ("rust traits", URL + "rust+traits")]
+
+
+def test_records_round_trip(path):
+    store = SessionStore(path, fsync=False)
+    store.record_open("rust traits", URL + "rust+traits")
+    store.record_open("go generics", URL + "go+generics")
+    store.record_close("rust traits")
+    store.close()
+
+    assert reload(path) == [("go generics", URL + "go+generics")]
+
+
+@pytest.mark.parametrize("torn", [b'{"op": "open", "q": "go gen', b'{"op": "open", "q": "go", "url": null}'])
+def test_torn_final_line_is_cut_off(path, torn):
+    journal(path, {"op": "open", "q": "rust traits", "url": URL + "rust+traits"})
+    with open(path, "rb") as f:
+        good = f.read()
+    with open(path, "ab") as f:
+        f.write(torn)  # Crash mid-write: no newline
+
+    store = SessionStore(path, fsync=False)
+    assert store.load() == [("rust traits", URL + "rust+traits")]
+    with open(path, "rb") as f:
+        assert f.read() == good
+
+    store.record_open("go generics", URL + "go+generics")
+    store.close()
+    assert [record["q"] for record in lines(path)] == ["rust traits", "go generics"]
+
+
+def test_close_on_a_fresh_store_closes_a_query_from_an_earlier_session(path):
+    journal(path, {"op": "open", "q": "rust traits", "url": URL + "rust+traits"})
+
+    store = SessionStore(path, fsync=False)
+    store.record_close("rust traits")
+    store.close()
+
+    assert reload(path) == []
+
+
+def test_compaction_rewrites_only_live_queries(path):
+    store = SessionStore(path, fsync=False, compact_ratio=2, min_compact=6)
+    for i in range(3):
+        store.record_open(f"query {i}", URL + str(i))
+    store.record_close("query 0")
+    store.record_close("query 1")
+    assert len(lines(path)) == 5  # Below min_compact
+
+    store.record_open("query 3", URL + "3")  # 6 lines >= max(6, 2 * 2 live)
+
+    assert lines(path) == [{"op": "open", "q": "query 2", "url": URL + "2"},
+                           {"op": "open", "q": "query 3", "url": URL + "3"}]
+    store.record_open("query 4", URL + "4")  # Appends go to the swapped-in file
+    store.close()
+    assert [q for q, _ in reload(path)] == ["query 2", "query 3", "query 4"]
+
+
+def test_compaction_is_an_atomic_swap(path, monkeypatch):
+    store = SessionStore(path, fsync=False, compact_ratio=1, min_compact=1)
+    store.record_open("rust traits", URL + "rust+traits")
+    replaced = []
+    monkeypatch.setattr("os.replace", lambda src, dst: replaced.append((src, dst)))
+
+    store.compact()
+
+    assert replaced == [(path + ".tmp", path)]
+    store.close()
+
+
+def test_a_second_process_does_not_write_the_journal(path, capsys):
+    owner = SessionStore(path, fsync=False, compact_ratio=1, min_compact=1)
+    owner.record_open("rust traits", URL + "rust+traits")
+    other = SessionStore(path, fsync=False)
+
+    assert other.load() == [("rust traits", URL + "rust+traits")]
+    assert not other.owner
+    assert "won't be saved" in capsys.readouterr().out
+
+    other.record_open("go generics", URL + "go+generics")
+    owner.record_open("python asyncio", URL + "python+asyncio")  # Compacts under the lock
+    other.close()
+    owner.close()
+
+    assert [q for q, _ in reload(path)] == ["rust traits", "python asyncio"]
+
+
+def test_the_lock_is_released_on_close(path):
+    first = SessionStore(path, fsync=False)
+    first.load()
+    first.close()
+
+    second = SessionStore(path, fsync=False)
+    second.load()
+
+    assert second.owner
+    second.close()
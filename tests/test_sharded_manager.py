@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from fake_driver import FakeWebDriver
+from main import QueryTabManager
+from search_urls import build_search_url
+from sharded_manager import ShardedQueryManager
+
+SAMPLE_SESSION = os.path.join(os.path.dirname(__file__), "data", "Session_13345678901234567")
+
+
+@pytest.fixture
+def sharded():
+    manager = ShardedQueryManager([QueryTabManager.from_driver(FakeWebDriver()) for _ in range(3)])
+    yield manager
+    manager.quit()
+
+
+def tracked(sharded):
+    return {entry.query: i for i, entry in sharded.entries()}
+
+
+def opened_tabs(sharded):
+    return sum(len(shard.driver.tabs) for shard in sharded.shards)
+
+
+def test_queries_open_on_their_home_shard(sharded):
+    for query in ("rust traits", "python asyncio", "golang generics", "zig comptime"):
+        sharded.execute(query)
+
+    for query, i in tracked(sharded).items():
+        assert sharded.shards[i] is sharded.home_shard(query)
+
+
+def test_import_all_from_address_routes_to_home_shards(sharded, devtools_server):
+    for query in ("rust traits", "python asyncio", "golang generics"):
+        devtools_server.open_tab(build_search_url(query))
+    before = opened_tabs(sharded)
+
+    sharded.execute(f"import all {devtools_server.address}")
+
+    found = tracked(sharded)
+    assert sorted(found) == ["golang generics", "python asyncio", "rust traits"]
+    for query, i in found.items():
+        assert sharded.shards[i] is sharded.home_shard(query)
+    assert all(entry.suspended for _, entry in sharded.entries())
+    assert opened_tabs(sharded) == before
+
+
+def test_import_session_reads_profile_instead_of_searching(sharded, tmp_path):
+    (tmp_path / "Sessions").mkdir()
+    with open(SAMPLE_SESSION, "rb") as f:
+        (tmp_path / "Sessions" / "Session_1").write_bytes(f.read())
+
+    sharded.execute(f"import session {tmp_path}")
+
+    assert sorted(tracked(sharded)) == ["c++ templates", "python asyncio", "rust lifetimes"]
+    assert "session" not in " ".join(tracked(sharded))
+
+
+def test_import_single_query_still_opens_a_tab(sharded):
+    sharded.execute("import rust traits")
+
+    entry = sharded.home_shard("rust traits").query_tabs.get("rust traits")
+    assert entry is not None and not entry.suspended
+
+
+def test_ambiguous_close_across_shards_lists_candidates(sharded, capsys):
+    for query in ("python tutorial", "python asyncio", "rust traits"):
+        sharded.execute(query)
+
+    sharded.execute("close python")
+    assert "matches several queries" in capsys.readouterr().out
+    assert len(tracked(sharded)) == 3
+
+    sharded.execute("close pythn tutorial")
+    assert sorted(tracked(sharded)) == ["python asyncio", "rust traits"]
+
+
+def test_commands_come_from_the_single_manager_table(sharded, capsys):
+    assert sharded.COMMANDS is QueryTabManager.COMMANDS
+    assert all(hasattr(sharded, handler) for handler in QueryTabManager.COMMANDS.values())
+
+    assert sharded.execute("watch") is True
+    assert capsys.readouterr().out.count("Watching needs the DevTools connection") == len(sharded.shards)
+    assert sharded.execute("watch off") is True
+    assert tracked(sharded) == {}
+
+    sharded.execute("watch everything")  # Not a watch form: searched like main does
+    assert list(tracked(sharded)) == ["watch everything"]
@@ -0,0 +1,157 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import main
+import supervisor
+from devtools import DevToolsConnection
+from fake_driver import FakeWebDriver
+from supervisor import Supervisor
+from tab_registry import TabRegistry
+
+
+@pytest.fixture
+def supervised_manager(manager, driver):
+    manager.supervisor = Supervisor(manager, relaunch=driver.relaunch)
+    return manager
+
+
+def counted(fn):
+    """Wrap fn so the test can see how many times the supervisor ran it"""
+    def call(*args):
+        call.calls += 1
+        return fn(*args)
+    call.calls = 0
+    return call
+
+
+def open_queries(manager, *queries):
+    for query in queries:
+        manager.open_query(query)
+    return [manager.query_tabs.get(query) for query in queries]
+
+
+def test_crash_reopens_tracked_tabs_and_retries_the_command_once(supervised_manager, driver):
+    entries = open_queries(supervised_manager, "rust traits", "python asyncio", "c++ templates")
+    command = counted(lambda: driver.current_window_handle)
+    driver.crash()
+
+    handle = supervised_manager.supervisor.call(command)
+
+    assert command.calls == 2
+    assert handle in driver.tabs
+    assert driver.crashes == 1
+    assert all(entry.handle in driver.tabs for entry in entries)
+    assert [driver.tabs[entry.handle].url for entry in entries] == [entry.url for entry in entries]
+    assert supervised_manager.supervisor.recoveries[0][1:] == (3, 0)
+
+
+def test_recovery_time_and_restore_throughput_are_recorded():
+    driver = FakeWebDriver(latency=0.002, launch_time=0.05)
+    manager = main.QueryTabManager.from_driver(driver)
+    manager.supervisor = Supervisor(manager, relaunch=driver.relaunch)
+    open_queries(manager, *[f"query {i}" for i in range(10)])
+    driver.crash()
+    try:
+        manager.execute("close")
+        seconds, reopened, reattached = manager.supervisor.recoveries[0]
+    finally:
+        manager.quit()
+
+    assert (reopened, reattached) == (10, 0)
+    # At least the relaunch, plus a round trip per reopened tab
+    assert seconds >= 0.05 + 10 * 0.002
+    assert seconds < 2.0
+    assert reopened / seconds > 5  # Tabs restored per second
+
+
+def test_supervised_execute_recovers_mid_command(supervised_manager, driver):
+    entries = open_queries(supervised_manager, "rust traits", "python asyncio")
+    driver.crash(after_calls=1)
+
+    supervised_manager.execute("go generics")
+
+    assert driver.crashes == 1
+    assert all(entry.handle in driver.tabs for entry in entries)
+    assert supervised_manager.query_tabs.get("go generics").handle in driver.tabs
+
+
+def test_recovery_gives_up_after_max_restarts(manager, driver):
+    manager.supervisor = Supervisor(manager, relaunch=driver.relaunch, max_restarts=1)
+
+    def crash_now():
+        driver.crash()
+        return driver.current_window_handle
+
+    command = counted(crash_now)
+    for _ in range(2):
+        with pytest.raises(WebDriverException):
+            manager.supervisor.call(command)
+
+    assert command.calls == 3  # One retry after the only recovery allowed
+    assert len(manager.supervisor.recoveries) == 1
+
+
+def test_recovery_does_not_restore_the_session_again(supervised_manager, driver, monkeypatch):
+    monkeypatch.setattr(supervised_manager, "restore_session", lambda: pytest.fail("session restored twice"))
+    open_queries(supervised_manager, "rust traits")
+    driver.crash()
+
+    supervised_manager.execute("close")
+
+    assert driver.crashes == 1
+
+
+def test_active_watch_restarts_on_the_new_browser(supervised_manager, driver, devtools_server):
+    manager = supervised_manager
+    manager.registry = TabRegistry(DevToolsConnection.for_address(devtools_server.address))
+    assert manager.start_watcher(hash_results=True)
+    old_watcher = manager.watcher
+
+    def relaunch():
+        driver.relaunch()
+        driver.capabilities = {"goog:chromeOptions": {"debuggerAddress": devtools_server.address}}
+        return driver
+
+    manager.supervisor.relaunch = relaunch
+    open_queries(manager, "rust traits")
+    driver.crash()
+    manager.execute("rust traits")
+
+    assert not old_watcher.running
+    assert manager.watcher is not old_watcher
+    assert manager.watcher.running and manager.watcher.hash_results
+
+
+def test_watch_stops_with_a_message_when_the_new_browser_has_no_devtools(supervised_manager, driver,
+                                                                         devtools_server, capsys):
+    manager = supervised_manager
+    manager.registry = TabRegistry(DevToolsConnection.for_address(devtools_server.address))
+    manager.start_watcher(hash_results=False)
+    open_queries(manager, "rust traits")
+    driver.crash()
+
+    manager.execute("rust traits")
+
+    assert manager.watcher is None
+    assert "Stopped watching tabs" in capsys.readouterr().out
+
+
+def test_attached_manager_relaunches_on_the_daemon_profile(manager, driver, monkeypatch, tmp_path):
+    launched = []
+    monkeypatch.setattr(supervisor, "attach_driver", lambda page_load_strategy: None)
+    monkeypatch.setattr(main, "start_driver", lambda options: launched.append(options) or driver.relaunch())
+    manager.attached = True
+    manager.profile_dir = str(tmp_path)
+
+    assert Supervisor(manager)._default_relaunch() is driver
+
+    assert not manager.attached
+    assert f"--user-data-dir={tmp_path}" in launched[0].arguments
+
+
+def test_attached_manager_without_a_known_profile_fails_clearly(manager, monkeypatch):
+    monkeypatch.setattr(supervisor, "attach_driver", lambda page_load_strategy: None)
+    manager.attached = True
+
+    with pytest.raises(RuntimeError, match="profile directory is unknown"):
+        Supervisor(manager)._default_relaunch()
@@ -0,0 +1,75 @@
+from tab_index import TabIndex
+
+HANDLE = "%032X"
+
+
+def queries(entries):
+    return [entry.query for entry in entries]
+
+
+def test_shared_tokens_are_refcounted_by_query():
+    index = TabIndex()
+    rust = index.add("rust traits", HANDLE % 1)
+    index.add("rust generics", HANDLE % 2)
+    duplicate = index.add("Rust  Traits", HANDLE % 3)  # Same query key as the first
+
+    assert index._tokens["rust"] == {"rust traits", "rust generics"}
+    assert index._tokens["traits"] == {"rust traits"}
+
+    index.remove(rust)
+    assert index._tokens["traits"] == {"rust traits"}  # The duplicate still holds the key
+    index.remove(duplicate)
+    assert "traits" not in index._tokens
+    assert index._tokens["rust"] == {"rust generics"}
+    assert index._sorted_tokens == ["generics", "rust"]
+
+
+def test_every_keyword_may_be_a_prefix():
+    index = TabIndex()
+    for query in ("python asyncio", "python generics", "pytest fixtures", "rust generics"):
+        index.add(query, None)
+
+    assert queries(index.search("py")) == ["pytest fixtures", "python asyncio", "python generics"]
+    assert queries(index.search("pyth gen")) == ["python generics"]
+    assert queries(index.search("gen")) == ["python generics", "rust generics"]
+    assert index.search("go") == []
+    assert index.search("  ") == []
+    assert index._sorted_tokens == sorted(index._tokens)
+
+
+def test_search_with_a_similarity_predicate_matches_indexed_words():
+    index = TabIndex()
+    index.add("python asyncio", None)
+
+    assert index.search("pythn") == []
+    assert queries(index.search("pythn", similar=lambda token, word: word == "python")) == ["python asyncio"]
+
+
+def test_set_handle_and_remove_handle_keep_the_handle_map_in_step():
+    index = TabIndex()
+    entry = index.add("rust traits", HANDLE % 1)
+    other = index.add("go generics", HANDLE % 2)
+
+    index.set_handle(entry, None)
+    assert entry.suspended
+    assert not index.has_handle(HANDLE % 1)
+
+    index.set_handle(entry, HANDLE % 3)
+    assert index.by_handle(HANDLE % 3) is entry
+    assert set(index.handles()) == {HANDLE % 2, HANDLE % 3}
+
+    assert index.remove_handle(HANDLE % 3) is entry
+    assert "rust traits" not in index
+    assert index.remove_handle(HANDLE % 3) is None
+    assert list(index) == [other]
+
+
+def test_set_handle_does_not_steal_another_entrys_handle():
+    index = TabIndex()
+    old = index.add("rust traits", HANDLE % 1)
+    new = index.add("rust traits", HANDLE % 1)  # A re-track of the same tab
+
+    index.set_handle(old, None)
+
+    assert index.by_handle(HANDLE % 1) is new
+    assert index.get("RUST traits") is old
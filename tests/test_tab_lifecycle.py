@@ -0,0 +1,90 @@
+import bench
+import tab_lifecycle
+from tab_index import TabIndex
+from tab_lifecycle import TabLifecycle
+
+
+def close_by_hand(driver, handle):
+    driver.execute_cdp_cmd("Target.closeTarget", {"targetId": handle})
+
+
+def test_least_recently_used_tab_is_suspended_and_reopened_on_touch(driver):
+    index = TabIndex()
+    lifecycle = TabLifecycle(driver, index, max_live_tabs=2)
+    entries = []
+    for query in ("alpha", "beta", "gamma"):
+        url = f"https://www.google.com/search?q={query}"
+        entries.append(index.add(query, driver.execute_cdp_cmd("Target.createTarget", {"url": url})["targetId"], url))
+        lifecycle.track(entries[-1])
+
+    assert entries[0].suspended and entries[0].url.endswith("alpha")
+    assert not entries[1].suspended and not entries[2].suspended
+
+    handle = lifecycle.touch(entries[0])
+
+    assert handle in driver.tabs and driver.tabs[handle].url == entries[0].url
+    assert entries[1].suspended  # Now the least recently used
+
+
+def test_touch_keeps_the_entry_suspended_when_the_tab_cannot_be_reopened(driver, monkeypatch):
+    index = TabIndex()
+    lifecycle = TabLifecycle(driver, index)
+    entry = index.add("alpha", None, "https://www.google.com/search?q=alpha")
+    monkeypatch.setattr(tab_lifecycle, "create_tab", lambda driver, url: None)
+
+    assert lifecycle.touch(entry) is None
+    assert entry.suspended
+
+
+def test_reopening_a_query_whose_tab_was_closed_by_hand(manager, driver):
+    manager.open_query("rust traits")
+    manager.open_query("python asyncio")
+    entry = manager.query_tabs.get("rust traits")
+    close_by_hand(driver, entry.handle)
+
+    manager.open_query("rust traits")
+
+    assert entry.handle in driver.tabs
+    assert driver.current == entry.handle
+    assert driver.tabs[entry.handle].url == entry.url
+
+
+def test_open_queries_reopens_tracked_tabs_closed_by_hand(manager, driver):
+    manager.open_queries(["rust traits", "python asyncio"])
+    entry = manager.query_tabs.get("rust traits")
+    close_by_hand(driver, entry.handle)
+
+    manager.open_queries(["rust traits", "go generics"])
+
+    assert entry.handle in driver.tabs
+    assert len(manager.query_tabs) == 3
+
+
+def test_updated_main_search_only_opens_what_the_live_budget_allows(driver):
+    manager = bench.make_updated_manager(driver)
+    manager.lifecycle = TabLifecycle(driver, manager.tabs, max_live_tabs=20)
+    driver.reset_counters()
+
+    manager.search([f"query {i}" for i in range(50)])
+
+    assert driver.round_trips["Target.createTarget"] == 19  # The first query reuses the initial tab
+    assert driver.round_trips["Target.closeTarget"] == 0
+    assert sum(1 for entry in manager.tabs if entry.suspended) == 30
+    assert manager.tabs.get("query 0").suspended and not manager.tabs.get("query 49").suspended
+
+
+def test_chrome_tab_manager_suspends_past_the_live_budget(driver):
+    manager = bench.make_chrome_tab_manager(driver)
+    manager.lifecycle = TabLifecycle(driver, manager.tabs, max_live_tabs=2)
+
+    for query in ("alpha", "beta", "gamma"):
+        manager.search(query)
+
+    alpha = manager.tabs.get("alpha")
+    assert alpha.suspended
+    assert len(driver.tabs) == 2
+
+    manager.search("alpha")
+
+    assert not alpha.suspended and driver.current == alpha.handle
+    assert manager.tabs.get("beta").suspended
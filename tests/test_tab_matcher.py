@@ -0,0 +1,164 @@
+import pytest
+
+import bench
+import main
+from search_urls import build_search_url
+from tab_index import TabIndex
+from tab_matcher import TabMatcher, clean_title, is_bulk, select_entries
+
+QUERIES = ["rust traits", "golang generics", "weather tomorrow", "python asyncio"]
+
+
+@pytest.fixture
+def matcher():
+    matcher = TabMatcher()
+    for i, query in enumerate(QUERIES):
+        matcher.update(f"T{i}", f"{query} - Google Search", build_search_url(query))
+    return matcher
+
+
+def selected(matcher, text):
+    return [QUERIES[int(target_id[1:])] for target_id in matcher.select(text)]
+
+
+def test_engine_suffix_is_not_indexed():
+    assert clean_title("rust traits - Google Search", build_search_url("rust traits")) == "rust traits"
+    assert clean_title("rust traits - Search", "https://www.bing.com/search?q=rust+traits") == "rust traits"
+    assert clean_title("rust traits at DuckDuckGo", "https://duckduckgo.com/?q=rust+traits") == "rust traits"
+    # A loading tab shows its URL as the title
+    assert clean_title("https://example.com/", "https://example.com/") == ""
+
+
+PLAIN = [
+    ("go", ["golang generics"]),
+    ("rust", ["rust traits"]),
+    ("weather tomorrow", ["weather tomorrow"]),
+    ("tomorrow news", []),
+    ("google", []),
+    ("search", []),
+    ("pythn", ["python asyncio"]),
+    ("pythn asyncoi", ["python asyncio"]),
+]
+BULK = [
+    ("all search", []),
+    ("all google", []),
+    ("all *search*", []),
+    ("all /google/", []),
+    ("/google/", []),
+    ("all r", ["rust traits"]),
+    ("all /^(rust|golang) /", ["rust traits", "golang generics"]),
+    ("*o*", ["golang generics", "weather tomorrow", "python asyncio"]),
+]
+
+
+@pytest.mark.parametrize("text, expected", PLAIN)
+def test_plain_keyword(matcher, text, expected):
+    assert selected(matcher, text) == expected
+
+
+@pytest.mark.parametrize("text, expected", BULK)
+def test_all_and_patterns_ignore_text_every_tab_shares(matcher, text, expected):
+    assert selected(matcher, text) == expected
+
+
+def test_exact_words_beat_typo_matches(matcher):
+    matcher.update("T9", "pythn - Google Search", build_search_url("pythn"))
+
+    assert matcher.select("pythn") == ["T9"]
+
+
+def test_close_keywords_list_every_contender_when_ambiguous():
+    matcher = TabMatcher()
+    for target_id, query in [("A", "python tutorial"), ("B", "python asyncio"), ("C", "python")]:
+        matcher.update(target_id, query, build_search_url(query))
+
+    assert matcher.select("python") == ["C"]  # Names one tab's whole title
+    matcher.discard("C")
+    assert sorted(matcher.select("python")) == ["A", "B"]
+    assert matcher.select("python a") == ["B"]
+
+
+@pytest.mark.parametrize("text, expected", PLAIN + BULK)
+def test_tracked_queries_are_selected_from_the_tab_index(text, expected):
+    index = TabIndex()
+    for query in QUERIES:
+        index.add(query, None, build_search_url(query))
+
+    assert [entry.query for entry in select_entries(index, text)] == expected
+
+
+def test_is_bulk():
+    assert is_bulk("all rust")
+    assert is_bulk("/rust/")
+    assert is_bulk("rust*")
+    assert not is_bulk("rust traits")
+
+
+@pytest.fixture
+def browser_manager(driver):
+    manager = bench.make_chrome_tab_manager(driver)
+    for query in QUERIES:
+        manager.search(query)
+    return manager
+
+
+def open_titles(driver):
+    return sorted(tab.title for tab in driver.tabs.values())
+
+
+@pytest.mark.parametrize("keyword, closed", [
+    ("go", "golang generics"),
+    ("all r", "rust traits"),
+])
+def test_chrome_tab_manager_closes_the_right_tab(browser_manager, driver, keyword, closed):
+    browser_manager.close_tab(keyword)
+
+    assert open_titles(driver) == sorted(f"{q} - Google Search" for q in QUERIES if q != closed)
+
+
+@pytest.mark.parametrize("keyword", ["tomorrow news", "all search", "google"])
+def test_chrome_tab_manager_closes_nothing_for_shared_or_missing_words(browser_manager, driver, keyword):
+    browser_manager.close_tab(keyword)
+
+    assert len(driver.tabs) == len(QUERIES)
+
+
+def test_main_refuses_ambiguous_close(manager, capsys):
+    manager.open_query("python tutorial")
+    manager.open_query("python asyncio")
+
+    assert manager.close_tab("python") is False
+    assert "matches several queries: python tutorial, python asyncio" in capsys.readouterr().out
+    assert len(manager.query_tabs) == 2
+
+    assert manager.close_tab("python async") is True
+    assert [entry.query for entry in manager.query_tabs] == ["python tutorial"]
+
+
+def test_main_keeps_queries_whose_tab_failed_to_close(manager, monkeypatch, capsys):
+    for query in QUERIES:
+        manager.open_query(query)
+    rust = manager.query_tabs.get("rust traits")
+    monkeypatch.setattr(main, "close_tabs", lambda driver, ids, **kwargs: [i for i in ids if i != rust.handle])
+
+    assert manager.close_tab("all /^(rust|golang) /") is False
+
+    out = capsys.readouterr().out
+    assert "Closed 1 tabs: golang generics" in out
+    assert "Could not close 1 tabs: rust traits" in out
+    assert [entry.query for entry in manager.query_tabs] == ["rust traits", "weather tomorrow", "python asyncio"]
+
+    assert manager.close_tab("rust traits") is False
+    assert "rust traits" in manager.query_tabs
+
+
+def test_chrome_tab_manager_reports_only_tabs_it_closed(browser_manager, monkeypatch, capsys):
+    rust = browser_manager.tabs.get("rust traits")
+    monkeypatch.setattr("chrome_tab_manager.close_tabs", lambda driver, ids, **kwargs: [i for i in ids if i != rust.handle])
+
+    browser_manager.close_tab("all /^(rust|golang) /")
+
+    out = capsys.readouterr().out
+    assert "Closed tab with title: golang generics - Google Search" in out
+    assert "Could not close tab with title: rust traits - Google Search" in out
+    assert "rust traits" in browser_manager.tabs and "golang generics" not in browser_manager.tabs
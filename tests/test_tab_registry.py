@@ -0,0 +1,106 @@
+import pytest
+
+from devtools import DevToolsConnection
+from search_urls import build_search_url
+from tab_registry import TabRegistry
+
+
+@pytest.fixture
+def registry(devtools_server):
+    registry = TabRegistry(DevToolsConnection.for_address(devtools_server.address))
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def watched_manager(manager, registry):
+    """Manager fed by the fake endpoint's target events instead of tab scans"""
+    manager.registry = registry
+    return manager
+
+
+def open_search(server, registry, wait_for, query):
+    target_id = server.open_tab(build_search_url(query))
+    wait_for(lambda: registry.queries.get(target_id) == query)
+    return target_id
+
+
+def test_registry_reports_opened_navigated_and_closed_tabs(devtools_server, registry, wait_for):
+    target_id = open_search(devtools_server, registry, wait_for, "alpha")
+    devtools_server.navigate(target_id, build_search_url("beta"))
+    wait_for(lambda: registry.queries.get(target_id) == "beta")
+    devtools_server.close_tab(target_id)
+    wait_for(lambda: not registry.is_open(target_id))
+
+    assert registry.drain_changes() == [(target_id, "alpha"), (target_id, "beta"), (target_id, None)]
+    assert registry.drain_changes() == []
+
+
+def test_manually_opened_search_tab_is_tracked(devtools_server, registry, watched_manager, wait_for):
+    target_id = open_search(devtools_server, registry, wait_for, "alpha")
+
+    watched_manager.sync_tabs()
+
+    assert watched_manager.query_tabs.get("alpha").handle == target_id
+
+
+def test_navigating_to_another_search_rekeys_the_entry(devtools_server, registry, watched_manager, wait_for):
+    target_id = open_search(devtools_server, registry, wait_for, "alpha")
+    watched_manager.sync_tabs()
+
+    devtools_server.navigate(target_id, build_search_url("beta"))
+    wait_for(lambda: registry.queries.get(target_id) == "beta")
+    watched_manager.sync_tabs()
+
+    assert "alpha" not in watched_manager.query_tabs
+    assert watched_manager.query_tabs.get("beta").handle == target_id
+
+
+def test_clicking_a_result_keeps_the_query_tracked(devtools_server, registry, watched_manager, wait_for, capsys):
+    target_id = open_search(devtools_server, registry, wait_for, "alpha")
+    watched_manager.sync_tabs()
+
+    devtools_server.navigate(target_id, "https://docs.python.org/3/library/asyncio.html")
+    wait_for(lambda: target_id not in registry.queries)
+    watched_manager.list_queries()
+
+    assert watched_manager.query_tabs.get("alpha").handle == target_id
+    assert "1. alpha" in capsys.readouterr().out
+
+    watched_manager.close_tab("alpha")
+
+    assert "Closed tab for query: alpha" in capsys.readouterr().out
+    assert "alpha" not in watched_manager.query_tabs
+
+
+def test_closed_tab_is_untracked(devtools_server, registry, watched_manager, wait_for):
+    target_id = open_search(devtools_server, registry, wait_for, "alpha")
+    watched_manager.sync_tabs()
+
+    devtools_server.close_tab(target_id)
+    wait_for(lambda: not registry.is_open(target_id))
+    watched_manager.sync_tabs()
+
+    assert len(watched_manager.query_tabs) == 0
+
+
+def test_tab_scan_also_follows_navigation(manager, driver):
+    manager.open_query("alpha")
+    handle = manager.query_tabs.get("alpha").handle
+    driver.switch_to.window(handle)
+    driver.get(build_search_url("beta"))
+
+    manager.sync_tabs()
+
+    assert "alpha" not in manager.query_tabs
+    assert manager.query_tabs.get("beta").handle == handle
+
+
+def test_tab_scan_keeps_a_tab_that_left_the_results_page(manager, driver):
+    manager.open_query("alpha")
+    handle = manager.query_tabs.get("alpha").handle
+    driver.get("https://docs.python.org/3/")
+
+    manager.sync_tabs()
+
+    assert manager.query_tabs.get("alpha").handle == handle
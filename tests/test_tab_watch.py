@@ -0,0 +1,127 @@
+import pytest
+
+from devtools import DevToolsConnection
+from search_urls import build_search_url
+from tab_index import TabIndex
+from tab_watch import TabChange, TabWatcher, digest
+
+
+@pytest.fixture
+def connection(devtools_server):
+    connection = DevToolsConnection.for_address(devtools_server.address)
+    yield connection
+    connection.close()
+
+
+@pytest.fixture
+def results(devtools_server):
+    """Result text each tab's page script returns, keyed by target id"""
+    pages = {}
+    devtools_server.handlers["Target.attachToTarget"] = lambda params, session: {"sessionId": "S" + params["targetId"]}
+    devtools_server.handlers["Target.detachFromTarget"] = lambda params, session: {}
+    devtools_server.handlers["Runtime.evaluate"] = lambda params, session: {
+        "result": {"type": "string", "value": pages[session[1:]]}
+    }
+    return pages
+
+
+def open_tracked(server, index, query):
+    target_id = server.open_tab(build_search_url(query), f"{query} - Google Search")
+    index.add(query, target_id)
+    return target_id
+
+
+def evaluations(server):
+    return server.received.count("Runtime.evaluate")
+
+
+def test_title_and_url_changes_are_reported(devtools_server, connection):
+    index = TabIndex()
+    target_id = open_tracked(devtools_server, index, "rust traits")
+    devtools_server.open_tab("https://example.com/")  # Untracked
+    seen = []
+    watcher = TabWatcher(connection, index, on_change=seen.append)
+
+    assert watcher.poll(now=0) == []
+    devtools_server.navigate(target_id, build_search_url("rust traits") + "&start=10", "rust traits - page 2")
+    changes = watcher.poll(now=1)
+
+    assert [change.field for change in changes] == ["title", "url"]
+    assert changes[0] == TabChange("rust traits", target_id, "title", "rust traits - Google Search",
+                                   "rust traits - page 2")
+    assert seen == changes
+    assert watcher.poll(now=2) == []
+
+
+def test_closed_tabs_are_forgotten(devtools_server, connection):
+    index = TabIndex()
+    target_id = open_tracked(devtools_server, index, "rust traits")
+    watcher = TabWatcher(connection, index, on_change=lambda change: None)
+    watcher.poll(now=0)
+
+    devtools_server.close_tab(target_id)
+
+    assert watcher.poll(now=1) == []
+    assert watcher._state == {}
+
+
+def test_result_digest_changes_are_reported(devtools_server, connection, results):
+    index = TabIndex()
+    target_id = open_tracked(devtools_server, index, "rust traits")
+    results[target_id] = "Traits\thttps://doc.rust-lang.org/book/ch10-02-traits.html"
+    watcher = TabWatcher(connection, index, hash_results=True, on_change=lambda change: None)
+
+    assert watcher.poll(now=0) == []
+    results[target_id] = "Traits in Rust\thttps://example.com/traits"
+    changes = watcher.poll(now=10)
+
+    assert changes == [TabChange("rust traits", target_id, "results",
+                                 digest("Traits\thttps://doc.rust-lang.org/book/ch10-02-traits.html"),
+                                 digest("Traits in Rust\thttps://example.com/traits"))]
+
+
+def test_unchanged_results_are_checked_less_often(devtools_server, connection, results):
+    index = TabIndex()
+    target_id = open_tracked(devtools_server, index, "rust traits")
+    results[target_id] = "same results"
+    watcher = TabWatcher(connection, index, hash_results=True, min_interval=5, max_interval=20,
+                         on_change=lambda change: None)
+
+    checked_at = []
+    for now in range(0, 80):
+        before = evaluations(devtools_server)
+        watcher.poll(now=now)
+        if evaluations(devtools_server) > before:
+            checked_at.append(now)
+
+    # Intervals double from 5 up to max_interval: 0, +10, +20, then every 20
+    assert checked_at == [0, 10, 30, 50, 70]
+
+    results[target_id] = "new results"
+    assert [change.field for change in watcher.poll(now=90)] == ["results"]
+    assert watcher._schedule[target_id] == [95, 5]  # A change resets the interval
+
+
+def test_navigation_triggers_an_immediate_results_check(devtools_server, connection, results):
+    index = TabIndex()
+    target_id = open_tracked(devtools_server, index, "rust traits")
+    results[target_id] = "page one"
+    watcher = TabWatcher(connection, index, hash_results=True, on_change=lambda change: None)
+    watcher.poll(now=0)
+
+    results[target_id] = "page two"
+    devtools_server.navigate(target_id, build_search_url("rust traits") + "&start=10")
+
+    assert [change.field for change in watcher.poll(now=1)] == ["title", "url", "results"]
+
+
+def test_stop_detaches_sessions(devtools_server, connection, results):
+    index = TabIndex()
+    target_id = open_tracked(devtools_server, index, "rust traits")
+    results[target_id] = "results"
+    watcher = TabWatcher(connection, index, hash_results=True, on_change=lambda change: None)
+    watcher.poll(now=0)
+
+    watcher.stop()
+
+    assert devtools_server.received.count("Target.detachFromTarget") == 1
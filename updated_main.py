@@ -1,15 +1,25 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
-import time
-import re
+
+from batch_open import DEFAULT_MAX_CONCURRENT, navigate, open_tabs
+from driver_cache import start_driver
+from launch_profile import DEFAULT_LAUNCH_PROFILE, apply_launch_profile, launch_profile_from_argv, start_resource_blocker
+from search_urls import build_search_url
+from session_daemon import attach_driver
+from tab_index import TabIndex
+from tab_lifecycle import DEFAULT_MAX_LIVE_TABS, TabLifecycle
+from tab_matcher import TabMatcher, is_bulk
+from tab_snapshot import snapshot_tabs, close_tabs
 
 
 class ChromeTabManager:
-    def __init__(self):
-        self.options = Options()
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, max_live_tabs=DEFAULT_MAX_LIVE_TABS,
+                 launch_profile=DEFAULT_LAUNCH_PROFILE):
+        self.launch_profile = launch_profile
+        self.options = apply_launch_profile(Options(), launch_profile)
+        # Don't block navigations on full page loads; batch searches track
+        # load progress themselves
+        self.options.page_load_strategy = "none"
         self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
         self.options.add_experimental_option("useAutomationExtension", False)
         self.options.add_argument("--disable-blink-features=AutomationControlled")
@@ -17,57 +27,105 @@ class ChromeTabManager:
         self.options.add_argument("--no-first-run")
         self.options.add_argument("--no-default-browser-check")
 
-        self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()), options=self.options
-        )
-        self.tabs = {}  # Maps user query to window handle
+        # Reattach to session_daemon.py's browser, else launch our own
+        self.driver = attach_driver(self.options.page_load_strategy)
+        self.attached = self.driver is not None
+        if not self.attached:
+            self.driver = start_driver(self.options)
+        self.tabs = TabIndex()  # Maps user query to window handle
+        self.matcher = TabMatcher()  # Cached title index for close keywords
 
         # Keep the initial tab hidden (will reuse it for the first query)
         self.base_handle = self.driver.current_window_handle
-        self.is_base_used = False
+        # Never take over a tab in a browser we didn't launch
+        self.is_base_used = self.attached
+        self.max_concurrent = max_concurrent
+        self.lifecycle = TabLifecycle(self.driver, self.tabs, max_live_tabs)
+        self.blocker = start_resource_blocker(self.driver) if launch_profile.block_resources else None
 
     def search(self, queries):
-        self.driver.minimize_window()
-        for i, query in enumerate(queries):
-            if not self.is_base_used:
-                self.driver.get(f"https://www.google.com/search?q={query}")
-                self.tabs[query] = self.base_handle
-                self.is_base_used = True
+        if self.launch_profile.window_churn:
+            self.driver.minimize_window()
+        # Queries we already track just get their tab back (reopened if suspended)
+        handles = []
+        new_queries = []
+        for query in queries:
+            entry = self.tabs.get(query)
+            if entry is not None:
+                handles.append(self.lifecycle.touch(entry))
             else:
-                self.driver.execute_script("window.open('');")
-                self.driver.switch_to.window(self.driver.window_handles[-1])
-                self.driver.get(f"https://www.google.com/search?q={query}")
-                self.tabs[query] = self.driver.current_window_handle
-        self.driver.switch_to.window(self.driver.window_handles[-1])
+                new_queries.append(query)
+        queries = new_queries
+
+        urls = [build_search_url(query) for query in queries]
+        # Only the newest queries that fit the live-tab budget get a tab;
+        # older ones are tracked suspended instead of opened and closed again
+        suspended = max(0, len(queries) - self.lifecycle.max_live_tabs)
+        for query, url in zip(queries[:suspended], urls[:suspended]):
+            self.tabs.add(query, None, url)
+        queries, urls = queries[suspended:], urls[suspended:]
+        if suspended:
+            print(f"[💤] {suspended} older queries are suspended until searched again.")
+        if urls and not self.is_base_used:
+            navigate(self.driver, urls[0])
+            self.lifecycle.track(self.tabs.add(queries[0], self.base_handle, urls[0]))
+            self.is_base_used = True
+            queries, urls = queries[1:], urls[1:]
+
+        # Create every remaining tab up front and let the loads overlap
+        new_handles = open_tabs(self.driver, urls, max_concurrent=self.max_concurrent)
+        for query, url, handle in zip(queries, urls, new_handles):
+            if handle:
+                self.lifecycle.track(self.tabs.add(query, handle, url))
+        handles.extend(new_handles)
+        if handles and handles[-1]:
+            # The tab brought to the front loads in full
+            if self.blocker:
+                self.blocker.unblock(handles[-1])
+            self.driver.switch_to.window(handles[-1])
 
     def list_tabs(self):
         print("[🔍] Currently opened tabs:")
-        for handle in self.driver.window_handles:
-            try:
-                self.driver.switch_to.window(handle)
-                title = self.driver.title or "Untitled"
-                print(f"  - {title.strip()}")
-            except:
-                continue  # In case a tab was closed manually mid-loop
+        for tab in snapshot_tabs(self.driver):
+            title = tab.title or "Untitled"
+            print(f"  - {title.strip()}")
+        for entry in self.tabs:
+            if entry.suspended:
+                print(f"  - {entry.query} (suspended)")
 
     def close_tab(self, keyword):
-        self.driver.minimize_window()
-        keyword = keyword.lower()
-        for handle in self.driver.window_handles:
-            try:
-                self.driver.switch_to.window(handle)
-                title = self.driver.title.lower()
-                if keyword in title:
-                    self.driver.close()
-                    print(f"[❌] Closed tab with title: {title}")
-                    return
-            except:
-                continue
+        if self.launch_profile.window_churn:
+            self.driver.minimize_window()
+        tabs = snapshot_tabs(self.driver)
+        self.matcher.refresh(tabs)  # Only new or retitled tabs are reindexed
+        target_ids = self.matcher.select(keyword)
+        if target_ids:
+            titles = [self.matcher.title(t) for t in target_ids]
+            if len(target_ids) > 1 and not is_bulk(keyword):
+                print(f"[⚠️] '{keyword}' matches several tabs: " + ", ".join(titles))
+                return
+            closed = set(close_tabs(self.driver, target_ids, snapshot=tabs))
+            for target_id, title in zip(target_ids, titles):
+                if target_id not in closed:
+                    print(f"[⚠️] Could not close tab with title: {title}")
+                    continue
+                self.matcher.discard(target_id)
+                entry = self.tabs.remove_handle(target_id)
+                if entry is not None:
+                    self.lifecycle.forget(entry)
+                print(f"[❌] Closed tab with title: {title}")
+            return
+        # Suspended queries have no tab to match by title
+        for entry in self.tabs.search(keyword):
+            if entry.suspended:
+                self.tabs.remove(entry)
+                print(f"[❌] Dropped suspended tab for query: {entry.query}")
+                return
         print(f"[⚠️] No tab with '{keyword}' found to close.")
 
 
 def main():
-    manager = ChromeTabManager()
+    manager = ChromeTabManager(launch_profile=launch_profile_from_argv())
     print("\n[Chrome Tab Manager Ready]")
     print("Commands:\n - search query1, query2\n - close\n - close query2\n - exit\n")
 
@@ -105,6 +163,8 @@ def main():
             break
 
     try:
+        if manager.blocker:
+            manager.blocker.close()
         manager.driver.quit()
     except:
         pass